@@ -0,0 +1 @@
+"""Performance benchmarks for wellpathpy, run from the repository root"""
@@ -0,0 +1,81 @@
+"""Speed and accuracy of the dogleg kernel
+
+Compare the half-angle dogleg (geometry.half_dogleg), which the minimum
+curvature engine uses, against the angle between (n, 3) direction vectors
+(geometry.angle_between), which it used before.
+
+Speed is the best time to compute the doglegs of a survey of --stations
+stations. Accuracy is the relative error of very small doglegs, which are
+exactly known: a change in inclination only, or a change in azimuth only at
+horizontal, gives a dogleg of exactly that change.
+
+    python -m benchmarks.dogleg --stations 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from wellpathpy.geometry import angle_between, direction_vector_radians, dogleg
+
+def vectors(inc_upper, inc_lower, azi_upper, azi_lower):
+    u = np.column_stack(direction_vector_radians(inc_upper, azi_upper))
+    v = np.column_stack(direction_vector_radians(inc_lower, azi_lower))
+    return angle_between(u, v)
+
+kernels = [
+    ('half_dogleg', dogleg),
+    ('angle_between', vectors),
+]
+
+def best(f, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def speed(stations, repeat):
+    rng = np.random.default_rng(0)
+    inc = np.deg2rad(np.clip(np.cumsum(rng.normal(0, 0.5, stations)) + 45, 0, 120))
+    azi = np.deg2rad(np.mod(np.cumsum(rng.normal(0, 1, stations)), 360))
+    args = (inc[:-1], inc[1:], azi[:-1], azi[1:])
+    for name, f in kernels:
+        seconds = best(f, args, repeat)
+        print('{:<16} {:14.0f} segments/s'.format(name, (stations - 1) / seconds))
+
+def accuracy():
+    deltas = 10.0 ** np.arange(-14, 0)
+    base = np.deg2rad(37.0)
+    cases = [
+        # (description, inc_upper, inc_lower, azi_upper, azi_lower)
+        ('inc only', base, base + deltas, 1.0, 1.0),
+        ('azi only', np.pi / 2, np.pi / 2, base, base + deltas),
+    ]
+    for description, iu, il, au, al in cases:
+        # the exact dogleg is the change as represented in floating point
+        exact = (np.subtract(il, iu) if description == 'inc only'
+                 else np.subtract(al, au))
+        print('\nrelative error, {}'.format(description))
+        print('{:>8}'.format('dogleg') + ''.join(
+            '{:>16}'.format(name) for name, _ in kernels
+        ))
+        n = len(deltas)
+        args = [np.broadcast_to(x, n) for x in (iu, il, au, al)]
+        errors = [np.abs(f(*args) - exact) / exact for _, f in kernels]
+        for i, delta in enumerate(deltas):
+            print('{:8.0e}'.format(delta) + ''.join(
+                '{:16.2e}'.format(error[i]) for error in errors
+            ))
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--stations', type = int, default = 10**6)
+    parser.add_argument('--repeat', type = int, default = 5)
+    args = parser.parse_args()
+    speed(args.stations, args.repeat)
+    accuracy()
+
+if __name__ == '__main__':
+    main()
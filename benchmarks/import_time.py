@@ -0,0 +1,45 @@
+"""Cold import time of wellpathpy
+
+Import wellpathpy in fresh interpreters, and report the best time to import
+the package, and to import it and touch the public API, which loads numpy and
+the engines. Exits with status 1 if the bare import is slower than --max-ms.
+
+    python -m benchmarks.import_time --max-ms 20
+"""
+import argparse
+import subprocess
+import sys
+
+def best(code, repeat):
+    """Best wall time in ms of running code in a fresh interpreter
+
+    The interpreter start-up is measured separately and subtracted.
+    """
+    prelude = 'import time; start = time.perf_counter()\n'
+    report = '\nprint((time.perf_counter() - start) * 1000)'
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', prelude + code + report])
+        times.append(float(out))
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--repeat', type = int, default = 10)
+    parser.add_argument('--max-ms', type = float,
+                        help = 'fail if import wellpathpy takes longer than this')
+    args = parser.parse_args()
+
+    bare = best('import wellpathpy', args.repeat)
+    api = best('import wellpathpy; wellpathpy.deviation', args.repeat)
+    numpy = best('import numpy', args.repeat)
+    print('import wellpathpy               {:8.2f} ms'.format(bare))
+    print('import wellpathpy + deviation   {:8.2f} ms'.format(api))
+    print('import numpy (for reference)    {:8.2f} ms'.format(numpy))
+
+    if args.max_ms is not None and bare > args.max_ms:
+        print('import wellpathpy is slower than {} ms'.format(args.max_ms))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Thread scaling of minimum_curvature.resample
+
+Resample an extended-reach well with many survey stations onto a very fine
+measured depth step, with an increasing number of threads, and report the
+time and speedup over a single thread.
+
+    python -m benchmarks.resample_threads --stations 100000 --step 0.05
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import wellpathpy as wp
+
+def well(stations, length):
+    md  = np.linspace(0, length, stations)
+    inc = np.clip(np.linspace(0, 110, stations), 0, 92)
+    azi = np.mod(np.linspace(0, 400, stations), 360)
+    return wp.deviation(md, inc, azi).minimum_curvature()
+
+def best(f, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--stations', type = int, default = 100000)
+    parser.add_argument('--length', type = float, default = 15000)
+    parser.add_argument('--step', type = float, default = 0.05)
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--max-workers', type = int, default = os.cpu_count())
+    args = parser.parse_args()
+
+    pos = well(args.stations, args.length)
+    depths = np.arange(0, args.length, args.step)
+    print('{} stations, {} resampled points, {} cores'.format(
+        args.stations, len(depths), os.cpu_count()))
+
+    workers = 1
+    baseline = None
+    while workers <= args.max_workers:
+        t = best(lambda: pos.resample(depths = depths, workers = workers), args.repeat)
+        baseline = baseline or t
+        print('workers = {:3d}  {:8.3f} s  speedup {:5.2f}'.format(workers, t, baseline / t))
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
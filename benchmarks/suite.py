@@ -0,0 +1,268 @@
+"""Throughput and peak memory of every engine across data sizes
+
+Synthetic wells from 10 to 10^6 stations and fleets of up to 10^5 wells are
+run through the deviation constructor, the position engines, resample, the
+inverse minimum_curvature.deviation, the fleet computation and the csv reader
+and writers. For every case the best
+throughput (in stations per second) over a few repetitions is reported,
+together with the peak memory a single run allocates through python and numpy,
+as traced by tracemalloc. Shared memory blocks are not traced.
+
+Results are machine dependent, so a baseline is only meaningful on the
+machine it was recorded on. Record a baseline with --save on the machine that
+runs the comparison, and compare later runs against it. A case that is more
+than --tolerance slower than its baseline is reported as a regression, and the
+exit status is 1. benchmarks/baseline-quick.json is a --quick baseline, as an
+example of the format and of the expected orders of magnitude. Its machine,
+python and numpy versions are recorded in the file.
+
+The accuracy of the plain and compensated (see workspace.blocked_cumsum)
+accumulation, with float64 and float32 outputs, is reported for the largest
+well, as the largest position error against a float64 reference.
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --baseline baseline.json --tolerance 0.25
+    python -m benchmarks.suite --quick
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import wellpathpy as wp
+from wellpathpy.fleet import fleet
+from wellpathpy.mincurve import minimum_curvature, minimum_curvature_increments
+from wellpathpy.rad_curv import radius_curvature
+from wellpathpy.tan import tan_method
+from wellpathpy import parallel
+
+sizes = [10, 1000, 100000, 1000000]
+fleet_sizes = [10, 1000, 100000]
+quick_sizes = [10, 1000, 10000]
+quick_fleet_sizes = [10, 1000]
+fleet_stations = 50
+# minimum_curvature.deviation is a python loop over the stations, so larger
+# wells only take longer, without changing the throughput
+inverse_stations = 100000
+
+def survey(stations, seed = 0):
+    """A smooth, build-turn-hold survey of about 10 m per station"""
+    rng = np.random.default_rng(seed)
+    md  = np.linspace(0, 10.0 * stations, stations)
+    inc = np.clip(np.linspace(0, 110, stations), 0, 92)
+    inc = np.clip(inc + rng.uniform(-0.1, 0.1, stations), 0, 179)
+    azi = np.mod(np.linspace(0, 400, stations), 360)
+    return md, inc, azi
+
+def cases(size, tmp):
+    """(name, stations, setup) for a single well of size stations
+
+    setup() prepares the inputs, and returns the function to time.
+    """
+    md, inc, azi = survey(size)
+    path = os.path.join(tmp, 'well-{}.csv'.format(size))
+
+    def mincurve():
+        return lambda: minimum_curvature(md, inc, azi)
+
+    def resample():
+        pos = wp.deviation(md, inc, azi).minimum_curvature()
+        depths = np.linspace(md[0], md[-1], size)
+        return lambda: pos.resample(depths = depths)
+
+    def read():
+        wp.deviation_to_csv(path, md, inc, azi)
+        return lambda: wp.read_csv(path)
+
+    def inverse():
+        pos = wp.deviation(md, inc, azi).minimum_curvature()
+        return lambda: pos.deviation()
+
+    def position_csv():
+        pos = wp.deviation(md, inc, azi).minimum_curvature()
+        return lambda: pos.to_csv(path)
+
+    inverse_cases = []
+    if size <= inverse_stations:
+        inverse_cases.append(('minimum_curvature.deviation', size, inverse))
+
+    return [
+        ('deviation',         size, lambda: lambda: wp.deviation(md, inc, azi)),
+        ('minimum_curvature', size, mincurve),
+        ('radius_curvature',  size, lambda: lambda: radius_curvature(md, inc, azi)),
+        ('tan_method',        size, lambda: lambda: tan_method(md, inc, azi, 'avg')),
+        ('balanced_tan',      size, lambda: lambda: tan_method(md, inc, azi, 'bal')),
+        ('resample',          size, resample),
+        ('read_csv',          size, read),
+        ('deviation_to_csv',  size, lambda: lambda: wp.deviation_to_csv(path, md, inc, azi)),
+        ('position_to_csv',   size, position_csv),
+    ] + inverse_cases
+
+def fleet_cases(wells):
+    """(name, stations, setup) for a fleet of wells"""
+    stations = wells * fleet_stations
+
+    def make():
+        md, inc, azi = survey(fleet_stations)
+        offsets = np.arange(wells + 1) * fleet_stations
+        return fleet(np.tile(md, wells), np.tile(inc, wells), np.tile(azi, wells), offsets)
+
+    def compute():
+        fl = make()
+        return lambda: parallel.compute(fl, workers = 1)
+
+    def convert():
+        fl = make()
+        dec = np.linspace(-5, 5, wells)
+        return lambda: fl.convert_azimuth(declination = dec, convergence = 0.5)
+
+    return [
+        ('fleet.compute',         stations, compute),
+        ('fleet.convert_azimuth', stations, convert),
+    ]
+
+def measure(setup, stations, repeat):
+    """Best throughput over repeat runs, and the peak memory of one run"""
+    f = setup()
+    f()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        f()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'stations_per_second': stations / max(min(times), 1e-9),
+        'peak_bytes': peak,
+    }
+
+def accuracy(stations):
+    """Largest position error of the accumulation modes, against a reference
+
+    The reference is the running sum of the float64 increments, accumulated
+    in extended precision (np.longdouble), so it is only a better reference
+    than float64 on platforms where long double is wider than double.
+
+    Returns
+    -------
+    errors : dict
+        mode -> largest absolute error of tvd, northing and easting
+    """
+    md, inc, azi = survey(stations)
+    increments = minimum_curvature_increments(md, np.deg2rad(inc), np.deg2rad(azi))
+    reference = [np.concatenate([[0], np.cumsum(x, dtype = np.longdouble)])
+                 for x in increments[:3]]
+
+    errors = {}
+    for dtype in [np.float64, np.float32]:
+        for compensated in [False, True]:
+            out = tuple(np.empty(stations, dtype = dtype) for _ in range(4))
+            result = minimum_curvature(md, inc, azi, out = out, compensated = compensated)
+            mode = '{}/{}'.format(np.dtype(dtype).name,
+                                  'compensated' if compensated else 'plain')
+            errors[mode] = max(
+                float(np.max(np.abs(x - ref)))
+                for x, ref in zip(result[:3], reference)
+            )
+            print('{:<32} {:14.3e} max error'.format(
+                'accuracy/{}/{}'.format(mode, stations), errors[mode]
+            ))
+    return errors
+
+def run(sizes, fleet_sizes, repeat, only = None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        all_cases = [case for size in sizes for case in cases(size, tmp)]
+        all_cases += [case for wells in fleet_sizes for case in fleet_cases(wells)]
+        for name, stations, setup in all_cases:
+            if only and not any(pattern in name for pattern in only):
+                continue
+            key = '{}/{}'.format(name, stations)
+            # a single repetition is enough for the very large cases
+            n = repeat if stations < 100000 else 1
+            results[key] = measure(setup, stations, n)
+            print('{:<32} {:14.0f} stations/s  {:10.1f} MiB peak'.format(
+                key,
+                results[key]['stations_per_second'],
+                results[key]['peak_bytes'] / 2**20,
+            ))
+            sys.stdout.flush()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Cases that are more than tolerance slower than the baseline
+
+    Returns
+    -------
+    regressions : list of str
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        expected = baseline[key]['stations_per_second']
+        actual = result['stations_per_second']
+        if actual < expected * (1 - tolerance):
+            regressions.append('{}: {:.0f} stations/s, baseline {:.0f} ({:+.0%})'.format(
+                key, actual, expected, actual / expected - 1
+            ))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--quick', action = 'store_true',
+                        help = 'small sizes only, for a fast smoke test')
+    parser.add_argument('--repeat', type = int, default = 5)
+    parser.add_argument('--only', nargs = '*',
+                        help = 'only run cases whose name contains one of these')
+    parser.add_argument('--save', metavar = 'FILE',
+                        help = 'write the results as a baseline')
+    parser.add_argument('--baseline', metavar = 'FILE',
+                        help = 'compare the results against a baseline')
+    parser.add_argument('--tolerance', type = float, default = 0.25,
+                        help = 'allowed relative slowdown, default 0.25')
+    args = parser.parse_args()
+
+    if args.quick:
+        results = run(quick_sizes, quick_fleet_sizes, args.repeat, args.only)
+    else:
+        results = run(sizes, fleet_sizes, args.repeat, args.only)
+
+    errors = accuracy(max(quick_sizes if args.quick else sizes))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'machine': platform.platform(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'results': results,
+                'accuracy': errors,
+            }, f, indent = 2, sort_keys = True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('\n{} regression(s) against {}:'.format(len(regressions), args.baseline))
+            for line in regressions:
+                print('  ' + line)
+            sys.exit(1)
+        print('\nno regressions against {}'.format(args.baseline))
+
+if __name__ == '__main__':
+    main()
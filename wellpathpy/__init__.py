@@ -1,16 +1,6 @@
+import importlib
 import sys
-if sys.version_info >= (3, 8):
-    from importlib import metadata
-else:
-    import importlib_metadata as metadata
-
-try:
-    __version__ = metadata.version(__name__)
-except: # PackageNotFoundError
-    # Don't hard crash when the the version cannot be looked up from the
-    # metadata, probably because the tests are running from the source dir and
-    # the module has not been packaged yet.
-    pass
+import types
 
 __all__ = [
     'read_header_json',
@@ -22,7 +12,84 @@ __all__ = [
     'minimum_curvature'
 ]
 
-from .header import read_header_json
-from .read import read_csv
-from .write import deviation_to_csv, position_to_csv
-from .position_log import deviation, position_log, minimum_curvature
+# The public functions and classes, and the submodules, are imported on first
+# access, so that `import wellpathpy` does not pay for numpy and every
+# submodule up front. See PEP 562.
+exports = {
+    'read_header_json': 'header',
+    'read_csv': 'read',
+    'deviation_to_csv': 'write',
+    'position_to_csv': 'write',
+    'deviation': 'position_log',
+    'position_log': 'position_log',
+    'minimum_curvature': 'position_log',
+}
+
+submodules = [
+    'azimuth',
+    'cache',
+    'checkarrays',
+    'cli',
+    'fleet',
+    'geometry',
+    'header',
+    'instrument',
+    'location',
+    'lod',
+    'mincurve',
+    'parallel',
+    'planning',
+    'qc',
+    'rad_curv',
+    'read',
+    'simplify',
+    'spatial',
+    'synthetic',
+    'tan',
+    'tiein',
+    'units',
+    'voxel',
+    'workspace',
+    'write',
+]
+
+def version():
+    if sys.version_info >= (3, 8):
+        from importlib import metadata
+    else:
+        import importlib_metadata as metadata
+
+    try:
+        return metadata.version(__name__)
+    except: # PackageNotFoundError
+        # Don't hard crash when the the version cannot be looked up from the
+        # metadata, probably because the tests are running from the source dir
+        # and the module has not been packaged yet.
+        raise AttributeError('__version__')
+
+def __getattr__(name):
+    if name == '__version__':
+        value = version()
+    elif name in exports:
+        module = importlib.import_module('.' + exports[name], __name__)
+        value = getattr(module, name)
+    elif name in submodules:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(submodules) | {'__version__'})
+
+class package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it as an attribute of the package, and
+        # the position_log submodule would then shadow the position_log class
+        if name == 'position_log' and isinstance(value, types.ModuleType):
+            value = value.position_log
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = package
@@ -0,0 +1,116 @@
+import numpy as np
+
+references = ('magnetic', 'true', 'grid')
+
+def to_true(reference, declination, convergence):
+    """Angle to add to an azimuth in reference to get it from true north"""
+    if reference == 'magnetic':
+        return declination
+    if reference == 'true':
+        return 0
+    if reference == 'grid':
+        return convergence
+
+    msg = 'unknown azimuth reference {}, must be one of {}'
+    raise ValueError(msg.format(reference, ' '.join(references)))
+
+def broadcast(values, n, offsets):
+    """Broadcast scalar, per-well or per-station values to n stations"""
+    values = np.asarray(values, dtype = float)
+    if values.ndim == 0 or values.shape == (n,):
+        return values
+    if offsets is not None and values.shape == (len(offsets) - 1,):
+        return np.repeat(values, np.diff(offsets))
+    raise ValueError('declination and convergence must be scalar, per-well or per-station')
+
+def wrap(azi):
+    """Wrap azimuths into [0, 360)
+
+    Very small negative angles wrap to 360.0 in floating point, which is
+    outside the domain, so they are mapped to 0.
+    """
+    azi = np.mod(azi, 360)
+    azi[azi >= 360] = 0
+    return azi
+
+def convert(azi, declination = 0, convergence = 0, source = 'magnetic',
+            target = 'grid', offsets = None):
+    """Convert azimuths between north references
+
+    Azimuths are converted between magnetic, true and grid north:
+
+    - true = magnetic + declination
+    - grid = true - convergence
+
+    with declination positive east and grid convergence positive when grid
+    north is east of true north.
+
+    Parameters
+    ----------
+    azi : array_like of float
+        azimuth in degrees, relative to source
+    declination : float or array_like of float
+        magnetic declination in degrees, scalar, per-well (with offsets) or
+        per-station
+    convergence : float or array_like of float
+        grid convergence in degrees, scalar, per-well (with offsets) or
+        per-station
+    source : {'magnetic', 'true', 'grid'}
+        north reference of azi
+    target : {'magnetic', 'true', 'grid'}
+        north reference to convert to
+    offsets : array_like of int, optional
+        well boundaries for a fleet in the ragged layout, see fleet.fleet
+
+    Returns
+    -------
+    azi : array_like of float
+        azimuth in degrees relative to target, in [0, 360)
+
+    Examples
+    --------
+    Correct a magnetic survey to grid north:
+
+    >>> convert(azi, declination = 2.5, convergence = -0.8)
+
+    Correct a whole fleet, with one declination and convergence per well:
+
+    >>> convert(f.azi, declination = dec, convergence = conv, offsets = f.offsets)
+    """
+    azi = np.asarray(azi, dtype = float)
+    n = azi.shape[-1] if azi.ndim else 1
+    declination = broadcast(declination, n, offsets)
+    convergence = broadcast(convergence, n, offsets)
+
+    shift = (to_true(source, declination, convergence)
+           - to_true(target, declination, convergence))
+    return wrap(np.atleast_1d(azi + shift))
+
+def from_header(azi, header, target = 'grid'):
+    """Convert azimuths using the reference recorded in the header
+
+    Parameters
+    ----------
+    azi : array_like of float
+        azimuth in degrees, relative to header['azimuth_reference']
+    header : dict
+        header, see header.read_header_json. Missing azimuth keys default to a
+        grid north reference, with zero declination and convergence
+    target : {'magnetic', 'true', 'grid'}
+
+    Returns
+    -------
+    azi : array_like of float
+    header : dict
+        a copy of header with azimuth_reference set to target
+    """
+    azi = convert(
+        azi,
+        declination = header.get('declination', 0),
+        convergence = header.get('grid_convergence', 0),
+        source = header.get('azimuth_reference', 'grid'),
+        target = target,
+    )
+    header = dict(header)
+    header['azimuth_reference'] = target
+    return azi, header
@@ -0,0 +1,430 @@
+import collections
+import copy
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+
+from .position_log import deviation, minimum_curvature, radius_curvature, tan_method
+from .read import read_csv
+
+def fingerprint(dev, method, **params):
+    """Content hash of a deviation and the computation parameters
+
+    The md, inc and azi buffers are hashed directly, without copying.
+
+    Parameters
+    ----------
+    dev : deviation
+    method : str
+        name of the computation, e.g. 'minimum_curvature'
+    **params
+        parameters of the computation, e.g. course_length
+
+    Returns
+    -------
+    key : bytes
+    """
+    h = hashlib.blake2b(digest_size = 20)
+    h.update(repr((method, len(dev.md), sorted(params.items()))).encode())
+    for arr in (dev.md, dev.inc, dev.azi):
+        h.update(np.ascontiguousarray(arr, dtype = float))
+    return h.digest()
+
+def file_fingerprint(fname, method, by = 'content', **params):
+    """Hash of a source file and the computation parameters
+
+    Parameters
+    ----------
+    fname : str
+        path to the source file
+    method : str
+        name of the computation, e.g. 'minimum_curvature'
+    by : {'content', 'mtime'}
+        hash the content of the file, or only its path, size and modification
+        time. The mtime key is much cheaper for large files, but misses
+        changes that preserve the size and modification time
+    **params
+        parameters of the reader and the computation
+
+    Returns
+    -------
+    key : bytes
+    """
+    h = hashlib.blake2b(digest_size = 20)
+    h.update(repr((method, by, sorted(params.items()))).encode())
+    if by == 'content':
+        with open(fname, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                h.update(block)
+    elif by == 'mtime':
+        st = os.stat(fname)
+        h.update(repr((os.path.abspath(fname), st.st_size, st.st_mtime_ns)).encode())
+    else:
+        raise ValueError("by must be 'content' or 'mtime', was {}".format(by))
+    return h.digest()
+
+def nbytes(log):
+    """Approximate memory use of a position log"""
+    arrays = [log.depth, log.northing, log.easting,
+              log.source.md, log.source.inc, log.source.azi]
+    if hasattr(log, 'dls'):
+        arrays.append(log.dls)
+    return sum(np.asarray(x).nbytes for x in arrays)
+
+def clone(log):
+    """Copy a position log, without validating it again
+
+    The arrays are copied with np.copy, but the log and its deviation are not
+    rebuilt through their constructors, which would check the survey again.
+    """
+    src = copy.copy(log.source)
+    src.md, src.inc, src.azi = np.copy(src.md), np.copy(src.inc), np.copy(src.azi)
+    out = copy.copy(log)
+    out.source = src
+    out.depth = np.copy(log.depth)
+    out.northing = np.copy(log.northing)
+    out.easting = np.copy(log.easting)
+    if hasattr(log, 'dls'):
+        out.dls = np.copy(log.dls)
+    return out
+
+class cache:
+    """Memoization cache for computed position logs
+
+    An in-memory, thread-safe cache keyed by the content of the deviation and
+    the computation parameters, so unchanged surveys are computed once.
+    When the total size of the cached logs exceeds maxbytes, the least
+    recently used logs are evicted.
+
+    The cache is opt-in, and is passed to the deviation methods.
+
+    Parameters
+    ----------
+    maxbytes : int
+        upper bound on the total size of the cached logs
+
+    Notes
+    -----
+    Logs are copied in and out of the cache, so modifying a returned log,
+    e.g. with to_wellhead(inplace = True), does not affect the cache.
+
+    Examples
+    --------
+    >>> memo = cache(maxbytes = 512 * 2**20)
+    >>> pos = dev.minimum_curvature(course_length = 30, cache = memo)
+    >>> pos = dev.minimum_curvature(course_length = 30, cache = memo)
+    >>> memo.hits, memo.misses
+    (1, 1)
+    """
+    def __init__(self, maxbytes = 256 * 2**20):
+        if maxbytes < 0:
+            raise ValueError('maxbytes must be non-negative')
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return 'cache(entries = {}, nbytes = {}, maxbytes = {}, hits = {}, misses = {})'.format(
+            len(self), self.nbytes, self.maxbytes, self.hits, self.misses
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Look up a log, and mark it as recently used
+
+        Returns
+        -------
+        log : position_log or None
+            a copy of the cached log, or None on a miss
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            log = entry[0]
+        return clone(log)
+
+    def put(self, key, log):
+        """Add a log, evicting the least recently used logs if necessary"""
+        size = nbytes(log)
+        if size > self.maxbytes:
+            return
+
+        log = clone(log)
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (log, size)
+            self.nbytes += size
+            while self.nbytes > self.maxbytes:
+                _, (_, evicted) = self.entries.popitem(last = False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        """Remove all logs and reset the counters"""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def compute(self, dev, method, compute, **params):
+        """Look up a log, or compute and add it on a miss
+
+        Parameters
+        ----------
+        dev : deviation
+        method : str
+        compute : callable
+            called with no arguments to compute the log on a miss
+        **params
+            parameters of the computation, part of the key
+
+        Returns
+        -------
+        log : position_log
+        """
+        key = fingerprint(dev, method, **params)
+        log = self.get(key)
+        if log is None:
+            log = compute()
+            self.put(key, log)
+        return log
+
+def save(fname, log):
+    """Write a position log to an uncompressed npz file"""
+    arrays = {
+        'kind': np.array(type(log).__name__),
+        'units': np.array(getattr(log.source, 'units', None) or ''),
+        'md': log.source.md,
+        'inc': log.source.inc,
+        'azi': log.source.azi,
+        'depth': log.depth,
+        'northing': log.northing,
+        'easting': log.easting,
+    }
+    if hasattr(log, 'dls'):
+        arrays['dls'] = log.dls
+        arrays['course_length'] = log.course_length
+    np.savez(fname, **arrays)
+
+def load(fname):
+    """Read a position log written by save"""
+    with np.load(fname, allow_pickle = False) as f:
+        kind = str(f['kind'])
+        units = str(f['units']) if 'units' in f else ''
+        src = deviation(f['md'], f['inc'], f['azi'], units = units or None)
+        args = [src, f['depth'], f['northing'], f['easting']]
+        if kind == 'minimum_curvature':
+            course_length = float(f['course_length']) if 'course_length' in f else None
+            return minimum_curvature(*args, f['dls'], course_length = course_length)
+        if kind == 'radius_curvature':
+            return radius_curvature(*args)
+        if kind == 'tan_method':
+            return tan_method(*args)
+    raise ValueError('unknown position log kind {}'.format(kind))
+
+class disk_cache:
+    """Persistent cache for computed position logs
+
+    An on-disk cache, with the same interface as cache, that survives
+    restarts. Every log is one uncompressed npz file in directory, named by
+    its key. Files are written to a temporary file and atomically renamed into
+    place, so concurrent writers, also from different processes, never
+    expose partially written logs. When the total size of the directory
+    exceeds maxbytes, the least recently used files are removed.
+
+    The size of the directory is tracked with a running estimate, so a put
+    only scans the directory when the estimate exceeds maxbytes, or every
+    rescan puts, to account for files written by other processes.
+
+    Parameters
+    ----------
+    directory : str
+        cache directory, created if it does not exist
+    maxbytes : int
+        upper bound on the total size of the cached files
+
+    Examples
+    --------
+    Look up or compute logs from deviation objects:
+
+    >>> store = disk_cache('/tmp/wellpathpy')
+    >>> pos = dev.minimum_curvature(course_length = 30, cache = store)
+
+    Skip parsing unchanged csv files:
+
+    >>> pos = store.load_csv('well.csv', course_length = 30)
+    """
+    suffix = '.npz'
+    rescan = 256
+
+    def __init__(self, directory, maxbytes = 2**30):
+        if maxbytes < 0:
+            raise ValueError('maxbytes must be non-negative')
+        os.makedirs(directory, exist_ok = True)
+        self.directory = directory
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        # running estimate of the size of the directory, None until scanned
+        self.nbytes = None
+        self.puts = 0
+
+    def __repr__(self):
+        return 'disk_cache(directory = {}, maxbytes = {}, hits = {}, misses = {})'.format(
+            repr(self.directory), self.maxbytes, self.hits, self.misses
+        )
+
+    def path(self, key):
+        return os.path.join(self.directory, key.hex() + self.suffix)
+
+    def entries(self):
+        """(path, size, mtime) of the cached files, oldest first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                # removed by a concurrent writer
+                continue
+            entries.append((entry.path, st.st_size, st.st_mtime_ns))
+        return sorted(entries, key = lambda x: x[2])
+
+    def get(self, key):
+        """Look up a log, and mark it as recently used
+
+        Returns
+        -------
+        log : position_log or None
+        """
+        path = self.path(key)
+        try:
+            log = load(path)
+            os.utime(path)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # missing, evicted concurrently or unreadable - recompute
+            self.misses += 1
+            return None
+        self.hits += 1
+        return log
+
+    def put(self, key, log):
+        """Add a log, evicting the least recently used logs if necessary"""
+        path = self.path(key)
+        fd, tmp = tempfile.mkstemp(dir = self.directory, suffix = '.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                save(f, log)
+                size = f.tell()
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        self.puts += 1
+        if self.nbytes is None or self.puts % self.rescan == 0:
+            self.evict()
+            return
+
+        self.nbytes += size - replaced
+        if self.nbytes > self.maxbytes:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used files until the cache fits
+
+        This scans the directory, and resets the running size estimate.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.maxbytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.nbytes = total
+
+    def clear(self):
+        """Remove all cached files and reset the counters"""
+        for path, _, _ in self.entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def compute(self, dev, method, compute, **params):
+        """Look up a log, or compute and add it on a miss
+
+        See cache.compute
+        """
+        key = fingerprint(dev, method, **params)
+        log = self.get(key)
+        if log is None:
+            log = compute()
+            self.put(key, log)
+        return log
+
+    def load_csv(self, fname, method = 'minimum_curvature', by = 'content',
+                 delimiter = ',', skiprows = 1, **params):
+        """Read and compute a deviation file, unless it is already cached
+
+        The cache is consulted before the file is parsed, so unchanged files
+        are neither parsed nor computed.
+
+        Parameters
+        ----------
+        fname : str
+            path to a CSV file, see read.read_csv
+        method : {'minimum_curvature', 'radius_curvature', 'tan_method'}
+            the deviation method to compute the log with
+        by : {'content', 'mtime'}
+            how to detect changed files, see file_fingerprint
+        delimiter : str
+        skiprows : int
+            passed to read.read_csv
+        **params
+            passed to the deviation method, e.g. course_length
+
+        Returns
+        -------
+        log : position_log
+        """
+        key = file_fingerprint(
+            fname,
+            method,
+            by = by,
+            delimiter = delimiter,
+            skiprows = skiprows,
+            **{k: repr(v) for k, v in params.items()}
+        )
+        log = self.get(key)
+        if log is None:
+            md, inc, azi = read_csv(fname, delimiter = delimiter, skiprows = skiprows)
+            log = getattr(deviation(md, inc, azi), method)(**params)
+            self.put(key, log)
+        return log
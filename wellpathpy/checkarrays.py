@@ -1,5 +1,8 @@
 import numpy as np
 
+from .instrument import timed
+
+@timed('checkarrays')
 def checkarrays(md, inc, azi):
     """
     Assure basic preconditions are met, and convert input (md, inc, azi) to
@@ -60,6 +63,7 @@ def checkarrays(md, inc, azi):
 
     return md, inc, azi
 
+@timed('checkarrays_tvd')
 def checkarrays_tvd(tvd, northing, easting):
     """
     Assure basic preconditions are met, and convert input (tvd, northing, easting) to
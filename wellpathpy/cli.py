@@ -0,0 +1,356 @@
+"""Command line batch processor
+
+Run the read_csv -> deviation -> position log -> to_wellhead -> to_tvdss
+pipeline over many wells, and stream the positions to stdout, or to one
+csv file per well in an output directory. Every station is written as md,
+easting, northing, depth and dls, the dogleg severity in degrees per
+--course-length.
+
+Input is deviation csv files (md, inc, azi, see read.read_csv), directories
+of csv files, or - for stdin in the long format, one station per line:
+
+    well,md,inc,azi
+    A-1,0,0,0
+    A-1,100,5,45
+    B-2,0,0,0
+    ...
+
+where the stations of a well are consecutive. Only one well per job is held
+in memory at any time, so arbitrarily long inputs can be streamed.
+
+Examples
+--------
+    $ wellpathpy surveys/ --manifest headers.json --step 1 --jobs 8 > positions.csv
+    $ cat long.csv | wellpathpy - --course-length 100 -o positions/
+"""
+import argparse
+import collections
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+from .header import read_header_json
+from .read import csv_files, read_csv
+from .geometry import dogleg
+from .position_log import deviation
+from . import azimuth
+from . import units
+
+methods = ('minimum_curvature', 'radius_curvature', 'tan_method')
+
+def read_long(f, delimiter = ',', skiprows = 1):
+    """Read wells from a stream in the long format, one well at a time
+
+    Yields
+    ------
+    well : str
+    md, inc, azi : array_like of float
+    """
+    reader = csv.reader(f, delimiter = delimiter)
+    for _ in range(skiprows):
+        next(reader, None)
+
+    well, rows = None, []
+    for row in reader:
+        if not row:
+            continue
+        if row[0] != well:
+            if rows:
+                yield (well,) + tuple(np.array(rows, dtype = float).T)
+            well, rows = row[0], []
+        rows.append(row[1:4])
+    if rows:
+        yield (well,) + tuple(np.array(rows, dtype = float).T)
+
+def wells(inputs, stdin, delimiter = ',', skiprows = 1):
+    """All wells of the inputs, one at a time, as (name, source)
+
+    source is either a file name, or a (md, inc, azi) tuple read from stdin.
+    Files are read by the worker, so only names are passed between processes.
+    """
+    for path in inputs:
+        if path == '-':
+            for well, md, inc, azi in read_long(stdin, delimiter, skiprows):
+                yield well, (md, inc, azi)
+        else:
+            for fname in csv_files([path]):
+                name = os.path.splitext(os.path.basename(fname))[0]
+                yield name, fname
+
+def load_manifest(fname):
+    """Read a manifest of well name -> header
+
+    The manifest is a JSON object, where every value is either a header
+    object, or the path to a header file, relative to the manifest.
+    """
+    with open(fname) as f:
+        manifest = json.load(f)
+
+    root = os.path.dirname(fname)
+    headers = {}
+    for well, header in manifest.items():
+        if isinstance(header, str):
+            headers[well] = read_header_json(os.path.join(root, header))
+        else:
+            headers[well] = read_header_json(io.StringIO(json.dumps(header)))
+    return headers
+
+def survey_dls(dev, course_length):
+    """Dogleg severity of a survey, in degrees per course_length
+
+    The same as minimum_curvature.dls, for the methods that do not compute it
+    """
+    inc = np.deg2rad(dev.inc)
+    azi = np.deg2rad(dev.azi)
+    dls = np.zeros(len(dev.md))
+    dl = np.rad2deg(dogleg(inc[:-1], inc[1:], azi[:-1], azi[1:]))
+    dls[1:] = dl * course_length / np.diff(dev.md)
+    return dls
+
+def process(name, source, header, options):
+    """Run the pipeline for a single well
+
+    Returns
+    -------
+    name : str
+    md, easting, northing, depth, dls : array_like of float
+    """
+    if isinstance(source, str):
+        md, inc, azi = read_csv(
+            source,
+            delimiter = options['delimiter'],
+            skiprows = options['skiprows'],
+        )
+    else:
+        md, inc, azi = source
+
+    if header is not None:
+        azi, _ = azimuth.from_header(azi, header, target = 'grid')
+
+    dev = deviation(md, inc, azi, units = options['units'])
+
+    # the course length and step are in the units of the surveys
+    course_length = options['course_length']
+    if course_length is None:
+        course_length = units.course_length(dev.units)
+    step = options['step']
+    if dev.units is not None:
+        # convert once, so that everything downstream is in metres
+        scale = units.factor(dev.units)
+        course_length = course_length * scale
+        if step is not None:
+            step = step * scale
+        dev = dev.to_units('m')
+
+    method = options['method']
+    if method == 'minimum_curvature':
+        pos = dev.minimum_curvature(course_length = course_length)
+    elif method == 'radius_curvature':
+        pos = dev.radius_curvature()
+    else:
+        pos = dev.tan_method(choice = options['choice'])
+
+    if step is not None:
+        depths = np.arange(dev.md[0], dev.md[-1], step)
+        depths = np.append(depths, dev.md[-1])
+        pos = pos.resample(depths = depths)
+        # resample drops depths past the last station and duplicates, e.g.
+        # when arange overshoots by rounding, so take md from the result
+        md = pos.source.md
+    else:
+        md = dev.md
+
+    if method == 'minimum_curvature':
+        dls = pos.dls
+    else:
+        dls = survey_dls(dev, course_length)
+
+    if header is not None:
+        pos.to_header(header, inplace = True)
+
+    return name, md, pos.easting, pos.northing, pos.depth, dls
+
+def run(sources, headers, options, jobs = 1):
+    """Process the wells, and yield the results in input order
+
+    With more than one job, the wells are processed by a pool of worker
+    processes. At most 2 * jobs wells are in flight, so memory use does not
+    grow with the input.
+
+    Yields
+    ------
+    name : str
+    result : tuple or Exception
+        the output of process, or the error
+    """
+    def header(name):
+        if isinstance(headers, dict):
+            return headers.get(name)
+        return headers
+
+    if jobs == 1:
+        for name, source in sources:
+            try:
+                yield name, process(name, source, header(name), options)
+            except Exception as e:
+                yield name, e
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers = jobs) as pool:
+        pending = collections.deque()
+        for name, source in sources:
+            pending.append((name, pool.submit(process, name, source, header(name), options)))
+            while len(pending) >= 2 * jobs:
+                yield result(*pending.popleft())
+        while pending:
+            yield result(*pending.popleft())
+
+def result(name, future):
+    try:
+        return name, future.result()
+    except Exception as e:
+        return name, e
+
+columns = 'md,easting,northing,depth,dls'
+
+def write_long(out, name, md, easting, northing, depth, dls, fmt = '%.3f'):
+    """Write the positions of a well in the long format"""
+    row = name.replace('%', '%%') + ',' + ','.join([fmt] * 5)
+    np.savetxt(out, np.column_stack([md, easting, northing, depth, dls]), fmt = row)
+
+def output_path(directory, name):
+    """The csv file of a well in the output directory
+
+    Raises
+    ------
+    ValueError
+        If the well name is not a plain file name, e.g. it has path
+        separators, so that the file would end up outside directory
+    """
+    separators = [os.sep, os.altsep, '/', '\\']
+    if (name in ('', '.', '..')
+        or any(sep and sep in name for sep in separators)
+        or os.path.isabs(name)):
+        raise ValueError('well name {!r} is not a valid file name'.format(name))
+    return os.path.join(directory, name + '.csv')
+
+def write_well(fname, md, easting, northing, depth, dls, fmt = '%.3f'):
+    """Write the positions of a well to its own csv file"""
+    np.savetxt(
+        fname,
+        np.column_stack([md, easting, northing, depth, dls]),
+        fmt = fmt,
+        delimiter = ',',
+        header = columns,
+        comments = '',
+    )
+
+def parser():
+    p = argparse.ArgumentParser(
+        prog = 'wellpathpy',
+        description = 'Compute well positions from deviation surveys',
+    )
+    p.add_argument('inputs', nargs = '+',
+                   help = 'csv files, directories of csv files, or - for '
+                          'stdin in the long format (well,md,inc,azi)')
+    p.add_argument('-o', '--output',
+                   help = 'write one csv per well to this directory, '
+                          'instead of the long format to stdout')
+    p.add_argument('-m', '--method', choices = methods, default = 'minimum_curvature')
+    p.add_argument('--choice', choices = ('avg', 'bal', 'high', 'low'), default = 'avg',
+                   help = 'tangential method variant, see tan.tan_method')
+    p.add_argument('--units',
+                   help = 'length units of the surveys, e.g. m or ft. The surveys '
+                          'and headers are converted to metres on input, and '
+                          'the positions are written in metres')
+    p.add_argument('--course-length', type = float,
+                   help = 'dogleg normalisation in the units of the surveys, '
+                          'defaults to 30 for m and 100 for ft')
+    p.add_argument('--step', type = float,
+                   help = 'resample the positions every step md, in the units '
+                          'of the surveys (minimum_curvature only)')
+    headers = p.add_mutually_exclusive_group()
+    headers.add_argument('--header',
+                         help = 'header json applied to every well')
+    headers.add_argument('--manifest',
+                         help = 'json object of well name -> header, or path '
+                                'to a header json')
+    p.add_argument('-j', '--jobs', type = int, default = 1,
+                   help = 'number of worker processes')
+    p.add_argument('--delimiter', default = ',')
+    p.add_argument('--skiprows', type = int, default = 1)
+    p.add_argument('--fmt', default = '%.3f', help = 'output number format')
+    return p
+
+def main(argv = None):
+    args = parser().parse_args(argv)
+    if args.step is not None:
+        if args.method != 'minimum_curvature':
+            parser().error('--step is only supported with minimum_curvature')
+        if not args.step > 0:
+            parser().error('--step must be positive')
+    if args.jobs < 1:
+        parser().error('--jobs must be positive')
+    if args.units is not None:
+        try:
+            units.normalize(args.units)
+        except ValueError as e:
+            parser().error(str(e))
+
+    headers = None
+    if args.header:
+        headers = read_header_json(args.header)
+    if args.manifest:
+        headers = load_manifest(args.manifest)
+
+    options = {
+        'method': args.method,
+        'choice': args.choice,
+        'units': args.units,
+        'course_length': args.course_length,
+        'step': args.step,
+        'delimiter': args.delimiter,
+        'skiprows': args.skiprows,
+    }
+
+    if args.output:
+        os.makedirs(args.output, exist_ok = True)
+    else:
+        sys.stdout.write('well,' + columns + '\n')
+
+    failed = 0
+    sources = wells(args.inputs, sys.stdin, args.delimiter, args.skiprows)
+    try:
+        for name, res in run(sources, headers, options, jobs = args.jobs):
+            if isinstance(res, Exception):
+                failed += 1
+                sys.stderr.write('{}: {}: {}\n'.format(name, type(res).__name__, res))
+                continue
+
+            _, md, easting, northing, depth, dls = res
+            if args.output:
+                try:
+                    fname = output_path(args.output, name)
+                except ValueError as e:
+                    failed += 1
+                    sys.stderr.write('{}: {}: {}\n'.format(name, type(e).__name__, e))
+                    continue
+                write_well(fname, md, easting, northing, depth, dls, fmt = args.fmt)
+            else:
+                write_long(sys.stdout, name, md, easting, northing, depth, dls,
+                           fmt = args.fmt)
+    except BrokenPipeError:
+        # the reader went away, e.g. wellpathpy ... | head. Python would
+        # otherwise complain again when flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
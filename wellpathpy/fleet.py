@@ -0,0 +1,304 @@
+import numpy as np
+
+from .position_log import deviation
+from . import azimuth
+from . import units as unitsystem
+
+def checkfleet(md, inc, azi, offsets):
+    """
+    Assure basic preconditions are met for a fleet in the ragged layout, and
+    convert input (md, inc, azi, offsets) to numpy arrays.
+
+    This is the fleet equivalent of checkarrays, and ensures the same
+    properties for every well without slicing the arrays.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        the surveys of all wells, concatenated
+    offsets : array_like of int
+        well i is md[offsets[i]:offsets[i + 1]]
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+    offsets : array_like of int
+
+    Raises
+    ------
+    ValueError
+        If md, inc, or azi, are of different shapes
+        If the md values are not strictly increasing within every well
+        If NaN values are included in md, inc or azi
+        If offsets do not partition the stations
+    """
+    md = np.asarray(md, dtype = float)
+    inc = np.asarray(inc, dtype = float)
+    azi = np.asarray(azi, dtype = float)
+    offsets = np.asarray(offsets, dtype = np.int64)
+
+    for prop, arr in {'md': md, 'inc': inc, 'azi': azi}.items():
+        if np.isnan(arr).any():
+            raise ValueError('{} cannot contain nan values'.format(prop))
+
+    if not ((0 <= inc) & (inc < 180)).all():
+        raise ValueError('all inc values must be in range 0 <= inc < 180')
+
+    if not ((0 <= azi) & (azi < 360)).all():
+        raise ValueError('all azi values must be in range 0 <= azi < 360')
+
+    if not (md.shape == inc.shape == azi.shape) or md.ndim != 1:
+        raise ValueError('md, inc, and azi must be the same 1D shape')
+
+    if offsets.ndim != 1 or len(offsets) < 1:
+        raise ValueError('offsets must be a non-empty 1D array')
+
+    if offsets[0] != 0 or offsets[-1] != len(md) or (np.diff(offsets) < 0).any():
+        raise ValueError('offsets must increase from 0 to the number of stations')
+
+    increasing = md[1:] > md[:-1]
+    # the first station of every well is exempt, as it follows another well
+    first = offsets[1:-1]
+    first = first[(first > 0) & (first < len(md))]
+    increasing[first - 1] = True
+    if not increasing.all():
+        raise ValueError('md must have strictly increasing values')
+
+    return md, inc, azi, offsets
+
+class fleet:
+    """Fleet
+
+    Many deviation surveys in the ragged layout: the (md, inc, azi) of all
+    wells are concatenated into three flat arrays, and offsets gives the first
+    station of every well. This makes whole-fleet operations a single
+    vectorised pass, instead of a python loop over deviation objects.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        the surveys of all wells, concatenated
+    offsets : array_like of int
+        well i is md[offsets[i]:offsets[i + 1]], len(offsets) is the number of
+        wells + 1
+    names : list, optional
+        well names or ids
+    units : str or list of str, optional
+        length unit of md, for all wells or one per well. Fleets of mixed
+        units should be converted once with to_units before computing
+
+    Examples
+    --------
+    >>> f = fleet.from_deviations([dev1, dev2, dev3])
+    >>> len(f)
+    3
+    >>> dev2 = f[1]
+    """
+    def __init__(self, md, inc, azi, offsets, names = None, units = None):
+        md, inc, azi, offsets = checkfleet(md, inc, azi, offsets)
+        self.md = md
+        self.inc = inc
+        self.azi = azi
+        self.offsets = offsets
+        if names is None:
+            names = list(range(len(offsets) - 1))
+        if len(names) != len(offsets) - 1:
+            raise ValueError('names must have one entry per well')
+        self.names = list(names)
+
+        if units is not None:
+            if isinstance(units, str):
+                units = unitsystem.normalize(units)
+            else:
+                units = [unitsystem.normalize(x) for x in units]
+                if len(units) != len(self):
+                    raise ValueError('units must be a string, or one per well')
+        self.units = units
+
+    def __repr__(self):
+        return 'fleet(wells = {}, stations = {})'.format(len(self), len(self.md))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        units = self.units
+        if units is not None and not isinstance(units, str):
+            units = units[i]
+        return deviation(self.md[start:stop], self.inc[start:stop], self.azi[start:stop],
+                         units = units)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def lengths(self):
+        """Number of stations per well"""
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_deviations(cls, devs, names = None):
+        """Make a fleet from deviation objects
+
+        Parameters
+        ----------
+        devs : iterable of deviation
+        names : list, optional
+
+        Returns
+        -------
+        fleet : fleet
+        """
+        devs = list(devs)
+        counts = [len(dev.md) for dev in devs]
+        offsets = np.concatenate([[0], np.cumsum(counts, dtype = np.int64)])
+        if not devs:
+            empty = np.zeros(0)
+            return cls(empty, empty, empty, offsets, names = names)
+
+        units = [getattr(dev, 'units', None) for dev in devs]
+        if len(set(units)) == 1:
+            units = units[0]
+        elif None in units:
+            raise ValueError('units must be known for all deviations, or none')
+
+        return cls(
+            np.concatenate([dev.md  for dev in devs]),
+            np.concatenate([dev.inc for dev in devs]),
+            np.concatenate([dev.azi for dev in devs]),
+            offsets,
+            names = names,
+            units = units,
+        )
+
+    def copy(self):
+        return fleet(np.copy(self.md), np.copy(self.inc), np.copy(self.azi),
+                     np.copy(self.offsets), names = self.names, units = self.units)
+
+    def repeat(self, values):
+        """Broadcast per-well values to every station
+
+        Parameters
+        ----------
+        values : float or array_like of float
+            scalar, one value per well or one value per station
+
+        Returns
+        -------
+        values : array_like of float
+            one value per station
+        """
+        values = np.asarray(values, dtype = float)
+        if values.ndim == 0 or values.shape == self.md.shape:
+            return np.broadcast_to(values, self.md.shape)
+        if values.shape == (len(self),):
+            return np.repeat(values, self.lengths)
+        raise ValueError('values must be scalar, per-well or per-station')
+
+    def convert_azimuth(self, declination = 0, convergence = 0,
+                        source = 'magnetic', target = 'grid'):
+        """Convert the azimuth reference of all wells
+
+        This function calls azimuth.convert for the whole fleet.
+
+        Returns
+        -------
+        fleet : fleet
+            a new fleet with converted azimuths
+        """
+        azi = azimuth.convert(
+            self.azi,
+            declination = declination,
+            convergence = convergence,
+            source = source,
+            target = target,
+            offsets = self.offsets,
+        )
+        return fleet(self.md, self.inc, azi, self.offsets, names = self.names,
+                     units = self.units)
+
+    def to_units(self, units = unitsystem.canonical):
+        """Convert md of all wells to the same units
+
+        This function calls units.convert for the whole fleet, so a fleet of
+        mixed units is converted in a single pass.
+
+        Parameters
+        ----------
+        units : str
+            target units, metres by default
+
+        Returns
+        -------
+        fleet : fleet
+            a new fleet in units
+        """
+        if self.units is None:
+            raise ValueError('the units of the fleet are unknown')
+        md = unitsystem.convert(self.md, self.units, units, offsets = self.offsets)
+        return fleet(md, self.inc, self.azi, self.offsets, names = self.names,
+                     units = units)
+
+class fleet_log:
+    """Fleet position log
+
+    The computed positions of many wells in the ragged layout, the fleet
+    equivalent of position_log. Well i is [offsets[i]:offsets[i + 1]] of every
+    array.
+
+    Parameters
+    ----------
+    md : array_like of float
+    depth : array_like of float
+    northing : array_like of float
+    easting : array_like of float
+    dls : array_like of float
+    offsets : array_like of int
+    names : list, optional
+    errors : dict, optional
+        well name -> error message, for wells that could not be computed.
+        Their positions are nan
+    """
+    def __init__(self, md, depth, northing, easting, dls, offsets,
+                 names = None, errors = None):
+        self.md = md
+        self.depth = depth
+        self.northing = northing
+        self.easting = easting
+        self.dls = dls
+        self.offsets = np.asarray(offsets, dtype = np.int64)
+        if names is None:
+            names = list(range(len(self.offsets) - 1))
+        self.names = list(names)
+        self.errors = {} if errors is None else errors
+
+    def __repr__(self):
+        return 'fleet_log(wells = {}, stations = {}, errors = {})'.format(
+            len(self), len(self.md), len(self.errors)
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def copy(self):
+        return fleet_log(np.copy(self.md), np.copy(self.depth), np.copy(self.northing),
+                         np.copy(self.easting), np.copy(self.dls), np.copy(self.offsets),
+                         names = self.names, errors = dict(self.errors))
+
+    def __getitem__(self, i):
+        """The (md, depth, northing, easting, dls) of well i, as views"""
+        s = slice(self.offsets[i], self.offsets[i + 1])
+        return self.md[s], self.depth[s], self.northing[s], self.easting[s], self.dls[s]
+
+    @property
+    def lengths(self):
+        """Number of stations per well"""
+        return np.diff(self.offsets)
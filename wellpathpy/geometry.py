@@ -228,6 +228,115 @@ def angle_between(u, v):
     angle = 2.0 * np.arctan(norm_sub / norm_add)
     return angle[0] if is_1d else angle
 
+def half_dogleg(inc_upper, inc_lower, azi_upper, azi_lower,
+                sin_upper = None, sin_lower = None):
+    """Sine and cosine of half the dogleg between directions (inc, azi)
+
+    The dogleg is computed directly from the angles, with the half-angle
+    (haversine) form
+
+        sin²(dl/2) = sin²((inc_l - inc_u)/2)
+                   + sin(inc_u) sin(inc_l) sin²((azi_l - azi_u)/2)
+
+        cos²(dl/2) = cos²((inc_l - inc_u)/2)
+                   - sin(inc_u) sin(inc_l) sin²((azi_l - azi_u)/2)
+
+    which, unlike the angle between direction vectors, keeps full relative
+    precision for very small doglegs, and does not build (n, 3) direction
+    vectors. Both terms are computed, so that 2 * arctan2(sin, cos) is also
+    accurate near dl = pi.
+
+    Parameters
+    ----------
+    inc_upper : array_like of float
+    inc_lower : array_like of float
+    azi_upper : array_like of float
+    azi_lower : array_like of float
+        inclination and azimuth in radians
+    sin_upper : array_like of float, optional
+    sin_lower : array_like of float, optional
+        sin(inc_upper) and sin(inc_lower), if the caller already has them
+
+    Returns
+    -------
+    sin : array_like of float
+    cos : array_like of float
+        sin(dl/2) and cos(dl/2), both >= 0
+
+    See also
+    --------
+    dogleg
+    """
+    if sin_upper is None:
+        sin_upper = np.sin(inc_upper)
+    if sin_lower is None:
+        sin_lower = np.sin(inc_lower)
+
+    half_inc = 0.5 * np.subtract(inc_lower, inc_upper)
+    turn = np.sin(0.5 * np.subtract(azi_lower, azi_upper))
+    turn = turn * turn * sin_upper * sin_lower
+
+    sin = np.sin(half_inc)
+    cos = np.cos(half_inc)
+    sin = sin * sin + turn
+    cos = cos * cos - turn
+    # rounding can push the squares just outside [0, 1]
+    return np.sqrt(np.clip(sin, 0, 1)), np.sqrt(np.clip(cos, 0, 1))
+
+def dogleg(inc_upper, inc_lower, azi_upper, azi_lower):
+    """The dogleg between directions (inc, azi), in radians
+
+    This is angle_between the direction vectors, computed with half_dogleg.
+
+    Examples
+    --------
+    >>> dogleg(0, np.pi / 2, 0, 0)
+    1.5707963267948966
+    """
+    sin, cos = half_dogleg(inc_upper, inc_lower, azi_upper, azi_lower)
+    return 2.0 * np.arctan2(sin, cos)
+
+def slerp(u, v, t):
+    """Spherical linear interpolation between (arrays of) unit vectors
+
+    Interpolate along the great circle from u to v. This is the direction of
+    the well bore along a minimum curvature arc, where u and v are the
+    tangents at the upper and lower survey stations.
+
+    Parameters
+    ----------
+    u : array_like
+        unit vector, or (n, 3) unit vectors
+    v : array_like
+        unit vector, or (n, 3) unit vectors
+    t : array_like of float
+        0 <= t <= 1, the fraction of the angle between u and v
+
+    Returns
+    -------
+    w : array_like
+        interpolated unit vectors
+
+    Notes
+    -----
+    When u and v are parallel, this reduces to u.
+
+    Examples
+    --------
+    >>> slerp((1, 0, 0), (0, 1, 0), 0.5)
+    array([0.70710678, 0.70710678, 0.        ])
+    """
+    u = np.asarray(u, dtype = float)
+    v = np.asarray(v, dtype = float)
+    t = np.asarray(t, dtype = float)
+    omega = angle_between(u, v)
+    sin = np.sin(omega)
+    straight = sin == 0
+    sin = np.where(straight, 1, sin)
+    v0 = np.where(straight, 1 - t, np.sin((1 - t) * omega) / sin)
+    v1 = np.where(straight, t, np.sin(t * omega) / sin)
+    return v0[..., np.newaxis] * u + v1[..., np.newaxis] * v
+
 def normal_vector(v1, v2):
     """Normal vector to plane given by vectors v1 and v2
 
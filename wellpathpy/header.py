@@ -1,5 +1,7 @@
 import json
 
+from .azimuth import references
+
 def read_header_json(fname):
     """Read deviation header
 
@@ -16,7 +18,7 @@ def read_header_json(fname):
     -----
     required keys: elevation_units, elevation, surface_coordinates_units, surface_easting, surface_northing
 
-    optional key: datum
+    optional keys: datum, azimuth_reference, declination, grid_convergence
 
     datum : str
         kb, dfe or rt. datum is not used in calculation
@@ -38,6 +40,17 @@ def read_header_json(fname):
     surface_northing : float
         wellhead surface location in surface_coordinates_units north of reference
 
+    azimuth_reference : str
+        magnetic, true or grid. The north reference of the survey azimuths,
+        grid if not given
+
+    declination : float
+        magnetic declination in degrees, positive east
+
+    grid_convergence : float
+        grid convergence in degrees, positive when grid north is east of true
+        north
+
     Returns
     -------
     header : dict
@@ -65,4 +78,13 @@ def read_header_json(fname):
     for num_value in numeric_values:
         header[num_value] = float(header[num_value])
 
+    for num_value in ['declination', 'grid_convergence']:
+        if num_value in header:
+            header[num_value] = float(header[num_value])
+
+    reference = header.get('azimuth_reference', 'grid')
+    if reference not in references:
+        msg = 'unknown azimuth_reference {}, must be one of {}'
+        raise ValueError(msg.format(reference, ' '.join(references)))
+
     return header
\ No newline at end of file
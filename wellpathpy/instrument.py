@@ -0,0 +1,198 @@
+"""Per-stage timing instrumentation
+
+The library is instrumented with named stages, e.g. checkarrays,
+minimum_curvature, minimum_curvature.cumsum, resample and read_csv. The
+stages are not recorded unless a profiler is active, and when none is, a
+stage costs a single global lookup.
+
+Examples
+--------
+>>> with profiler() as prof:
+...     pos = dev.minimum_curvature().resample(depths = depths)
+>>> prof.stats['minimum_curvature.cumsum']
+{'calls': 1, 'seconds': 0.0012, 'bytes': 0}
+>>> prof.to_json()
+"""
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+active = None
+
+class nullstage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+null = nullstage()
+
+def stage(name):
+    """Context manager that records the enclosed block as stage name
+
+    Parameters
+    ----------
+    name : str
+
+    Examples
+    --------
+    >>> with stage('minimum_curvature.cumsum'):
+    ...     tvd = np.cumsum(tvd)
+    """
+    if active is None:
+        return null
+    return active.stage(name)
+
+def timed(name):
+    """Decorator that records every call to the function as stage name"""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return f(*args, **kwargs)
+            with active.stage(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class recording:
+    """A stage being recorded by a profiler"""
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.prof.enter(self)
+        return self
+
+    def __exit__(self, *args):
+        self.prof.exit(self)
+        return False
+
+class profiler:
+    """Record per-stage wall time, call counts and allocated bytes
+
+    While the profiler is active, every stage adds its wall time and call
+    count to stats[name]. Stages may nest, and the time of the inner stage is
+    included in the outer. The profiler can be used from many threads.
+
+    Parameters
+    ----------
+    memory : bool
+        also record the peak number of bytes allocated by every stage, as
+        traced by tracemalloc. This makes the instrumented code considerably
+        slower, and is off by default
+    callback : callable, optional
+        called as callback(name, seconds, nbytes) when a stage ends, e.g. to
+        forward the measurements to a metrics system. nbytes is None unless
+        memory is True
+
+    Attributes
+    ----------
+    stats : dict
+        name -> {'calls': int, 'seconds': float, 'bytes': int}. bytes is the
+        largest peak allocation of any call
+
+    Examples
+    --------
+    >>> with profiler(memory = True) as prof:
+    ...     md, inc, azi = read_csv(fname)
+    ...     pos = deviation(md, inc, azi).minimum_curvature()
+    >>> stats = prof.to_dict()
+    """
+    def __init__(self, memory = False, callback = None):
+        if memory and not hasattr(tracemalloc, 'reset_peak'):
+            raise RuntimeError('memory profiling requires python 3.9 or newer')
+        self.memory = memory
+        self.callback = callback
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.previous = None
+        self.tracing = False
+
+    def __enter__(self):
+        global active
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+        self.previous = active
+        active = self
+        return self
+
+    def __exit__(self, *args):
+        global active
+        active = self.previous
+        self.previous = None
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        return False
+
+    def stage(self, name):
+        return recording(self, name)
+
+    def stack(self):
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def enter(self, rec):
+        if self.memory:
+            # the peak is reset for every stage, so the peak of the enclosing
+            # stage so far is saved, and merged back in on exit
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self.stack()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            rec.base = current
+            rec.peak = current
+            tracemalloc.reset_peak()
+        self.stack().append(rec)
+        rec.start = time.perf_counter()
+
+    def exit(self, rec):
+        seconds = time.perf_counter() - rec.start
+        stack = self.stack()
+        stack.pop()
+
+        nbytes = None
+        if self.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            rec.peak = max(rec.peak, peak)
+            nbytes = rec.peak - rec.base
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, rec.peak)
+            tracemalloc.reset_peak()
+
+        with self.lock:
+            entry = self.stats.setdefault(rec.name, {
+                'calls': 0,
+                'seconds': 0.0,
+                'bytes': 0,
+            })
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            if nbytes is not None:
+                entry['bytes'] = max(entry['bytes'], nbytes)
+
+        if self.callback is not None:
+            self.callback(rec.name, seconds, nbytes)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def to_dict(self):
+        """The stats, as a plain dict of dicts"""
+        with self.lock:
+            return {name: dict(entry) for name, entry in self.stats.items()}
+
+    def to_json(self, **kwargs):
+        """The stats, as a JSON string. kwargs are passed to json.dumps"""
+        return json.dumps(self.to_dict(), sort_keys = True, **kwargs)
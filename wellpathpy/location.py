@@ -1,6 +1,7 @@
 import numpy as np
 
 from .checkarrays import checkarrays_tvd
+from . import units as unitsystem
 
 def to_wellhead(tvd, northing, easting, surface_northing, surface_easting):
     """Move deviation to wellhead location.
@@ -111,3 +112,205 @@ def to_tvdss(tvd, northing, easting, datum_elevation):
     tvdss = datum_elevation - tvd
 
     return tvdss, northing, easting
+
+class transform:
+    """Location transform
+
+    A chain of per-axis affine maps of (tvd, northing, easting), e.g. moving
+    to the wellhead, shifting to subsea depths and converting units. The
+    chain is folded into a single scale and offset per axis when it is
+    built, so applying it is a single pass over the positions, regardless of
+    the length of the chain.
+
+    Transforms are immutable, and every step returns a new transform that
+    applies the step after the existing chain.
+
+    Parameters
+    ----------
+    scale : array_like of float
+        (tvd, northing, easting) scale factors
+    offset : array_like of float
+        (tvd, northing, easting) offsets, added after scaling
+
+    Notes
+    -----
+    The scale and offset of every axis can be scalars, per-station arrays or,
+    for fleet logs, per-well arrays, which are broadcast to all stations of
+    the well.
+
+    Examples
+    --------
+    Move to the wellhead and to subsea depths, in a single copy:
+
+    >>> t = transform().to_wellhead(sn, se).to_tvdss(elevation)
+    >>> pos = t.apply(pos)
+
+    Move all wells of a fleet to their wellheads, in place:
+
+    >>> t = transform().to_wellhead(heads_northing, heads_easting)
+    >>> _ = t.apply(log, inplace = True)
+    """
+    def __init__(self, scale = (1, 1, 1), offset = (0, 0, 0)):
+        if len(scale) != 3 or len(offset) != 3:
+            raise ValueError('scale and offset must have 3 (tvd, northing, easting) values')
+        def param(x):
+            if np.ndim(x) == 0:
+                return float(x)
+            return np.asarray(x, dtype = float)
+
+        self.scale = tuple(param(x) for x in scale)
+        self.offset = tuple(param(x) for x in offset)
+
+    def __repr__(self):
+        return 'transform(scale = {}, offset = {})'.format(self.scale, self.offset)
+
+    def then(self, other):
+        """This transform followed by other"""
+        scale = [a2 * a1 for a1, a2 in zip(self.scale, other.scale)]
+        offset = [a2 * b1 + b2 for b1, a2, b2 in zip(self.offset, other.scale, other.offset)]
+        return transform(scale, offset)
+
+    def shift(self, tvd = 0, northing = 0, easting = 0):
+        """Translate the positions"""
+        return self.then(transform(offset = (tvd, northing, easting)))
+
+    def to_wellhead(self, surface_northing, surface_easting):
+        """Move to the wellhead, see location.to_wellhead"""
+        return self.shift(northing = surface_northing, easting = surface_easting)
+
+    def to_zero(self, surface_northing, surface_easting):
+        """Move to zero coordinates, see location.to_zero"""
+        return self.shift(northing = -np.asarray(surface_northing),
+                          easting = -np.asarray(surface_easting))
+
+    def to_tvdss(self, datum_elevation):
+        """Shift tvd to tvdss, see location.to_tvdss"""
+        return self.then(transform(scale = (-1, 1, 1), offset = (datum_elevation, 0, 0)))
+
+    @classmethod
+    def from_header(cls, header, units = None):
+        """Move to the wellhead and to subsea depths given by a header
+
+        Parameters
+        ----------
+        header : dict
+            see header.read_header_json
+        units : str, optional
+            units of the positions. The surface coordinates and elevation are
+            converted from the surface_coordinates_units and elevation_units
+            of the header. If not given, the header is assumed to be in the
+            units of the positions
+
+        Returns
+        -------
+        t : transform
+        """
+        surface = elevation = 1.0
+        if units is not None:
+            surface = unitsystem.factor(header['surface_coordinates_units'], units)
+            elevation = unitsystem.factor(header['elevation_units'], units)
+
+        return cls().to_wellhead(
+            header['surface_northing'] * surface,
+            header['surface_easting'] * surface,
+        ).to_tvdss(header['elevation'] * elevation)
+
+    def to_units(self, factor):
+        """Scale all positions by factor, e.g. 0.3048 for ft -> m"""
+        return self.then(transform(scale = (factor, factor, factor)))
+
+    def is_translation(self):
+        """True if the transform is a translation by scalars"""
+        return (all(np.ndim(a) == 0 and a == 1 for a in self.scale)
+            and all(np.ndim(b) == 0 for b in self.offset))
+
+    def __call__(self, tvd, northing, easting, out = None):
+        """Apply the transform to arrays
+
+        Parameters
+        ----------
+        tvd : array_like of float
+        northing : array_like of float
+        easting : array_like of float
+        out : tuple of array_like, optional
+            (tvd, northing, easting) arrays to write the result to. They may
+            be the inputs, to transform in place
+
+        Returns
+        -------
+        tvd : array_like of float
+        northing : array_like of float
+        easting : array_like of float
+        """
+        tvd, northing, easting = checkarrays_tvd(tvd, northing, easting)
+        return self.affine(tvd, northing, easting, out = out)
+
+    def affine(self, tvd, northing, easting, out = None):
+        """Apply the transform to arrays, without validating them"""
+        if out is None:
+            out = (None, None, None)
+
+        result = []
+        for x, a, b, dst in zip((tvd, northing, easting), self.scale, self.offset, out):
+            if np.ndim(a) == 0 and a == 1:
+                result.append(np.add(x, b, out = dst))
+            else:
+                dst = np.multiply(x, a, out = dst)
+                dst += b
+                result.append(dst)
+        return tuple(result)
+
+    def apply(self, log, inplace = False):
+        """Apply the transform to a position log or a fleet log
+
+        Parameters
+        ----------
+        log : position_log or fleet.fleet_log
+        inplace : bool
+            transform log in place, instead of a copy of it. New depth,
+            northing and easting arrays are bound to the log, the arrays it
+            had are not modified, as they may be shared
+
+        Returns
+        -------
+        log : position_log or fleet.fleet_log
+        """
+        t = self
+        fleet = hasattr(log, 'offsets')
+        if fleet:
+            # broadcast per-well parameters to the stations of every well
+            lengths = np.diff(log.offsets)
+            wells = len(lengths)
+
+            def repeat(x):
+                if np.ndim(x) == 1 and len(x) == wells:
+                    return np.repeat(x, lengths)
+                return x
+
+            t = transform([repeat(a) for a in t.scale], [repeat(b) for b in t.offset])
+
+        out = None
+        if not inplace:
+            log = log.copy()
+            # the copy owns its arrays, so float arrays are reused for the
+            # result, and only one array is allocated per axis
+            arrays = (log.depth, log.northing, log.easting)
+            if all(np.asarray(x).dtype == np.float64 for x in arrays):
+                out = arrays
+
+        arrays = (log.depth, log.northing, log.easting)
+        previous = arrays
+        if fleet:
+            # wells that could not be computed are nan, which is fine here
+            arrays = t.affine(*arrays, out = out)
+        else:
+            arrays = t(*arrays, out = out)
+        log.depth, log.northing, log.easting = arrays
+
+        if hasattr(log, 'invalidate'):
+            if t.is_translation():
+                shift = (t.offset[1], t.offset[2], t.offset[0])
+                log.invalidate(shift = shift, previous = previous)
+            else:
+                log.invalidate()
+        return log
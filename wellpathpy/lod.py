@@ -0,0 +1,287 @@
+"""Level-of-detail pyramids of position logs
+
+A viewer that shows many wells needs little geometry when zoomed out, and
+full detail when zoomed in. A pyramid holds every well at a series of levels,
+each simplified with simplify.douglas_peucker to a growing tolerance, and
+records the error of every level. Level 0 is the full resolution.
+
+The points of all levels are stored contiguously, level by level, so that
+all the wells of one level are a single slice of every array. The pyramid is
+saved as one npy file per array, which can be memory mapped, so a viewer
+only reads the levels it draws.
+"""
+import os
+
+import numpy as np
+
+from .fleet import fleet_log
+from .simplify import douglas_peucker, simplification_error
+
+fields = ('md', 'northing', 'easting', 'depth', 'offsets', 'tolerances', 'errors')
+
+class pyramid:
+    """Level-of-detail pyramid
+
+    Well i of level l is [offsets[l, i]:offsets[l, i + 1]] of md, northing,
+    easting and depth. The levels follow each other, i.e. offsets[l, -1] ==
+    offsets[l + 1, 0].
+
+    Parameters
+    ----------
+    md : array_like of float
+    northing : array_like of float
+    easting : array_like of float
+    depth : array_like of float
+    offsets : array_like of int
+        (levels, wells + 1) offsets
+    tolerances : array_like of float
+        the error bound of every level, increasing, starting at 0
+    errors : array_like of float
+        (levels, wells) largest distance between the stations of a well and
+        its simplified polyline. At most the tolerance of the level, and nan
+        for wells with nan positions
+    names : list, optional
+
+    See Also
+    --------
+    build : build a pyramid from position logs
+    """
+    def __init__(self, md, northing, easting, depth, offsets, tolerances,
+                 errors, names = None):
+        self.md = md
+        self.northing = northing
+        self.easting = easting
+        self.depth = depth
+        self.offsets = np.asarray(offsets, dtype = np.int64)
+        self.tolerances = np.asarray(tolerances, dtype = float)
+        self.errors = np.asarray(errors, dtype = float)
+        if names is None:
+            names = list(range(self.offsets.shape[1] - 1))
+        self.names = list(names)
+
+    def __repr__(self):
+        return 'pyramid(wells = {}, levels = {}, points = {})'.format(
+            len(self), self.levels, len(self.md)
+        )
+
+    def __len__(self):
+        return self.offsets.shape[1] - 1
+
+    @property
+    def levels(self):
+        """Number of levels"""
+        return len(self.tolerances)
+
+    def well(self, i, level = 0):
+        """The (md, northing, easting, depth) of well i at level, as views"""
+        s = slice(self.offsets[level, i], self.offsets[level, i + 1])
+        return self.md[s], self.northing[s], self.easting[s], self.depth[s]
+
+    def arrays(self, level):
+        """All wells of a level, as views
+
+        Returns
+        -------
+        md, northing, easting, depth : array_like of float
+        offsets : array_like of int
+            the (wells + 1) well boundaries, relative to the level
+        """
+        first, last = self.offsets[level, 0], self.offsets[level, -1]
+        s = slice(first, last)
+        offsets = self.offsets[level] - first
+        return self.md[s], self.northing[s], self.easting[s], self.depth[s], offsets
+
+    def level(self, tolerance):
+        """The coarsest level with an error bound of at most tolerance"""
+        return int(np.searchsorted(self.tolerances, tolerance, side = 'right') - 1)
+
+    def query(self, pixel_size, pixels = 1.0):
+        """The coarsest level that is accurate on screen
+
+        Parameters
+        ----------
+        pixel_size : float
+            the size of a screen pixel, in the units of the logs
+        pixels : float
+            the largest allowed error, in pixels
+
+        Returns
+        -------
+        level : int
+
+        Examples
+        --------
+        A view 5000 m wide, 1000 pixels across, allows an error of 5 m at
+        1 pixel:
+
+        >>> level = p.query(5000 / 1000)
+        >>> md, northing, easting, depth, offsets = p.arrays(level)
+        """
+        return self.level(pixel_size * pixels)
+
+    def select(self, tolerance, wells = None):
+        """The coarsest level of every well with an error of at most tolerance
+
+        Using the measured errors of the wells, not the bounds of the levels,
+        so that e.g. straight wells get a coarse level also when zoomed in.
+        Wells with unknown (nan) errors get level 0.
+
+        Parameters
+        ----------
+        tolerance : float
+        wells : array_like of int, optional
+            defaults to all wells
+
+        Returns
+        -------
+        levels : array_like of int
+        """
+        errors = self.errors if wells is None else self.errors[:, wells]
+        ok = errors <= tolerance
+        # the errors grow with the level, but be safe, and take the last
+        # level that is accurate enough
+        last = errors.shape[0] - 1 - np.argmax(ok[::-1], axis = 0)
+        return np.where(ok.any(axis = 0), last, 0)
+
+    def save(self, directory):
+        """Write the pyramid to directory, one npy file per array
+
+        The names are written as strings.
+        """
+        os.makedirs(directory, exist_ok = True)
+        for name in fields:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        np.save(os.path.join(directory, 'names.npy'), np.array(self.names, dtype = str))
+
+    @classmethod
+    def load(cls, directory, mmap = True):
+        """Read a pyramid written by save
+
+        Parameters
+        ----------
+        directory : str
+        mmap : bool
+            memory map the points, and only read them when they are accessed.
+            The offsets and errors are always read
+
+        Returns
+        -------
+        p : pyramid
+        """
+        mode = 'r' if mmap else None
+        def load(name, mmap_mode = None):
+            path = os.path.join(directory, name + '.npy')
+            return np.load(path, mmap_mode = mmap_mode, allow_pickle = False)
+
+        points = [load(name, mode) for name in fields[:4]]
+        offsets, tolerances, errors = (load(name) for name in fields[4:])
+        names = load('names').tolist()
+        return cls(*points, offsets, tolerances, errors, names = names)
+
+def tolerances(levels, tolerance = 1.0, factor = 2.0):
+    """Error bounds of the levels: 0, tolerance, tolerance * factor, ...
+
+    Parameters
+    ----------
+    levels : int
+        number of levels, including the full resolution
+    tolerance : float
+        the error bound of level 1
+    factor : float
+        growth of the error bound from one level to the next
+
+    Returns
+    -------
+    tolerances : array_like of float
+    """
+    if levels < 1:
+        raise ValueError('levels must be at least 1, was {}'.format(levels))
+    if not tolerance > 0 or not factor > 1:
+        raise ValueError('tolerance must be positive, and factor greater than 1')
+    out = np.zeros(levels)
+    out[1:] = tolerance * factor ** np.arange(levels - 1)
+    return out
+
+def concatenate(logs):
+    """A fleet_log of a list of position logs"""
+    lengths = [len(log.depth) for log in logs]
+    offsets = np.zeros(len(logs) + 1, dtype = np.int64)
+    np.cumsum(lengths, out = offsets[1:])
+    def cat(arrays):
+        return np.concatenate([np.asarray(x, dtype = float) for x in arrays] or [[]])
+    md = cat([log.source.md for log in logs])
+    return fleet_log(
+        md,
+        cat([log.depth for log in logs]),
+        cat([log.northing for log in logs]),
+        cat([log.easting for log in logs]),
+        np.zeros(len(md)),
+        offsets,
+    )
+
+def build(logs, levels = 8, tolerance = 1.0, factor = 2.0):
+    """Build a level-of-detail pyramid
+
+    Every level is simplified from the full resolution, not from the level
+    before, so the errors do not add up.
+
+    Parameters
+    ----------
+    logs : fleet_log or list of position_log
+    levels : int
+        number of levels, including the full resolution
+    tolerance : float
+        the error bound of level 1, in the units of the logs
+    factor : float
+        growth of the error bound from one level to the next
+
+    Returns
+    -------
+    p : pyramid
+
+    Examples
+    --------
+    Build a pyramid of a field, and write it for the viewer:
+
+    >>> log = parallel.compute(f)
+    >>> p = build(log, levels = 10, tolerance = 0.5)
+    >>> p.save('field.lod')
+    >>> p = pyramid.load('field.lod')
+    """
+    bounds = tolerances(levels, tolerance, factor)
+    if not hasattr(logs, 'offsets'):
+        logs = concatenate(logs)
+
+    md = np.asarray(logs.md, dtype = float)
+    northing = np.asarray(logs.northing, dtype = float)
+    easting = np.asarray(logs.easting, dtype = float)
+    depth = np.asarray(logs.depth, dtype = float)
+    wells = np.asarray(logs.offsets, dtype = np.int64)
+
+    keeps = [np.ones(len(md), dtype = bool)]
+    errors = [np.zeros(len(wells) - 1)]
+    for bound in bounds[1:]:
+        keep = douglas_peucker(northing, easting, depth, bound, offsets = wells)
+        keeps.append(keep)
+        errors.append(simplification_error(
+            northing, easting, depth, keep, offsets = wells
+        ))
+
+    # the kept stations before every well boundary give the offsets within
+    # a level, and the levels follow each other
+    counts = np.array([np.concatenate([[0], np.cumsum(keep)])[wells] for keep in keeps])
+    sizes = counts[:, -1]
+    first = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    offsets = counts + first[:, np.newaxis]
+
+    index = np.concatenate([np.flatnonzero(keep) for keep in keeps])
+    return pyramid(
+        md[index],
+        northing[index],
+        easting[index],
+        depth[index],
+        offsets,
+        bounds,
+        np.array(errors),
+        names = logs.names,
+    )
@@ -0,0 +1,226 @@
+import concurrent.futures
+import sys
+
+import numpy as np
+
+from multiprocessing import shared_memory
+
+from .position_log import deviation
+from .fleet import fleet_log
+from .instrument import timed
+from . import units as unitsystem
+
+def allocate(shape, dtype):
+    """Create a shared memory block, and an array backed by it"""
+    dtype = np.dtype(dtype)
+    # zero-sized blocks are not allowed
+    nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create = True, size = nbytes)
+    return shm, np.ndarray(shape, dtype = dtype, buffer = shm.buf)
+
+def attach(name):
+    """Attach to a shared memory block owned by the parent process
+
+    The parent is responsible for unlinking the block. Before python 3.13,
+    attaching registers the block with the resource tracker again. The
+    workers share the resource tracker of the parent with every start method
+    (fork, spawn and forkserver), and it keeps a set of names, so this is
+    harmless. Unregistering here would instead remove the registration of
+    the parent, and the tracker would report a KeyError when the parent
+    unlinks the block.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name = name, track = False)
+    return shared_memory.SharedMemory(name = name)
+
+def output_lengths(md, offsets, step):
+    """Number of output stations per well
+
+    Without step this is the number of survey stations, otherwise the number
+    of points in first_md, first_md + step, ... <= last_md.
+    """
+    lengths = np.diff(offsets)
+    if step is None:
+        return lengths
+
+    nonempty = lengths > 0
+    first = md[offsets[:-1][nonempty]]
+    last  = md[offsets[1:][nonempty] - 1]
+    out = np.zeros(len(lengths), dtype = np.int64)
+    out[nonempty] = np.floor((last - first) / step).astype(np.int64) + 1
+    return out
+
+def compute_wells(arrays, start, stop, course_length, step):
+    """Compute wells [start, stop) from and into the arrays
+
+    Returns
+    -------
+    errors : dict
+        well index -> error message
+    """
+    errors = {}
+    offsets = arrays['offsets']
+    out_offsets = arrays['out_offsets']
+    for i in range(start, stop):
+        s = slice(offsets[i], offsets[i + 1])
+        o = slice(out_offsets[i], out_offsets[i + 1])
+        try:
+            md = arrays['md'][s]
+            dev = deviation(md, arrays['inc'][s], arrays['azi'][s])
+            pos = dev.minimum_curvature(course_length = course_length)
+            if step is not None:
+                n = out_offsets[i + 1] - out_offsets[i]
+                depths = np.minimum(md[0] + step * np.arange(n), md[-1])
+                pos = pos.resample(depths = depths)
+                md = depths
+
+            arrays['out_md'][o] = md
+            arrays['depth'][o] = pos.depth
+            arrays['northing'][o] = pos.northing
+            arrays['easting'][o] = pos.easting
+            arrays['dls'][o] = pos.dls
+        except Exception as e:
+            errors[i] = '{}: {}'.format(type(e).__name__, e)
+            for key in ('out_md', 'depth', 'northing', 'easting', 'dls'):
+                arrays[key][o] = np.nan
+    return errors
+
+def compute_range(layout, start, stop, course_length, step):
+    """Compute wells [start, stop) and write them to the shared outputs
+
+    This is the worker function, and runs in the pool processes. The layout is
+    a dict of name -> (shared memory name, shape, dtype).
+
+    Returns
+    -------
+    errors : dict
+        well index -> error message
+    """
+    blocks = {key: attach(name) for key, (name, _, _) in layout.items()}
+    try:
+        arrays = {
+            key: np.ndarray(shape, dtype = dtype, buffer = blocks[key].buf)
+            for key, (_, shape, dtype) in layout.items()
+        }
+        return compute_wells(arrays, start, stop, course_length, step)
+    finally:
+        # the arrays must be released before the blocks can be closed
+        arrays = None
+        for shm in blocks.values():
+            shm.close()
+
+@timed('fleet.compute')
+def compute(fl, course_length = None, step = None, workers = None, chunksize = 64):
+    """Compute the minimum curvature position logs of a fleet in parallel
+
+    The wells are split into chunks that are computed by a pool of worker
+    processes. Inputs and outputs are passed through shared memory in the
+    ragged layout, so only the chunk boundaries are pickled, not the wells.
+
+    Parameters
+    ----------
+    fl : fleet
+    course_length : float, optional
+        see mincurve.minimum_curvature. Defaults to the convention of the
+        units of the fleet, see units.course_length
+    step : float, optional
+        resample every well onto md[0], md[0] + step, ... <= md[-1]
+    workers : int, optional
+        number of worker processes, defaults to the number of CPUs. With 1
+        worker the wells are computed in this process
+    chunksize : int
+        number of wells per task
+
+    Returns
+    -------
+    log : fleet_log
+        the computed positions. Wells that fail are reported in log.errors by
+        name, and their positions are nan. When resampling, dls is the dogleg
+        severity between the resampled depths, see
+        position_log.minimum_curvature.resample
+
+    Notes
+    -----
+    Every well is computed independently by the same code, so the results do
+    not depend on the number of workers or the chunk size.
+
+    Examples
+    --------
+    >>> log = compute(f, step = 1, workers = 64)
+    >>> md, tvd, northing, easting, dls = log[0]
+    """
+    if step is not None and not step > 0:
+        raise ValueError('step must be positive')
+    if chunksize < 1:
+        raise ValueError('chunksize must be positive')
+    if course_length is None:
+        unit = getattr(fl, 'units', None)
+        if unit is not None and not isinstance(unit, str):
+            raise ValueError('fleet has mixed units, convert it with to_units first')
+        course_length = unitsystem.course_length(unit)
+
+    wells = len(fl)
+    lengths = output_lengths(fl.md, fl.offsets, step)
+    out_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    total = int(out_offsets[-1])
+
+    specs = {
+        'md':          (fl.md.shape, fl.md.dtype),
+        'inc':         (fl.inc.shape, fl.inc.dtype),
+        'azi':         (fl.azi.shape, fl.azi.dtype),
+        'offsets':     (fl.offsets.shape, np.int64),
+        'out_offsets': (out_offsets.shape, np.int64),
+        'out_md':      ((total,), np.float64),
+        'depth':       ((total,), np.float64),
+        'northing':    ((total,), np.float64),
+        'easting':     ((total,), np.float64),
+        'dls':         ((total,), np.float64),
+    }
+
+    blocks = {}
+    try:
+        arrays = {}
+        layout = {}
+        for key, (shape, dtype) in specs.items():
+            blocks[key], arrays[key] = allocate(shape, dtype)
+            layout[key] = (blocks[key].name, shape, np.dtype(dtype).str)
+
+        arrays['md'][:] = fl.md
+        arrays['inc'][:] = fl.inc
+        arrays['azi'][:] = fl.azi
+        arrays['offsets'][:] = fl.offsets
+        arrays['out_offsets'][:] = out_offsets
+
+        bounds = list(range(0, wells, chunksize)) + [wells]
+        tasks = list(zip(bounds[:-1], bounds[1:]))
+
+        errors = {}
+        if workers == 1:
+            for start, stop in tasks:
+                errors.update(compute_wells(arrays, start, stop, course_length, step))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as pool:
+                futures = [
+                    pool.submit(compute_range, layout, start, stop, course_length, step)
+                    for start, stop in tasks
+                ]
+                for future in futures:
+                    errors.update(future.result())
+
+        log = fleet_log(
+            md = np.copy(arrays['out_md']),
+            depth = np.copy(arrays['depth']),
+            northing = np.copy(arrays['northing']),
+            easting = np.copy(arrays['easting']),
+            dls = np.copy(arrays['dls']),
+            offsets = out_offsets,
+            names = fl.names,
+            errors = {fl.names[i]: msg for i, msg in sorted(errors.items())},
+        )
+    finally:
+        arrays = None
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
+
+    return log
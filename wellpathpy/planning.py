@@ -0,0 +1,298 @@
+import numpy as np
+
+from .position_log import deviation
+
+def radius(rate, course_length = 30):
+    """Radius of the arc drilled at a constant build or drop rate
+
+    Parameters
+    ----------
+    rate : array_like of float
+        build or drop rate in degrees per course_length
+    course_length : float
+        see mincurve.minimum_curvature
+
+    Returns
+    -------
+    radius : array_like of float
+    """
+    rate = np.asarray(rate, dtype = float)
+    if not (rate > 0).all():
+        raise ValueError('build and drop rates must be positive')
+    return course_length * 180 / (np.pi * rate)
+
+def tangent(H, V, R1, R2, final_inc, turn):
+    """Solve for the hold inclination of a two-arc plan
+
+    This is the inner workhorse of the planners. The well is vertical down to
+    the kickoff point, builds along an arc of radius R1 to the inclination
+    alpha, holds a straight tangent section, and then turns along an arc of
+    radius R2 to final_inc, ending exactly at the target. Everything is in the
+    vertical plane through the kickoff point and the target.
+
+    Parameters
+    ----------
+    H : array_like of float
+        horizontal displacement of the target from the kickoff point
+    V : array_like of float
+        vertical depth of the target below the kickoff point
+    R1 : array_like of float
+        radius of the build arc
+    R2 : array_like of float
+        radius of the second arc, 0 for a build-hold well
+    final_inc : array_like of float
+        inclination at the target in radians
+    turn : {1, -1}
+        1 if the second arc drops, -1 if it builds
+
+    Returns
+    -------
+    alpha : array_like of float
+        hold inclination in radians, nan if the target is unreachable
+    hold : array_like of float
+        length of the tangent section, nan if the target is unreachable
+
+    Notes
+    -----
+    Summing the horizontal and vertical displacement of the three sections
+    and eliminating the hold length L gives
+
+    .. math::
+        V' \\cdot sin(\\alpha) - H' \\cdot cos(\\alpha) = R_1 + turn \\cdot R_2
+
+    with :math:`H' = H - R_1 - turn \\cdot R_2 \\cdot cos(inc_f)` and
+    :math:`V' = V + turn \\cdot R_2 \\cdot sin(inc_f)`, which has the closed form
+    solution
+
+    .. math::
+        \\alpha = atan2(H', V') + asin(\\frac{R}{\\sqrt{H'^2 + V'^2}})
+
+    .. math::
+        L = \\sqrt{H'^2 + V'^2 - R^2}
+    """
+    Hp = H - R1 - turn * R2 * np.cos(final_inc)
+    Vp = V + turn * R2 * np.sin(final_inc)
+    R = R1 + turn * R2
+    rho2 = Hp * Hp + Vp * Vp
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        alpha = np.arctan2(Hp, Vp) + np.arcsin(R / np.sqrt(rho2))
+        hold = np.sqrt(rho2 - R * R)
+
+    # the second arc must turn the right way, or the target is unreachable
+    # with this profile
+    bad = ~(rho2 >= R * R) | (alpha < 0) | (alpha >= np.pi)
+    bad |= (turn * (alpha - final_inc) < 0) & (R2 > 0)
+    alpha = np.where(bad, np.nan, alpha)
+    hold = np.where(bad, np.nan, hold)
+    return alpha, hold
+
+def plan(kickoff, build, drop, northing, easting, tvd, final_inc, turn, course_length, tail = 0):
+    """Shared implementation of the planners
+
+    Returns the (md, inc, azi) of the key stations as (n, 6) arrays.
+    """
+    kickoff, northing, easting, tvd, final_inc, tail = np.broadcast_arrays(
+        *(np.asarray(x, dtype = float) for x in
+          (kickoff, northing, easting, tvd, final_inc, tail))
+    )
+
+    R1 = radius(build, course_length)
+    R2 = 0 if drop is None else radius(drop, course_length)
+    inc_f = np.deg2rad(final_inc)
+
+    H = np.hypot(northing, easting)
+    V = tvd - kickoff
+    alpha, hold = tangent(H, V, R1, R2, inc_f, turn)
+
+    arc1 = R1 * alpha
+    arc2 = R2 * np.abs(alpha - inc_f)
+    md = np.stack(np.broadcast_arrays(
+        np.zeros_like(kickoff),
+        kickoff,
+        kickoff + arc1,
+        kickoff + arc1 + hold,
+        kickoff + arc1 + hold + arc2,
+        kickoff + arc1 + hold + arc2 + tail,
+    ), axis = -1)
+    md = np.where(np.isnan(alpha)[..., np.newaxis], np.nan, md)
+
+    alpha = np.rad2deg(alpha)
+    if drop is None:
+        inc_f = alpha
+    else:
+        inc_f = np.where(np.isnan(alpha), np.nan, final_inc)
+    zero = np.zeros_like(alpha)
+    inc = np.stack(np.broadcast_arrays(
+        zero, zero, alpha, alpha, inc_f, inc_f
+    ), axis = -1)
+
+    azi = np.mod(np.rad2deg(np.arctan2(easting, northing)), 360)
+    azi = np.where(azi >= 360, 0, azi)
+    azi = np.broadcast_to(azi[..., np.newaxis], md.shape)
+    azi = np.where(np.isnan(md), np.nan, azi)
+    return md, inc, azi
+
+def build_hold(kickoff, build_rate, northing, easting, tvd, course_length = 30):
+    """Plan build-hold (J-shaped) wells
+
+    The well is vertical down to the kickoff depth, builds at build_rate to
+    the hold inclination, and holds a straight tangent section to the target.
+
+    All parameters are broadcast against each other, so planning wells for
+    many targets (or many kickoff depths or build rates) is a single array
+    computation.
+
+    Parameters
+    ----------
+    kickoff : array_like of float
+        kickoff depth, vertical below the wellhead
+    build_rate : array_like of float
+        build rate in degrees per course_length
+    northing : array_like of float
+        target north-offset from the wellhead
+    easting : array_like of float
+        target east-offset from the wellhead
+    tvd : array_like of float
+        target true vertical depth
+    course_length : float
+        see mincurve.minimum_curvature
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (..., 6) arrays of the key survey stations: surface, kickoff, end of
+        build, end of hold, and two stations repeating the end of hold. Rows
+        of unreachable targets are nan.
+
+    See also
+    --------
+    deviations : convert to deviation objects
+
+    Examples
+    --------
+    Sweep a grid of targets from one pad:
+
+    >>> n, e = np.meshgrid(np.linspace(-2000, 2000, 100), np.linspace(-2000, 2000, 100))
+    >>> md, inc, azi = build_hold(500, 3, n.ravel(), e.ravel(), 2500)
+    >>> devs = deviations(md, inc, azi)
+    """
+    return plan(kickoff, build_rate, None, northing, easting, tvd,
+                final_inc = 0, turn = 1, course_length = course_length)
+
+def build_hold_drop(kickoff, build_rate, drop_rate, northing, easting, tvd,
+                    final_inc = 0, course_length = 30):
+    """Plan build-hold-drop (S-shaped) wells
+
+    The well is vertical down to the kickoff depth, builds at build_rate to
+    the hold inclination, holds a straight tangent section, and drops at
+    drop_rate to final_inc, reaching it at the target.
+
+    Parameters
+    ----------
+    kickoff : array_like of float
+    build_rate : array_like of float
+        build rate in degrees per course_length
+    drop_rate : array_like of float
+        drop rate in degrees per course_length
+    northing : array_like of float
+    easting : array_like of float
+    tvd : array_like of float
+    final_inc : array_like of float
+        inclination at the target in degrees
+    course_length : float
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (..., 6) arrays of the key survey stations, see build_hold
+
+    See also
+    --------
+    build_hold
+    """
+    return plan(kickoff, build_rate, drop_rate, northing, easting, tvd,
+                final_inc = final_inc, turn = 1, course_length = course_length)
+
+def horizontal(kickoff, build_rate, landing_rate, northing, easting, tvd,
+               lateral_length = 0, landing_inc = 90, course_length = 30):
+    """Plan horizontal wells
+
+    The well is vertical down to the kickoff depth, builds at build_rate to
+    the tangent inclination, holds, and builds again at landing_rate to land
+    at landing_inc at the target (the heel). The lateral continues from the
+    target in the same direction for lateral_length.
+
+    Parameters
+    ----------
+    kickoff : array_like of float
+    build_rate : array_like of float
+        build rate in degrees per course_length
+    landing_rate : array_like of float
+        build rate of the landing section in degrees per course_length
+    northing : array_like of float
+        heel north-offset from the wellhead
+    easting : array_like of float
+        heel east-offset from the wellhead
+    tvd : array_like of float
+        heel true vertical depth
+    lateral_length : array_like of float
+        measured length of the lateral beyond the heel
+    landing_inc : array_like of float
+        inclination at the heel in degrees
+    course_length : float
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (..., 6) arrays of the key survey stations: surface, kickoff, end of
+        build, end of hold, heel and toe
+
+    See also
+    --------
+    build_hold
+    """
+    return plan(kickoff, build_rate, landing_rate, northing, easting, tvd,
+                final_inc = landing_inc, turn = -1, course_length = course_length,
+                tail = lateral_length)
+
+def deviations(md, inc, azi):
+    """Make deviation objects from planned key stations
+
+    Zero-length sections, e.g. the hold section when the target is hit at the
+    end of the build, are removed.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (n, stations) key stations from one of the planners
+
+    Returns
+    -------
+    devs : list of deviation
+        one deviation per planned well, None for unreachable targets
+    """
+    md  = np.atleast_2d(md)
+    inc = np.atleast_2d(inc)
+    azi = np.atleast_2d(azi)
+
+    keep = np.ones(md.shape, dtype = bool)
+    keep[:, 1:] = md[:, 1:] > md[:, :-1]
+    reachable = ~np.isnan(md).any(axis = 1)
+
+    devs = []
+    for row in range(len(md)):
+        if not reachable[row]:
+            devs.append(None)
+            continue
+        k = keep[row]
+        devs.append(deviation(md[row, k], inc[row, k], azi[row, k]))
+    return devs
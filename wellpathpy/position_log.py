@@ -1,3 +1,5 @@
+import concurrent.futures
+
 import numpy as np
 
 from .checkarrays import checkarrays
@@ -7,6 +9,9 @@ from .tan import tan_method as tanmethod
 from .write import deviation_to_csv, position_to_csv
 from . import location
 from . import geometry
+from . import units as unitsystem
+from . import simplify
+from .instrument import timed
 
 class deviation:
     """Deviation
@@ -14,6 +19,16 @@ class deviation:
     The deviation is a glorified triple (md, inc, azi), with some interesting
     operations.
 
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+    units : str, optional
+        length unit of md, e.g. 'm' or 'ft', see units.normalize. Surveys in
+        other units should be converted once with to_units, so that
+        everything downstream is in the same units
+
     Notes
     -----
     Glossary:
@@ -21,11 +36,12 @@ class deviation:
     inc : inclination (in degrees)
     azi : azimuth (in degrees)
     """
-    def __init__(self, md, inc, azi):
+    def __init__(self, md, inc, azi, units = None):
         md, inc, azi = checkarrays(md, inc, azi)
         self.md = np.copy(md)
         self.inc = np.copy(inc)
         self.azi = np.copy(azi)
+        self.units = None if units is None else unitsystem.normalize(units)
 
     def __repr__(self):
         with np.printoptions(threshold=5, edgeitems=2):
@@ -34,54 +50,111 @@ class deviation:
           azi = {})""".format(repr(self.md), repr(self.inc), repr(self.azi))
 
     def copy(self):
-        return deviation(self.md, self.inc, self.azi)
+        return deviation(self.md, self.inc, self.azi, units = self.units)
+
+    def to_units(self, units = unitsystem.canonical):
+        """Convert md to other units
 
-    def minimum_curvature(self, course_length = 30):
+        Parameters
+        ----------
+        units : str
+            target units, metres by default
+
+        Returns
+        -------
+        dev : deviation
+            a new deviation in units
+        """
+        if self.units is None:
+            raise ValueError('the units of the deviation are unknown')
+        md = self.md * unitsystem.factor(self.units, units)
+        return deviation(md, self.inc, self.azi, units = units)
+
+    def minimum_curvature(self, course_length = None, tie_in = None, cache = None):
         """This function calls mincurve.minimum_curvature with self
 
         Notes
         -----
             You can access help with `wp.mincurve.minimum_curvature?`
             in `ipython`
-        """
-        tvd, n, e, dls = mincurve(
-            md = self.md,
-            inc = self.inc,
-            azi = self.azi,
-            course_length = course_length,
-        )
-        return minimum_curvature(self, tvd, n, e, dls)
 
-    def radius_curvature(self):
+            The course_length defaults to the convention of the units of the
+            deviation, 30 for metres and 100 for feet, or 30 if the units
+            are unknown.
+
+            If a cache.cache or cache.disk_cache is given, the log is
+            looked up in, or added to, the cache.
+        """
+        if course_length is None:
+            course_length = unitsystem.course_length(self.units)
+
+        def compute():
+            tvd, n, e, dls = mincurve(
+                md = self.md,
+                inc = self.inc,
+                azi = self.azi,
+                course_length = course_length,
+                tie_in = tie_in,
+            )
+            return minimum_curvature(self, tvd, n, e, dls, course_length = course_length)
+
+        if cache is None:
+            return compute()
+        return cache.compute(self, 'minimum_curvature', compute,
+                             course_length = course_length, tie_in = repr(tie_in),
+                             units = self.units)
+
+    def radius_curvature(self, tie_in = None, cache = None):
         """This function calls rad_curv.radius_curvature with self
 
         Notes
         -----
             You can access help with `wp.rad_curv.radius_curvature?`
             in `ipython`
-        """
-        tvd, n, e = radcurve(
-            md = self.md,
-            inc = self.inc,
-            azi = self.azi
-        )
-        return radius_curvature(self, tvd, n, e)
 
-    def tan_method(self, choice = 'avg'):
+            If a cache.cache or cache.disk_cache is given, the log is
+            looked up in, or added to, the cache.
+        """
+        def compute():
+            tvd, n, e = radcurve(
+                md = self.md,
+                inc = self.inc,
+                azi = self.azi,
+                tie_in = tie_in,
+            )
+            return radius_curvature(self, tvd, n, e)
+
+        if cache is None:
+            return compute()
+        return cache.compute(self, 'radius_curvature', compute, tie_in = repr(tie_in),
+                             units = self.units)
+
+    def tan_method(self, choice = 'avg', tie_in = None, cache = None):
         """This function calls tan.tan_method with self
 
         Notes
         -----
             You can access help with `wp.tan.tan_method?`
             in `ipython`
+
+            If a cache.cache or cache.disk_cache is given, the log is
+            looked up in, or added to, the cache.
         """
-        tvd, n, e = tanmethod(
-            md = self.md,
-            inc = self.inc,
-            azi = self.azi,
-            choice = choice,
-        )
-        return tan_method(self, tvd, n, e)
+        def compute():
+            tvd, n, e = tanmethod(
+                md = self.md,
+                inc = self.inc,
+                azi = self.azi,
+                choice = choice,
+                tie_in = tie_in,
+            )
+            return tan_method(self, tvd, n, e)
+
+        if cache is None:
+            return compute()
+        return cache.compute(self, 'tan_method', compute,
+                             choice = choice, tie_in = repr(tie_in),
+                             units = self.units)
 
     def to_csv(self, fname, **kwargs):
         """This function calls write.deviation_to_csv with self
@@ -115,8 +188,11 @@ class position_log:
         tvd : array_like
         northing : array_like
         easting : array_like
+
+        The positions are in the units of the deviation.
         """
         self.source = src.copy()
+        self.units = getattr(src, 'units', None)
         self.depth = depth
         self.northing = northing
         self.easting = easting
@@ -140,24 +216,8 @@ class position_log:
         surface_easting : array_like
         inplace : bool
         """
-        if inplace:
-            copy = self
-        else:
-            copy = self.copy()
-
-        depth, n, e = location.to_wellhead(
-            copy.depth,
-            copy.northing,
-            copy.easting,
-            surface_northing,
-            surface_easting,
-        )
-
-        copy.depth = depth
-        copy.northing = n
-        copy.easting = e
-
-        return copy
+        t = location.transform().to_wellhead(surface_northing, surface_easting)
+        return t.apply(self, inplace = inplace)
 
     def to_zero(self, surface_northing, surface_easting, inplace = False):
         """Create a new position log instance moved to 0m North and 0m East
@@ -168,50 +228,88 @@ class position_log:
         surface_easting : array_like
         inplace : bool
         """
-        if inplace:
-            copy = self
-        else:
-            copy = self.copy()
-
-        depth, n, e = location.to_zero(
-            copy.depth,
-            copy.northing,
-            copy.easting,
-            surface_northing,
-            surface_easting,
-        )
-
-        copy.depth = depth
-        copy.northing = n
-        copy.easting = e
-
-        return copy
+        t = location.transform().to_zero(surface_northing, surface_easting)
+        return t.apply(self, inplace = inplace)
 
     def to_tvdss(self, datum_elevation, inplace = False):
-        """This function calls location.location_to_tvdss with self
+        """This function applies location.transform().to_tvdss to self
 
         Notes
         -----
             You can access help with `wp.location.to_tvdss?`
             in `ipython`
+
+            To apply several location transforms with a single copy, chain
+            them with location.transform
+        """
+        t = location.transform().to_tvdss(datum_elevation)
+        return t.apply(self, inplace = inplace)
+
+    def to_header(self, header, inplace = False):
+        """Move to the wellhead and to subsea depths given by a header
+
+        The surface coordinates and the datum elevation are converted from
+        the units in the header to the units of the log, see
+        location.transform.from_header.
+
+        Parameters
+        ----------
+        header : dict
+            see header.read_header_json
+        inplace : bool
         """
-        if inplace:
-            copy = self
-        else:
-            copy = self.copy()
-
-        depth, n, e = location.to_tvdss(
-            copy.depth,
-            copy.northing,
-            copy.easting,
-            datum_elevation,
+        t = location.transform.from_header(header, units = self.units)
+        return t.apply(self, inplace = inplace)
+
+    def simplify(self, tolerance):
+        """Drop stations, with a bound on the positional error
+
+        The stations are simplified with simplify.douglas_peucker, so that
+        every dropped station is within tolerance of the simplified path.
+        The result is a polyline through a subset of the stations, and the
+        source is the matching subset of the survey.
+
+        For a minimum_curvature log, the arcs between the stations are
+        bounded too by first refining them to half the tolerance:
+
+        >>> simple = pos.resample_adaptive(tolerance / 2).simplify(tolerance / 2)
+
+        Parameters
+        ----------
+        tolerance : float
+            in the units of the log
+
+        Returns
+        -------
+        simplified : position_log
+        """
+        keep = simplify.douglas_peucker(self.northing, self.easting, self.depth, tolerance)
+        src = self.source
+        return position_log(
+            deviation(src.md[keep], src.inc[keep], src.azi[keep], units = self.units),
+            self.depth[keep],
+            self.northing[keep],
+            self.easting[keep],
         )
 
-        copy.depth = depth
-        copy.northing = n
-        copy.easting = e
+    def invalidate(self, shift = None, previous = None):
+        """Notify the log that its positions have changed
 
-        return copy
+        Logs that cache geometry derived from the positions must override
+        this. Caches are tied to the depth, northing and easting arrays, so
+        assigning new arrays is detected, but code that modifies the arrays
+        in place must call it.
+
+        Parameters
+        ----------
+        shift : tuple of float, optional
+            (northing, easting, depth) the positions were translated by. If
+            not given, the positions are assumed to have changed arbitrarily
+        previous : tuple of array_like, optional
+            the (depth, northing, easting) arrays before the change, when
+            they were replaced by new arrays
+        """
+        pass
 
     def resample(self, *args, **kwargs):
         raise NotImplementedError
@@ -241,59 +339,119 @@ def spherical_interpolate(p0, p1, t, omega):
     Parameters
     ----------
     p0 : array_like
-        First points on the arc, in (northing, easting, tvd)
+        First points on the arc, in (northing, easting, tvd), or (3, n) first
+        points of n arcs
     p1 : array_like
-        Last points  on the arc, in (northing, easting, tvd)
+        Last points  on the arc, in (northing, easting, tvd), or (3, n) last
+        points of n arcs
     t : array_like
         The points between p0 and p1 to return, 0 <= t <= 1
-    omega : float
-        The angle subtended by the arc
+    omega : float or array_like of float
+        The angle subtended by the arc, or by every arc
 
     Returns
     -------
     positions : array_like
         Resampled positions in (northing, easting, tvd)
     """
-    if omega != 0:
-        v0 = np.sin((1 - t) * omega) / np.sin(omega)
-        v1 = np.sin(     t  * omega) / np.sin(omega)
-    else:
-        # reduce to linear interpolation
-        v0 = 1 - t
-        v1 = t
-    V0 = v0 * p0[:, np.newaxis]
-    V1 = v1 * p1[:, np.newaxis]
+    omega = np.asarray(omega)
+    # reduce to linear interpolation where omega is zero
+    straight = omega == 0
+    sin = np.sin(np.where(straight, 1, omega))
+    v0 = np.where(straight, 1 - t, np.sin((1 - t) * omega) / sin)
+    v1 = np.where(straight,     t, np.sin(     t  * omega) / sin)
+
+    p0 = np.asarray(p0)
+    p1 = np.asarray(p1)
+    if p0.ndim == 1:
+        p0 = p0[:, np.newaxis]
+        p1 = p1[:, np.newaxis]
+    V0 = v0 * p0
+    V1 = v1 * p1
     return V0 + V1
 
 class minimum_curvature(position_log):
-    def __init__(self, src, depth, n, e, dls):
+    def __init__(self, src, depth, n, e, dls, course_length = None):
         super().__init__(src, depth, n, e)
         self.dls = dls
+        if course_length is None:
+            course_length = unitsystem.course_length(self.units)
+        self.course_length = course_length
+        self._arcs = None
+        # the position arrays the arcs were computed from
+        self._arcs_positions = None
 
     def copy(self):
-        l = minimum_curvature(self.source, np.copy(self.depth), np.copy(self.northing), np.copy(self.easting), np.copy(self.dls))
+        l = minimum_curvature(self.source, np.copy(self.depth), np.copy(self.northing), np.copy(self.easting), np.copy(self.dls),
+                              course_length = self.course_length)
+        # the arc geometry is never modified in place, so it can be shared
+        if self._cached(self._positions()):
+            l._arcs = self._arcs
+            l._arcs_positions = l._positions()
         return l
 
-    def resample(self, depths):
-        """
-        Resample the position log onto a new measured-depth.
+    def _positions(self):
+        """The (depth, northing, easting) arrays"""
+        return (self.depth, self.northing, self.easting)
+
+    def _cached(self, positions):
+        """True if the arcs are cached, and were computed from positions"""
+        if self._arcs is None or positions is None:
+            return False
+        current = self._arcs_positions
+        return all(a is b for a, b in zip(current, positions))
+
+    def invalidate(self, shift = None, previous = None):
+        """Notify the log that its positions have changed
+
+        The arc geometry cached by arcs() is translation invariant except for
+        the sphere centres, so a shift only moves the centres, and anything
+        else discards the cache. The cache is tied to the position arrays, so
+        assigning new arrays to depth, northing or easting discards it too.
 
         Parameters
         ----------
-        depths : array_like
-            The measured depths to resample onto
+        shift : tuple of float, optional
+            (northing, easting, depth) the positions were translated by
+        previous : tuple of array_like, optional
+            the (depth, northing, easting) arrays before the change, when
+            they were replaced by new arrays. The arcs are only moved if they
+            were computed from these
+        """
+        if previous is None:
+            previous = self._positions()
 
-        Returns
-        -------
-        resampled : minimum_curvature
-            Resampled position log
+        if shift is None or not self._cached(previous):
+            self._arcs = None
+            self._arcs_positions = None
+            return
 
-        Examples
-        --------
-        Resample onto a regular, 1m measured depth interval:
+        md_upper, md_lower, C, P0, P1, omega = self._arcs
+        C = C + np.asarray(shift, dtype = float)
+        self._arcs = (md_upper, md_lower, C, P0, P1, omega)
+        self._arcs_positions = self._positions()
 
-        >>> depths = list(range(int(dev.md[-1]) + 1))
-        >>> resampled = pos.resample(depths = depths)
+    @timed('arcs')
+    def arcs(self):
+        """Geometry of the minimum curvature arcs between survey stations
+
+        The geometry is computed on first use and kept on the log, so that
+        repeated resampling and md lookups only pay for the interpolation. It
+        is updated by the location transforms, see invalidate, and computed
+        again when new arrays are assigned to depth, northing or easting.
+
+        Returns
+        -------
+        md_upper : array_like of float
+        md_lower : array_like of float
+            measured depth of the upper and lower station of every segment
+        C : array_like of float
+            (segments, 3) centre of the sphere the arc lives on
+        P0 : array_like of float
+        P1 : array_like of float
+            (segments, 3) upper and lower station, relative to C
+        omega : array_like of float
+            angle subtended by the arc
         """
         # This function uses a lot of geometry, and is easier to follow
         # when able to see the shapes, vectors, and lines. There is a geogebra
@@ -325,7 +483,9 @@ class minimum_curvature(position_log):
         # [2] wellpathpy/docs/arc-interpolation.ggb
         # [3] https://www.geogebra.org/3d
 
-        depths = np.asarray(depths)
+        if self._cached(self._positions()):
+            return self._arcs
+
         nve = np.column_stack([self.northing, self.easting, self.depth])
         upper = nve[:-1]
         lower = nve[1:]
@@ -378,34 +538,227 @@ class minimum_curvature(position_log):
         assert len(md_upper) == len(md_lower)
         assert len(upper) == len(md_upper)
         assert len(upper) == len(lower)
+        self._arcs = (md_upper, md_lower, C, P0, P1, omega)
+        self._arcs_positions = self._positions()
+        return self._arcs
 
-        xs = []
-        segments = len(md_upper)
-        for i in range(segments):
-            md1 = md_upper[i]
-            md2 = md_lower[i]
-            if i < segments - 1:
-                md_i = depths[(depths >= md1) & (depths <  md2)]
-            else:
-                md_i = depths[(depths >= md1) & (depths <= md2)]
+    def locate(self, depths):
+        """Find the segment of every measured depth
 
-            # t are the points (0 <= t <= 1) on the arc to interpolate
-            t = (md_i - md1) / (md2 - md1)
-            log = spherical_interpolate(P0[i], P1[i], t, omega[i])
-            log = log + C[i, :, np.newaxis]
-            xs.append(log)
+        Parameters
+        ----------
+        depths : float or array_like of float
+
+        Returns
+        -------
+        segment : int or array_like of int
+            index of the segment, -1 for depths outside the survey, in the
+            shape of depths
+        """
+        mds = self.source.md
+        if len(mds) < 2:
+            raise ValueError('cannot interpolate a log with less than 2 stations')
+
+        shape = np.shape(depths)
+        depths = np.atleast_1d(np.asarray(depths, dtype = float))
+        segment = np.searchsorted(mds, depths, side = 'right') - 1
+        # the last station is part of the last segment
+        segment[depths == mds[-1]] = len(mds) - 2
+        segment[(depths < mds[0]) | (depths > mds[-1])] = -1
+        return segment.reshape(shape)[()]
+
+    def interpolate(self, depths, segment, workers = None, directions = False):
+        """Interpolate positions at depths on the arcs of the given segments
+
+        This is the inner workhorse of resample and the md lookups. With
+        workers, the depths are partitioned into contiguous ranges that are
+        interpolated by a pool of threads into a preallocated output. The
+        numpy kernels release the GIL, so this scales with the number of
+        cores for large inputs.
 
-        xs = np.concatenate(xs, axis = 1)
+        Parameters
+        ----------
+        depths : array_like of float
+        segment : array_like of int
+            the segment of every depth, see locate
+        workers : int, optional
+            number of threads, None or 1 to interpolate in this thread
+        directions : bool
+            also interpolate the direction of the well bore, and the dogleg
+            along the well
+
+        Returns
+        -------
+        positions : array_like of float
+            (3, n) positions in (northing, easting, tvd)
+        tangents : array_like of float
+            (3, n) unit direction vectors in (northing, easting, tvd), the
+            slerp of the tangents at the upper and lower station. Only
+            returned with directions
+        dogleg : array_like of float
+            total dogleg in radians from the first station to every depth,
+            so that the dogleg of the well between two depths is the
+            difference. Only returned with directions
+        """
+        md_upper, md_lower, C, P0, P1, omega = self.arcs()
+        out = np.empty((3, len(depths)))
+
+        if directions:
+            src = self.source
+            inc = np.deg2rad(src.inc)
+            azi = np.deg2rad(src.azi)
+            T = np.column_stack(geometry.direction_vector_radians(inc, azi))
+            # the dogleg from the angles, as mincurve, which is more accurate
+            # than the arc angle omega for nearly straight segments
+            dl = geometry.dogleg(inc[:-1], inc[1:], azi[:-1], azi[1:])
+            total = np.concatenate([[0], np.cumsum(dl)])
+            tangents = np.empty((3, len(depths)))
+            dogleg = np.empty(len(depths))
+
+        def kernel(lo, hi):
+            s = segment[lo:hi]
+            t = (depths[lo:hi] - md_upper[s]) / (md_lower[s] - md_upper[s])
+            out[:, lo:hi] = spherical_interpolate(P0[s].T, P1[s].T, t, omega[s])
+            out[:, lo:hi] += C[s].T
+            if directions:
+                tangents[:, lo:hi] = spherical_interpolate(T[s].T, T[s + 1].T, t, dl[s])
+                dogleg[lo:hi] = total[s] + t * dl[s]
+
+        def result():
+            if directions:
+                return out, tangents, dogleg
+            return out
+
+        if workers is None or workers <= 1 or len(depths) < 2 * workers:
+            kernel(0, len(depths))
+            return result()
+
+        bounds = np.linspace(0, len(depths), workers + 1).astype(int)
+        with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as pool:
+            futures = [
+                pool.submit(kernel, lo, hi)
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+        return result()
+
+    @timed('resample')
+    def resample(self, depths, workers = None):
+        """
+        Resample the position log onto a new measured-depth.
+
+        The positions are interpolated along the minimum curvature arcs, and
+        the inclination and azimuth by slerp of the tangents at the survey
+        stations, in the same pass. The source of the resampled log is the
+        interpolated survey, and its dls is the dogleg severity of the well
+        over every interval between the resampled depths, normalised by the
+        course_length of this log.
+
+        Parameters
+        ----------
+        depths : array_like
+            The measured depths to resample onto. Depths outside the survey
+            and duplicates are dropped, and the resampled log is ordered by md
+        workers : int, optional
+            Interpolate with this many threads, see interpolate
+
+        Returns
+        -------
+        resampled : minimum_curvature
+            Resampled position log
+
+        Examples
+        --------
+        Resample onto a regular, 1m measured depth interval:
+
+        >>> depths = list(range(int(dev.md[-1]) + 1))
+        >>> resampled = pos.resample(depths = depths)
+
+        Resample a very long well with 8 threads:
+
+        >>> resampled = pos.resample(depths = np.arange(0, dev.md[-1], 0.05), workers = 8)
+
+        The interpolated survey:
+
+        >>> md, inc, azi = resampled.source.md, resampled.source.inc, resampled.source.azi
+        """
+        depths = np.asarray(depths, dtype = float)
+        segment = self.locate(depths)
+        inside = segment >= 0
+        md, segment = depths[inside], segment[inside]
+        if not (md[1:] > md[:-1]).all():
+            md, first = np.unique(md, return_index = True)
+            segment = segment[first]
+
+        xs, tangents, dogleg = self.interpolate(
+            md, segment, workers = workers, directions = True
+        )
+        inc, azi = geometry.spherical(*tangents)
+
+        dls = np.zeros(len(md))
+        if len(md) > 1:
+            dls[1:] = np.rad2deg(np.diff(dogleg))
+            dls[1:] *= self.course_length / np.diff(md)
 
         pos = minimum_curvature(
-            src   = self.source,
+            src   = deviation(md, inc, azi, units = self.units),
             depth = xs[2],
             n     = xs[0],
             e     = xs[1],
-            dls = self.dls,
+            dls   = dls,
+            course_length = self.course_length,
         )
         return pos
 
+    def resample_adaptive(self, tolerance, workers = None):
+        """Resample with just enough points to follow the arcs
+
+        Every segment is split into the fewest equal pieces whose chords are
+        within tolerance of the arc, see simplify.adaptive_depths. Straight
+        sections get no new points, and tight builds get many.
+
+        Parameters
+        ----------
+        tolerance : float
+            largest distance between the arcs and the chords of the
+            resampled log, in the units of the log
+        workers : int, optional
+            see resample
+
+        Returns
+        -------
+        resampled : minimum_curvature
+        """
+        src = self.source
+        depths = simplify.adaptive_depths(src.md, src.inc, src.azi, tolerance)
+        return self.resample(depths = depths, workers = workers)
+
+    @timed('md_to_tvd')
+    def md_to_tvd(self, md, workers = None):
+        """True vertical depth at measured depths
+
+        Parameters
+        ----------
+        md : float or array_like of float
+            measured depths, in any order
+        workers : int, optional
+            Interpolate with this many threads, see interpolate
+
+        Returns
+        -------
+        tvd : float or array_like of float
+            true vertical depth at md, nan outside the survey, in the shape
+            of md
+        """
+        shape = np.shape(md)
+        md = np.atleast_1d(np.asarray(md, dtype = float)).ravel()
+        segment = self.locate(md)
+        tvd = np.full(md.shape, np.nan)
+        inside = segment >= 0
+        tvd[inside] = self.interpolate(md[inside], segment[inside], workers = workers)[2]
+        return tvd.reshape(shape)[()]
+
     def deviation(self):
         """Deviation survey
 
@@ -0,0 +1,448 @@
+"""Quality control of surveys against vendor trajectories
+
+Survey reports from the vendors carry their computed TVD, northing, easting
+and dogleg columns next to md, inc and azi. This module reads those reports,
+recomputes the trajectories of a whole archive with the minimum curvature
+method, and reports, per well, the largest and RMS difference of every
+column, and the first md where the difference exceeds a tolerance.
+
+The wells are computed in the ragged layout of fleet.fleet, one vectorised
+pass per chunk of stations, not one engine call per well.
+
+Examples
+--------
+    $ python -m wellpathpy.qc surveys/ --tolerance 0.1 > qc.csv
+
+>>> fl, reference = read_archive(['surveys/'])
+>>> rep = compare(fl, reference)
+>>> failed(rep)
+['well-12', 'well-31']
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+
+import numpy as np
+
+from .fleet import checkfleet, fleet
+from .mincurve import minimum_curvature_increments
+from .read import csv_files
+from .workspace import workspace
+from . import units
+
+# the recognised names of the report columns, lowercase and without units
+aliases = {
+    'md': ('md', 'measured depth'),
+    'inc': ('inc', 'incl', 'inclination'),
+    'azi': ('azi', 'azim', 'azimuth'),
+    'tvd': ('tvd', 'true vertical depth'),
+    'northing': ('north', 'northing', 'n/s', '+n/-s', 'ns'),
+    'easting': ('east', 'easting', 'e/w', '+e/-w', 'ew'),
+    'dls': ('dogleg', 'dls', 'dog leg', 'dogleg severity'),
+}
+
+# the columns that are compared
+quantities = ('tvd', 'northing', 'easting', 'dls')
+
+# default tolerances, in the units of the report. Reports are typically
+# rounded to two decimals
+tolerances = {
+    'tvd': 0.1,
+    'northing': 0.1,
+    'easting': 0.1,
+    'dls': 0.1,
+}
+
+def parse_column(name):
+    """The quantity and unit of a report column name
+
+    Examples
+    --------
+    >>> parse_column('TVD[m]')
+    ('tvd', 'm')
+    >>> parse_column('Dogleg [deg/30m]')
+    ('dls', 'deg/30m')
+    >>> parse_column('Vertical Section[m]')
+    (None, 'm')
+    """
+    match = re.match(r'^\s*(.*?)\s*(?:[\[(](.*)[\])])?\s*$', name)
+    label, unit = match.group(1).lower(), match.group(2)
+    for quantity, names in aliases.items():
+        if label in names:
+            return quantity, unit
+    return None, unit
+
+def parse_dls_unit(unit):
+    """The course length and length unit of a dogleg unit, e.g. deg/30m
+
+    Returns
+    -------
+    course_length : float or None
+    unit : str or None
+    """
+    if unit is None:
+        return None, None
+    match = re.match(r'^\s*deg\s*/\s*([0-9.]+)\s*([a-zA-Z]+)\s*$', unit)
+    if match is None:
+        return None, None
+    return float(match.group(1)), units.normalize(match.group(2))
+
+def read_report(fname, delimiter = ','):
+    """Read a survey report with vendor columns
+
+    The header row is the first row that names md, inc and azi columns, in
+    any position, e.g. after title rows and with a leading empty column. The
+    data is the rows below it, up to the first row without an md. Columns
+    that are not recognised, like vertical section, are ignored.
+
+    Parameters
+    ----------
+    fname : str
+    delimiter : str
+
+    Returns
+    -------
+    report : dict
+        md, inc, azi and the vendor tvd, northing, easting and dls columns
+        that are present, as arrays of float, with nan for missing values.
+        units is the length unit of md, if given in the header, and
+        course_length the dogleg normalisation, if given in the dls header
+
+    Raises
+    ------
+    ValueError
+        If no header row with md, inc and azi is found
+    """
+    with open(fname, newline = '') as f:
+        rows = list(csv.reader(f, delimiter = delimiter))
+
+    for start, row in enumerate(rows):
+        columns = {}
+        unit = {}
+        for i, name in enumerate(row):
+            quantity, u = parse_column(name)
+            if quantity is not None and quantity not in columns:
+                columns[quantity] = i
+                unit[quantity] = u
+        if {'md', 'inc', 'azi'} <= set(columns):
+            break
+    else:
+        raise ValueError('no md, inc, azi header row in {}'.format(fname))
+
+    def value(row, i):
+        try:
+            return float(row[i])
+        except (IndexError, ValueError):
+            return np.nan
+
+    data = []
+    for row in rows[start + 1:]:
+        values = [value(row, i) for i in columns.values()]
+        if np.isnan(values[0]):
+            break
+        data.append(values)
+
+    data = np.array(data, dtype = float).reshape(-1, len(columns))
+    report = {quantity: data[:, i] for i, quantity in enumerate(columns)}
+
+    length = unit['md']
+    report['units'] = None if length is None else units.normalize(length)
+    course_length, dls_length = parse_dls_unit(unit.get('dls'))
+    report['course_length'] = course_length
+    if report['units'] is None:
+        report['units'] = dls_length
+    return report
+
+def read_archive(paths, delimiter = ','):
+    """Read survey reports into a fleet, and the vendor columns alongside it
+
+    Parameters
+    ----------
+    paths : list of str
+        report files, or directories of report files
+    delimiter : str
+
+    Returns
+    -------
+    fl : fleet
+        the surveys, named after the files
+    reference : dict
+        tvd, northing, easting and dls, in the ragged layout of fl, nan where
+        a report does not have the column, course_length, one per well, and
+        errors, well name -> error message, for the reports that could not
+        be read. They are left out of fl
+    """
+    reports, names, errors = [], [], {}
+    for fname in csv_files(paths):
+        name = os.path.splitext(os.path.basename(fname))[0]
+        try:
+            report = read_report(fname, delimiter = delimiter)
+            # validate every report on its own, so that one bad report does
+            # not fail the fleet
+            n = len(report['md'])
+            checkfleet(report['md'], report['inc'], report['azi'], [0, n])
+        except Exception as e:
+            errors[name] = '{}: {}'.format(type(e).__name__, e)
+            continue
+        reports.append(report)
+        names.append(name)
+
+    lengths = [len(r['md']) for r in reports]
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype = np.int64)])
+
+    def column(quantity):
+        parts = [r.get(quantity, np.full(n, np.nan)) for r, n in zip(reports, lengths)]
+        return np.concatenate(parts) if parts else np.zeros(0)
+
+    wells = [r['units'] for r in reports]
+    if None in wells:
+        wells = None
+    elif len(set(wells)) == 1:
+        wells = wells[0]
+    fl = fleet(column('md'), column('inc'), column('azi'), offsets,
+               names = names, units = wells)
+
+    reference = {quantity: column(quantity) for quantity in quantities}
+    reference['course_length'] = np.array([
+        units.course_length(r['units']) if r['course_length'] is None else r['course_length']
+        for r in reports
+    ], dtype = float)
+    reference['errors'] = errors
+    return fl, reference
+
+def chunks(offsets, chunksize):
+    """Split wells into ranges of at most chunksize stations
+
+    A well longer than chunksize is a chunk on its own.
+    """
+    wells = len(offsets) - 1
+    start = 0
+    while start < wells:
+        limit = offsets[start] + chunksize
+        stop = int(np.searchsorted(offsets, limit, side = 'right')) - 1
+        stop = min(max(stop, start + 1), wells)
+        yield start, stop
+        start = stop
+
+def trajectories(md, inc, azi, offsets, origin, course_length, ws = None):
+    """Minimum curvature of many wells in one pass
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        stations in the ragged layout, inc and azi in degrees
+    offsets : array_like of int
+    origin : array_like of float
+        (3, wells) tvd, northing and easting of the first station of every
+        well
+    course_length : array_like of float
+        dogleg normalisation, one per well
+    ws : workspace.workspace, optional
+
+    Returns
+    -------
+    tvd, northing, easting, dls : array_like of float
+        dls is nan at the first station of every well
+    """
+    n = len(md)
+    lengths = np.diff(offsets)
+    if n == 0:
+        return tuple(np.zeros(0) for _ in range(4))
+
+    increments = minimum_curvature_increments(
+        md, np.deg2rad(inc), np.deg2rad(azi), workspace = ws
+    )
+
+    # the segments from the last station of a well to the first station of
+    # the next do not exist
+    first = offsets[:-1][lengths > 0]
+    crossing = first[first > 0] - 1
+
+    well = np.repeat(np.arange(len(lengths)), lengths)
+    out = []
+    for steps, start in zip(increments[:3], origin):
+        steps[crossing] = 0
+        total = np.empty(n)
+        total[0] = 0
+        np.cumsum(steps, out = total[1:])
+        # restart the running sum at the first station of every well
+        total -= total[np.repeat(offsets[:-1], lengths)]
+        total += np.asarray(start)[well]
+        out.append(total)
+
+    dls = np.empty(n)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        dls[1:] = np.rad2deg(increments[3]) / np.diff(md)
+    dls *= np.asarray(course_length)[well]
+    dls[first] = np.nan
+    return out[0], out[1], out[2], dls
+
+def compare(fl, reference, tolerance = None, chunksize = 2**20):
+    """Compare the minimum curvature trajectories with vendor columns
+
+    Every well is computed from its first station, which is tied to the
+    vendor tvd, northing and easting there (0 if not given), so that the
+    differences measure the propagation along the well. The first station is
+    not compared.
+
+    The running sums restart at every well by subtracting the sum at its
+    first station, so the results depend on the position of the well in its
+    chunk in the last bits, far below the precision of any report.
+
+    Parameters
+    ----------
+    fl : fleet
+    reference : dict
+        tvd, northing, easting, dls and course_length, see read_archive
+    tolerance : float or dict, optional
+        the largest allowed absolute difference, for all or per quantity.
+        Defaults to tolerances
+    chunksize : int
+        number of stations computed in one pass
+
+    Returns
+    -------
+    report : dict
+        names, and for every quantity a dict of max, rms and first, one
+        value per well. first is the md where the difference first exceeds
+        the tolerance, nan if it never does. All are nan for wells without
+        the vendor column. errors is passed on from the reference
+    """
+    if tolerance is None:
+        tolerance = tolerances
+    if not isinstance(tolerance, dict):
+        tolerance = {quantity: float(tolerance) for quantity in quantities}
+
+    wells = len(fl)
+    report = {'names': list(fl.names), 'errors': dict(reference.get('errors', {}))}
+    for quantity in quantities:
+        report[quantity] = {
+            'max': np.full(wells, np.nan),
+            'rms': np.full(wells, np.nan),
+            'first': np.full(wells, np.nan),
+        }
+
+    ws = workspace()
+    for lo, hi in chunks(fl.offsets, chunksize):
+        s = slice(fl.offsets[lo], fl.offsets[hi])
+        offsets = fl.offsets[lo:hi + 1] - fl.offsets[lo]
+        lengths = np.diff(offsets)
+        nonempty = lengths > 0
+        first = offsets[:-1][nonempty]
+
+        origin = []
+        for quantity in quantities[:3]:
+            start = np.zeros(hi - lo)
+            values = reference[quantity][s][first]
+            start[nonempty] = np.where(np.isnan(values), 0, values)
+            origin.append(start)
+
+        computed = trajectories(
+            fl.md[s], fl.inc[s], fl.azi[s], offsets, origin,
+            reference['course_length'][lo:hi], ws = ws,
+        )
+
+        # the first station is the tie-in, and is not compared
+        for values in computed:
+            values[first] = np.nan
+
+        md = fl.md[s]
+        for quantity, values in zip(quantities, computed):
+            stats = statistics(md, values, reference[quantity][s], offsets,
+                               tolerance[quantity])
+            for key, value in zip(('max', 'rms', 'first'), stats):
+                report[quantity][key][lo:hi] = value
+
+    return report
+
+def statistics(md, computed, expected, offsets, tolerance):
+    """Per-well max, RMS and first exceedance md of computed - expected
+
+    Stations where either value is nan are not compared.
+    """
+    wells = len(offsets) - 1
+    lengths = np.diff(offsets)
+    diff = np.abs(computed - expected)
+    valid = ~np.isnan(diff)
+    diff[~valid] = 0
+
+    largest = np.full(wells, np.nan)
+    rms = np.full(wells, np.nan)
+    first = np.full(wells, np.nan)
+
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return largest, rms, first
+
+    starts = offsets[:-1][nonempty]
+    count = np.add.reduceat(valid, starts)
+    compared = count > 0
+    index = np.flatnonzero(nonempty)[compared]
+
+    largest[index] = np.maximum.reduceat(diff, starts)[compared]
+    squares = np.add.reduceat(diff * diff, starts)[compared]
+    rms[index] = np.sqrt(squares / count[compared])
+
+    exceeds = np.where(diff > tolerance, np.arange(len(diff)), len(diff))
+    at = np.minimum.reduceat(exceeds, starts)[compared]
+    found = at < len(diff)
+    first[index[found]] = md[at[found]]
+    return largest, rms, first
+
+def failed(report):
+    """Names of the wells where any quantity exceeds its tolerance"""
+    exceeded = np.zeros(len(report['names']), dtype = bool)
+    for quantity in quantities:
+        exceeded |= ~np.isnan(report[quantity]['first'])
+    return [name for name, x in zip(report['names'], exceeded) if x]
+
+def write_report(out, report, fmt = '%.4f'):
+    """Write the report as csv, one row per well"""
+    header = ['well']
+    for quantity in quantities:
+        header += ['{}_{}'.format(quantity, key) for key in ('max', 'rms', 'first')]
+    out.write(','.join(header) + '\n')
+
+    columns = [
+        report[quantity][key]
+        for quantity in quantities
+        for key in ('max', 'rms', 'first')
+    ]
+    for i, name in enumerate(report['names']):
+        values = ['' if np.isnan(x[i]) else fmt % x[i] for x in columns]
+        out.write(','.join([str(name)] + values) + '\n')
+
+def main(argv = None):
+    p = argparse.ArgumentParser(
+        prog = 'python -m wellpathpy.qc',
+        description = 'Compare surveys with the vendor trajectory columns',
+    )
+    p.add_argument('inputs', nargs = '+', help = 'report csv files, or directories')
+    p.add_argument('--tolerance', type = float,
+                   help = 'allowed absolute difference for all columns, '
+                          'defaults to {}'.format(tolerances['tvd']))
+    p.add_argument('--delimiter', default = ',')
+    p.add_argument('--chunksize', type = int, default = 2**20,
+                   help = 'stations per vectorised pass')
+    args = p.parse_args(argv)
+
+    fl, reference = read_archive(args.inputs, delimiter = args.delimiter)
+    for name, msg in reference['errors'].items():
+        sys.stderr.write('{}: {}\n'.format(name, msg))
+
+    rep = compare(fl, reference, tolerance = args.tolerance, chunksize = args.chunksize)
+    write_report(sys.stdout, rep)
+
+    bad = failed(rep)
+    if bad:
+        sys.stderr.write('{} of {} wells exceed the tolerance: {}\n'.format(
+            len(bad), len(fl), ', '.join(map(str, bad))
+        ))
+    return 1 if bad or reference['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,13 @@
 import numpy as np
 
 from .checkarrays import checkarrays
+from .tiein import tie
+from .instrument import timed
+from .workspace import accumulate, outputs, temporary
 
-def radius_curvature(md, inc, azi):
+@timed('radius_curvature')
+def radius_curvature(md, inc, azi, tie_in=None, out=None, workspace=None,
+                     compensated=False):
     r"""Calculate TVD using radius or curvature method.
 
     This method uses angles from upper and lower end of survey interval to
@@ -16,6 +21,15 @@ def radius_curvature(md, inc, azi):
         well deviation in degrees
     azi : float
         well azimuth in degrees
+    tie_in : tie_in or tuple, optional
+        start the computation from this tie-in, see mincurve.minimum_curvature
+    out : tuple of array_like, optional
+        (tvd, northing, easting) arrays to write the results to, see
+        mincurve.minimum_curvature
+    workspace : workspace.workspace, optional
+        reuse the temporaries of this workspace
+    compensated : bool
+        accumulate with compensated summation, see mincurve.minimum_curvature
 
     Notes
     -----
@@ -56,7 +70,12 @@ def radius_curvature(md, inc, azi):
     northing : array_like of float
     easting : array_like of float
     """
+    n = len(md)
     md, inc, azi = checkarrays(md, inc, azi)
+    md, inc, azi, origin, skip = tie(md, inc, azi, tie_in)
+    tvd, northing, easting = outputs(out, n, 3)
+    if len(md) == 0:
+        return tvd, northing, easting
 
     # convert degrees to radians for numpy functions
     azi_r = np.deg2rad(azi)
@@ -71,13 +90,22 @@ def radius_curvature(md, inc, azi):
     delta_inc = np.where(incl_lower - incl_upper == 0., 0.000001, incl_lower - incl_upper)
     delta_azi = np.where(azi_lower - azi_upper == 0., 0.000001, azi_lower - azi_upper)
 
-    northing = np.cumsum((md_lower - md_upper) * (np.cos(incl_upper) - np.cos(incl_lower)) * (np.sin(azi_lower) - np.sin(azi_upper)) / (delta_inc * delta_azi))
-    northing = np.insert(northing, 0, 0)
+    segments = len(md) - 1
+    md_diff = np.subtract(md_lower, md_upper, out = temporary(workspace, 'md_diff', segments))
+    step = temporary(workspace, 'step', segments)
 
-    easting = np.cumsum((md_lower - md_upper) * (np.cos(incl_upper) - np.cos(incl_lower)) * (np.cos(azi_upper) - np.cos(azi_lower)) / (delta_inc * delta_azi))
-    easting = np.insert(easting, 0, 0)
+    np.multiply(md_diff, np.cos(incl_upper) - np.cos(incl_lower), out = step)
+    step *= np.sin(azi_lower) - np.sin(azi_upper)
+    step /= delta_inc * delta_azi
+    accumulate(step, northing, origin[1], skip, compensated)
 
-    tvd = np.cumsum((md_lower - md_upper) * (np.sin(incl_lower) - np.sin(incl_upper)) / delta_inc)
-    tvd = np.insert(tvd, 0, 0)
+    np.multiply(md_diff, np.cos(incl_upper) - np.cos(incl_lower), out = step)
+    step *= np.cos(azi_upper) - np.cos(azi_lower)
+    step /= delta_inc * delta_azi
+    accumulate(step, easting, origin[2], skip, compensated)
+
+    np.multiply(md_diff, np.sin(incl_lower) - np.sin(incl_upper), out = step)
+    step /= delta_inc
+    accumulate(step, tvd, origin[0], skip, compensated)
 
     return tvd, northing, easting
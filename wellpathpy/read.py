@@ -1,7 +1,11 @@
+import os
+
 import numpy as np
 
 from .checkarrays import checkarrays
+from .instrument import stage, timed
 
+@timed('read_csv')
 def read_csv(fname, delimiter=',', skiprows=1, **kwargs):
     """Read a deviation file in CSV format
 
@@ -46,7 +50,8 @@ def read_csv(fname, delimiter=',', skiprows=1, **kwargs):
     azi : float
         well azimuth in degrees from Grid North
     """
-    dev = np.loadtxt(fname, delimiter=delimiter, skiprows=skiprows, **kwargs)
+    with stage('read_csv.parse'):
+        dev = np.loadtxt(fname, delimiter=delimiter, skiprows=skiprows, **kwargs)
     md, inc, azi = np.split(dev[:,0:3], 3, 1)
     md, inc, azi = checkarrays(md, inc, azi)
     md  = md.flatten()
@@ -54,3 +59,13 @@ def read_csv(fname, delimiter=',', skiprows=1, **kwargs):
     azi = azi.flatten()
 
     return md, inc, azi
+
+def csv_files(paths):
+    """Expand directories to the csv files they contain, in sorted order"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith('.csv'):
+                    yield os.path.join(path, name)
+        else:
+            yield path
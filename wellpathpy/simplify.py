@@ -0,0 +1,242 @@
+"""Error-bounded adaptive resampling and simplification of well paths
+
+Fixed-step resampling puts as many points on a straight lateral as in a
+tight build. The functions here instead place points by the geometric error
+they allow:
+
+- adaptive_depths refines minimum curvature arcs, so that no chord deviates
+  from its arc by more than a tolerance
+- douglas_peucker drops stations from a polyline, so that no dropped station
+  is further than a tolerance from the simplified polyline
+
+Both are vectorised: adaptive_depths in a single pass over the segments, and
+douglas_peucker with one pass over all open intervals per level of the
+recursion, not one python call per interval.
+"""
+import numpy as np
+
+from .geometry import dogleg
+from .voxel import ragged_arange
+
+def pieces(length, angle, tolerance):
+    """Number of equal pieces to split arcs into, to bound the chord error
+
+    A circular arc of length L, that turns by angle, has radius R = L / angle.
+    The chord of a piece that turns by a has the sagitta R (1 - cos(a / 2)),
+    the largest distance between the chord and the arc.
+
+    Parameters
+    ----------
+    length : array_like of float
+        arc lengths
+    angle : array_like of float
+        angle subtended by the arcs, in radians
+    tolerance : float
+        largest allowed sagitta
+
+    Returns
+    -------
+    pieces : array_like of int
+        at least 1
+    """
+    length = np.asarray(length, dtype = float)
+    angle = np.asarray(angle, dtype = float)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        radius = length / angle
+        # the largest angle of a piece with a sagitta of at most tolerance
+        largest = 2 * np.arccos(np.clip(1 - tolerance / radius, -1, 1))
+        n = np.ceil(angle / largest)
+    n[~np.isfinite(n) | (angle == 0)] = 1
+    return np.maximum(n, 1).astype(np.int64)
+
+def adaptive_depths(md, inc, azi, tolerance):
+    """Measured depths that resolve minimum curvature arcs to a tolerance
+
+    Every segment between survey stations is split into equal pieces, just
+    enough that the chord of every piece is within tolerance of the arc.
+    Straight segments are not split at all.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        the survey, inc and azi in degrees
+    tolerance : float
+        largest distance between the arc and the chords, in md units
+
+    Returns
+    -------
+    depths : array_like of float
+        increasing measured depths, including all survey stations
+    """
+    if not tolerance > 0:
+        raise ValueError('tolerance must be positive')
+
+    md = np.asarray(md, dtype = float)
+    if len(md) < 2:
+        return np.copy(md)
+
+    inc = np.deg2rad(inc)
+    azi = np.deg2rad(azi)
+    length = np.diff(md)
+    angle = dogleg(inc[:-1], inc[1:], azi[:-1], azi[1:])
+    n = pieces(length, angle, tolerance)
+
+    # md_upper + length * j / n, for j = 0 .. n - 1 of every segment, and
+    # the last station
+    j = ragged_arange(n)
+    depths = np.repeat(md[:-1], n) + np.repeat(length / n, n) * j
+    return np.append(depths, md[-1])
+
+def segment_distance(p, a, b):
+    """Distance from points to line segments
+
+    Parameters
+    ----------
+    p : array_like of float
+    a : array_like of float
+    b : array_like of float
+        (3, n) points, and start and end points of the segments
+
+    Returns
+    -------
+    distance : array_like of float
+    """
+    ab = b - a
+    ap = p - a
+    norm = np.einsum('ij,ij->j', ab, ab)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        t = np.einsum('ij,ij->j', ap, ab) / norm
+    t[norm == 0] = 0
+    np.clip(t, 0, 1, out = t)
+    ap -= t * ab
+    return np.sqrt(np.einsum('ij,ij->j', ap, ap))
+
+def douglas_peucker(northing, easting, depth, tolerance, offsets = None):
+    """Simplify a polyline, with a bound on the error
+
+    This is the Douglas-Peucker algorithm in 3D: an interval of the polyline
+    is replaced by its chord when all stations in between are within
+    tolerance of it, otherwise it is split at the station furthest from the
+    chord, and the halves are simplified the same way. All the open
+    intervals are processed together, one level of the recursion at a time,
+    also across the wells of a fleet in the ragged layout.
+
+    Parameters
+    ----------
+    northing : array_like of float
+    easting : array_like of float
+    depth : array_like of float
+    tolerance : float
+        largest distance between a dropped station and the simplified
+        polyline. 0 only drops stations exactly on the chords
+    offsets : array_like of int, optional
+        well boundaries, see fleet.fleet_log. Every well is simplified on its
+        own. Defaults to a single well
+
+    Returns
+    -------
+    keep : array_like of bool
+        the stations of the simplified polylines. The first and last station
+        of every well are always kept
+
+    Examples
+    --------
+    >>> keep = douglas_peucker(pos.northing, pos.easting, pos.depth, 0.5)
+    >>> pos.depth[keep]
+    """
+    if tolerance < 0:
+        raise ValueError('tolerance must be non-negative')
+
+    points = np.stack([
+        np.asarray(northing, dtype = float),
+        np.asarray(easting, dtype = float),
+        np.asarray(depth, dtype = float),
+    ])
+    n = points.shape[1]
+    if offsets is None:
+        offsets = [0, n]
+    offsets = np.asarray(offsets, dtype = np.int64)
+    nonempty = offsets[1:] > offsets[:-1]
+
+    keep = np.zeros(n, dtype = bool)
+    start = offsets[:-1][nonempty]
+    stop = offsets[1:][nonempty] - 1
+    keep[start] = True
+    keep[stop] = True
+    while True:
+        # only intervals with stations in between can be split
+        splittable = stop - start > 1
+        start, stop = start[splittable], stop[splittable]
+        if len(start) == 0:
+            return keep
+
+        # the interior stations of all intervals, in the ragged layout
+        counts = stop - start - 1
+        interval = np.repeat(np.arange(len(start)), counts)
+        index = np.repeat(start + 1, counts) + ragged_arange(counts)
+        distance = segment_distance(
+            points[:, index],
+            points[:, start[interval]],
+            points[:, stop[interval]],
+        )
+
+        # the furthest station of every interval, the first one on ties
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        furthest = np.maximum.reduceat(distance, offsets)
+        candidates = np.where(distance == furthest[interval], index, n)
+        split = np.minimum.reduceat(candidates, offsets)
+
+        over = furthest > tolerance
+        split = split[over]
+        keep[split] = True
+        start, stop = (
+            np.concatenate([start[over], split]),
+            np.concatenate([split, stop[over]]),
+        )
+
+def simplification_error(northing, easting, depth, keep, offsets = None):
+    """Largest distance between the stations and the simplified polyline
+
+    Parameters
+    ----------
+    northing : array_like of float
+    easting : array_like of float
+    depth : array_like of float
+    keep : array_like of bool
+        the kept stations, see douglas_peucker. The first and last station of
+        every well must be kept
+    offsets : array_like of int, optional
+        well boundaries, see fleet.fleet_log. Defaults to a single well
+
+    Returns
+    -------
+    error : array_like of float
+        the error of every well, 0 for empty wells
+    """
+    points = np.stack([
+        np.asarray(northing, dtype = float),
+        np.asarray(easting, dtype = float),
+        np.asarray(depth, dtype = float),
+    ])
+    n = points.shape[1]
+    if offsets is None:
+        offsets = [0, n]
+    offsets = np.asarray(offsets, dtype = np.int64)
+    error = np.zeros(len(offsets) - 1)
+    if n == 0:
+        return error
+
+    # every station lies on the chord from the kept station at or before it
+    # to the next kept station. The last station of a well is its own
+    # start, so the chord into the next well does not matter
+    kept = np.flatnonzero(keep)
+    segment = np.searchsorted(kept, np.arange(n), side = 'right') - 1
+    upper = kept[segment]
+    lower = kept[np.minimum(segment + 1, len(kept) - 1)]
+    distance = segment_distance(points, points[:, upper], points[:, lower])
+
+    nonempty = offsets[1:] > offsets[:-1]
+    error[nonempty] = np.maximum.reduceat(distance, offsets[:-1][nonempty])
+    return error
@@ -0,0 +1,296 @@
+import numpy as np
+
+from .voxel import ragged_arange, stations
+
+# bucket coordinates are packed into a single int64 key, with 21 bits per axis
+_bits = 21
+_bias = 1 << (_bits - 1)
+
+def _pack(cx, cy, cz):
+    cx = cx.astype(np.int64) + _bias
+    cy = cy.astype(np.int64) + _bias
+    cz = cz.astype(np.int64) + _bias
+    return (cx << (2 * _bits)) | (cy << _bits) | cz
+
+def _box_cells(lo, hi):
+    """All bucket coordinates in the (inclusive) integer boxes [lo, hi]
+
+    Returns the owning box and the packed key of every bucket.
+    """
+    extent = (hi - lo + 1).astype(np.int64)
+    count = extent.prod(axis = 1)
+    owner = np.repeat(np.arange(len(lo)), count)
+    k = ragged_arange(count)
+    ex = extent[owner, 0]
+    ey = extent[owner, 1]
+    cx = lo[owner, 0] + k % ex
+    cy = lo[owner, 1] + (k // ex) % ey
+    cz = lo[owner, 2] + k // (ex * ey)
+    return owner, _pack(cx, cy, cz)
+
+class spatial_index:
+    """Spatial index over the segments of many well paths
+
+    The index is a uniform-grid hash: every segment (chord between two
+    consecutive points of a position log) is registered in all the buckets
+    its bounding box overlaps, and queries only test the segments registered
+    in the buckets the query touches. It is built from numpy arrays only.
+
+    Points are (northing, easting, depth), in the same coordinate system as
+    the position logs.
+
+    Parameters
+    ----------
+    bucket_size : float
+        edge length of the (cubic) buckets. A good bucket size is in the order
+        of the survey station spacing, or the typical query radius
+
+    Notes
+    -----
+    The well path between survey stations is represented by its chord. When
+    wells are inserted with a step, minimum curvature arcs are densified so
+    that the chord approximates the arc, see voxel.stations.
+
+    Bucket coordinates are packed in 21 bits per axis, so the indexed volume
+    must be less than about 2 million buckets across in every direction.
+
+    Examples
+    --------
+    Build an index over a pad, and find the wells passing within 50 m of a
+    location:
+
+    >>> index = spatial_index(bucket_size = 50)
+    >>> for name, pos in logs.items():
+    ...     index.insert(name, pos)
+    >>> wells, md_from, md_to = index.radius((n, e, tvd), 50)
+    """
+    def __init__(self, bucket_size):
+        if not bucket_size > 0:
+            raise ValueError('bucket_size must be positive')
+
+        self.bucket_size = float(bucket_size)
+        self.wells = []
+
+        self.A = np.zeros((0, 3))
+        self.B = np.zeros((0, 3))
+        self.md_upper = np.zeros(0)
+        self.md_lower = np.zeros(0)
+        self.owner = np.zeros(0, dtype = np.int64)
+
+        self.keys = np.zeros(0, dtype = np.int64)
+        self.segments = np.zeros(0, dtype = np.int64)
+        self.pending = []
+
+    def __len__(self):
+        return len(self.wells)
+
+    @classmethod
+    def from_logs(cls, logs, bucket_size, step = None):
+        """Build an index from many position logs
+
+        Parameters
+        ----------
+        logs : dict or iterable of (well id, position_log)
+        bucket_size : float
+        step : float, optional
+            densify minimum curvature arcs, see insert
+
+        Returns
+        -------
+        index : spatial_index
+        """
+        index = cls(bucket_size)
+        try:
+            logs = logs.items()
+        except AttributeError:
+            pass
+
+        for well, pos in logs:
+            index.insert(well, pos, step = step)
+        return index
+
+    def insert(self, well, pos, step = None):
+        """Add a well to the index
+
+        The well is only queued, and the segment arrays and bucket table are
+        updated lazily, so inserting many wells in a row is cheap, and the
+        cost is paid once on the next query.
+
+        Parameters
+        ----------
+        well : hashable
+            well id, returned by the queries
+        pos : position_log
+        step : float, optional
+            maximum chord length when densifying minimum curvature arcs
+        """
+        md, n, e, depth = stations(pos, step = step)
+        p = np.column_stack([n, e, depth])
+        self.wells.append(well)
+        code = len(self.wells) - 1
+        self.pending.append((code, md, p))
+
+    def cells(self, points):
+        return np.floor(np.asarray(points) / self.bucket_size).astype(np.int64)
+
+    def flush(self):
+        """Add the pending wells, and register their segments in the bucket table
+
+        The arrays of all the pending wells are concatenated once, so building
+        an index is linear in the number of segments.
+        """
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, []
+        codes, mds, points = zip(*pending)
+        A = np.concatenate([p[:-1] for p in points])
+        B = np.concatenate([p[1:] for p in points])
+        count = [len(md) - 1 for md in mds]
+        owner = np.repeat(np.array(codes, dtype = np.int64), count)
+
+        first = len(self.A)
+        self.A = np.concatenate([self.A, A])
+        self.B = np.concatenate([self.B, B])
+        self.md_upper = np.concatenate([self.md_upper] + [md[:-1] for md in mds])
+        self.md_lower = np.concatenate([self.md_lower] + [md[1:] for md in mds])
+        self.owner = np.concatenate([self.owner, owner])
+
+        lo = self.cells(np.minimum(A, B))
+        hi = self.cells(np.maximum(A, B))
+        seg, keys = _box_cells(lo, hi)
+
+        keys = np.concatenate([self.keys, keys])
+        segments = np.concatenate([self.segments, seg + first])
+        order = np.argsort(keys, kind = 'stable')
+        self.keys = keys[order]
+        self.segments = segments[order]
+
+    def candidates(self, lower, upper):
+        """Segments registered in any bucket overlapping the box"""
+        self.flush()
+        lo = self.cells(lower)[np.newaxis, :]
+        hi = self.cells(upper)[np.newaxis, :]
+
+        # a query box larger than the index itself is cheaper to answer by
+        # testing every segment
+        if (hi - lo + 1).prod() > len(self.A):
+            return np.arange(len(self.A))
+
+        _, keys = _box_cells(lo, hi)
+        start = np.searchsorted(self.keys, keys, side = 'left')
+        stop  = np.searchsorted(self.keys, keys, side = 'right')
+        count = stop - start
+        hits = np.repeat(start, count) + ragged_arange(count)
+        return np.unique(self.segments[hits])
+
+    def ranges(self, seg, t0, t1):
+        """Merge the hit parts of segments into per-well md ranges"""
+        keep = t0 <= t1
+        seg, t0, t1 = seg[keep], t0[keep], t1[keep]
+        dmd = self.md_lower[seg] - self.md_upper[seg]
+        md_from = self.md_upper[seg] + t0 * dmd
+        md_to   = self.md_upper[seg] + t1 * dmd
+        owner = self.owner[seg]
+
+        order = np.lexsort((md_from, owner))
+        owner, md_from, md_to = owner[order], md_from[order], md_to[order]
+        if len(owner) == 0:
+            return [], md_from, md_to
+
+        # segments of a well do not overlap, so it is sufficient to compare
+        # with the previous segment
+        new = np.ones(len(owner), dtype = bool)
+        new[1:] = (owner[1:] != owner[:-1]) | (md_from[1:] > md_to[:-1])
+        first = np.flatnonzero(new)
+        last = np.append(first[1:] - 1, len(owner) - 1)
+
+        wells = [self.wells[i] for i in owner[first]]
+        return wells, md_from[first], md_to[last]
+
+    def radius(self, point, radius):
+        """Wells passing within radius of a point
+
+        Parameters
+        ----------
+        point : array_like of float
+            (northing, easting, depth)
+        radius : float
+
+        Returns
+        -------
+        wells : list
+            well id, once per md range
+        md_from : array_like of float
+        md_to : array_like of float
+            the measured depth ranges within radius of point
+        """
+        p = np.asarray(point, dtype = float)
+        seg = self.candidates(p - radius, p + radius)
+
+        A = self.A[seg]
+        D = self.B[seg] - A
+        F = A - p
+        # solve |A + tD - p|^2 = r^2 for t
+        a = np.einsum('ij,ij->i', D, D)
+        b = 2 * np.einsum('ij,ij->i', D, F)
+        c = np.einsum('ij,ij->i', F, F) - radius * radius
+        disc = b * b - 4 * a * c
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            sqrt = np.sqrt(np.maximum(disc, 0))
+            t0 = (-b - sqrt) / (2 * a)
+            t1 = (-b + sqrt) / (2 * a)
+
+        # zero-length segments are hit if their point is inside the sphere
+        point_segment = a == 0
+        t0[point_segment] = np.where(c[point_segment] <= 0, 0, 1)
+        t1[point_segment] = np.where(c[point_segment] <= 0, 1, 0)
+        t0[disc < 0] = 1
+        t1[disc < 0] = 0
+
+        return self.ranges(seg, np.maximum(t0, 0), np.minimum(t1, 1))
+
+    def box(self, lower, upper):
+        """Wells passing through an axis-aligned box
+
+        Parameters
+        ----------
+        lower : array_like of float
+            (northing, easting, depth) of the lower corner
+        upper : array_like of float
+            (northing, easting, depth) of the upper corner
+
+        Returns
+        -------
+        wells : list
+            well id, once per md range
+        md_from : array_like of float
+        md_to : array_like of float
+            the measured depth ranges inside the box
+        """
+        lower = np.asarray(lower, dtype = float)
+        upper = np.asarray(upper, dtype = float)
+        if not (lower <= upper).all():
+            raise ValueError('lower must be less than or equal to upper')
+
+        seg = self.candidates(lower, upper)
+        A = self.A[seg]
+        D = self.B[seg] - A
+
+        # slab clipping, one axis at a time
+        t0 = np.zeros(len(seg))
+        t1 = np.ones(len(seg))
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            for axis in range(3):
+                d = D[:, axis]
+                lo = (lower[axis] - A[:, axis]) / d
+                hi = (upper[axis] - A[:, axis]) / d
+                parallel = d == 0
+                outside = (A[:, axis] < lower[axis]) | (A[:, axis] > upper[axis])
+                enter = np.where(parallel, np.where(outside, 1, 0), np.minimum(lo, hi))
+                leave = np.where(parallel, np.where(outside, 0, 1), np.maximum(lo, hi))
+                t0 = np.maximum(t0, enter)
+                t1 = np.minimum(t1, leave)
+
+        return self.ranges(seg, t0, t1)
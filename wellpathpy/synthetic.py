@@ -0,0 +1,205 @@
+"""Synthetic surveys for load testing
+
+Generate fields of realistic vertical, J-shaped (build-hold), S-shaped
+(build-hold-drop) and horizontal wells. The wells are planned with the
+planning module, densified to a fixed station spacing, and perturbed with
+measurement noise. Everything is vectorised over the wells, so fields of
+millions of wells are generated without a python loop.
+"""
+import numpy as np
+
+from . import planning
+from .fleet import fleet
+from .voxel import ragged_arange
+
+profiles = ('vertical', 'j', 's', 'horizontal')
+
+def uniform(rng, bounds, n):
+    lo, hi = bounds
+    return rng.uniform(lo, hi, n)
+
+def key_stations(kinds, rng, tvd = (1500, 4000), offset = (0, 3000),
+                 kickoff = (200, 1000), build_rate = (1.5, 4),
+                 lateral_length = (500, 3000), course_length = 30,
+                 attempts = 10):
+    """Plan random wells of the given profiles
+
+    Targets are drawn uniformly from the annulus offset around the wellhead,
+    at uniform depths in tvd. Wells that cannot reach their target with the
+    drawn kickoff and build rate are redrawn, up to attempts times, after
+    which they are made vertical.
+
+    Parameters
+    ----------
+    kinds : array_like of int
+        index into profiles of every well
+    rng : numpy.random.Generator
+    tvd, offset, kickoff, build_rate, lateral_length : tuple of float
+        (low, high) bounds of the uniformly drawn parameters. build_rate is
+        also used for the drop and landing rates
+    course_length : float
+    attempts : int
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (n, 6) key stations, see planning.build_hold
+    """
+    kinds = np.asarray(kinds)
+    n = len(kinds)
+    md  = np.full((n, 6), np.nan)
+    inc = np.zeros((n, 6))
+    azi = np.zeros((n, 6))
+
+    todo = np.flatnonzero(kinds != profiles.index('vertical'))
+    for _ in range(attempts):
+        if len(todo) == 0:
+            break
+
+        m = len(todo)
+        r = np.sqrt(uniform(rng, (offset[0]**2, offset[1]**2), m))
+        theta = rng.uniform(0, 2 * np.pi, m)
+        northing = r * np.cos(theta)
+        easting  = r * np.sin(theta)
+        depth = uniform(rng, tvd, m)
+        ko = np.minimum(uniform(rng, kickoff, m), 0.5 * depth)
+        rate = uniform(rng, build_rate, m)
+
+        for kind in profiles[1:]:
+            sel = kinds[todo] == profiles.index(kind)
+            if not sel.any():
+                continue
+            args = (ko[sel], rate[sel])
+            target = (northing[sel], easting[sel], depth[sel])
+            if kind == 'j':
+                planned = planning.build_hold(*args, *target,
+                                              course_length = course_length)
+            elif kind == 's':
+                planned = planning.build_hold_drop(*args, rate[sel], *target,
+                                                   course_length = course_length)
+            else:
+                lateral = uniform(rng, lateral_length, sel.sum())
+                planned = planning.horizontal(*args, rate[sel], *target,
+                                              lateral_length = lateral,
+                                              course_length = course_length)
+            rows = todo[sel]
+            md[rows], inc[rows], azi[rows] = planned
+
+        todo = todo[np.isnan(md[todo, -1])]
+
+    # straight down, with the key stations spread evenly
+    vertical = np.isnan(md[:, -1])
+    depth = uniform(rng, tvd, vertical.sum())
+    md[vertical]  = depth[:, np.newaxis] * np.linspace(0, 1, 6)
+    inc[vertical] = 0
+    azi[vertical] = 0
+    return md, inc, azi
+
+def densify(md, inc, azi, spacing = 30):
+    """Stations every spacing along planned wells
+
+    Inclination and azimuth are interpolated linearly in md between the key
+    stations, which is exact for the planned profiles, as the builds and drops
+    are at constant rate in a vertical plane.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        (n, k) key stations, with non-decreasing md
+    spacing : float
+        station spacing in md. The last station is at the total depth
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+    offsets : array_like of int
+        the stations in the ragged layout, see fleet.fleet
+    """
+    md  = np.atleast_2d(md)
+    inc = np.atleast_2d(inc)
+    azi = np.atleast_2d(azi)
+    n, k = md.shape
+
+    total = md[:, -1]
+    counts = np.ceil(total / spacing).astype(np.int64) + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    depths = np.minimum(ragged_arange(counts) * spacing, np.repeat(total, counts))
+
+    # the section of every station is the number of interior key stations
+    # above it. With few key stations, comparing against each of them is
+    # faster than a searchsorted
+    section = np.zeros(len(depths), dtype = np.int64)
+    for j in range(1, k - 1):
+        section += depths >= np.repeat(md[:, j], counts)
+    section += np.repeat(np.arange(n) * k, counts)
+
+    md  = md.ravel()
+    inc = inc.ravel()
+    azi = azi.ravel()
+    upper, lower = md[section], md[section + 1]
+    length = lower - upper
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        t = np.where(length > 0, (depths - upper) / length, 0)
+
+    inc = inc[section] + t * (inc[section + 1] - inc[section])
+    azi = azi[section] + t * (azi[section + 1] - azi[section])
+    return depths, inc, azi, offsets
+
+def field(wells, weights = None, spacing = 30, inc_noise = 0.1, azi_noise = 0.5,
+          seed = None, **kwargs):
+    """Generate a field of synthetic wells
+
+    Parameters
+    ----------
+    wells : int
+        number of wells
+    weights : array_like of float, optional
+        relative frequency of the vertical, J-shaped, S-shaped and horizontal
+        profiles. Defaults to equal frequencies
+    spacing : float
+        station spacing in md
+    inc_noise : float
+        standard deviation of the noise added to the inclination, in degrees
+    azi_noise : float
+        standard deviation of the noise added to the azimuth, in degrees
+    seed : int or numpy.random.Generator, optional
+        seed, for reproducible fields
+    **kwargs
+        passed to key_stations, e.g. tvd = (1000, 2000)
+
+    Returns
+    -------
+    field : fleet
+
+    Examples
+    --------
+    A million wells with stations every 100 m, mostly horizontal:
+
+    >>> f = field(10**6, weights = [1, 1, 1, 7], spacing = 100, seed = 0)
+    >>> log = parallel.compute(f)
+    """
+    if not spacing > 0:
+        raise ValueError('spacing must be positive')
+
+    rng = np.random.default_rng(seed)
+    if weights is None:
+        weights = np.ones(len(profiles))
+    weights = np.asarray(weights, dtype = float)
+    if weights.shape != (len(profiles),) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError('weights must be {} non-negative values'.format(len(profiles)))
+
+    kinds = rng.choice(len(profiles), size = wells, p = weights / weights.sum())
+    keys = key_stations(kinds, rng, **kwargs)
+    md, inc, azi, offsets = densify(*keys, spacing = spacing)
+
+    inc = np.abs(inc + rng.normal(0, inc_noise, len(inc)))
+    inc = np.minimum(inc, 179.9)
+    azi = np.mod(azi + rng.normal(0, azi_noise, len(azi)), 360)
+    azi[azi >= 360] = 0
+    return fleet(md, inc, azi, offsets)
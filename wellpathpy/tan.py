@@ -1,8 +1,13 @@
 import numpy as np
 
 from .checkarrays import checkarrays
+from .tiein import tie
+from .instrument import timed
+from .workspace import accumulate, outputs, temporary
 
-def tan_method(md, inc, azi, choice='avg'):
+@timed('tan_method')
+def tan_method(md, inc, azi, choice='avg', tie_in=None, out=None, workspace=None,
+               compensated=False):
     """Calculate TVD using one of the tangential method.
 
     Parameters
@@ -16,6 +21,15 @@ def tan_method(md, inc, azi, choice='avg'):
     choice : str
         choice of tangential method to run
         one of `['high', 'low', 'avg', 'bal']`
+    tie_in : tie_in or tuple, optional
+        start the computation from this tie-in, see mincurve.minimum_curvature
+    out : tuple of array_like, optional
+        (tvd, northing, easting) arrays to write the results to, see
+        mincurve.minimum_curvature
+    workspace : workspace.workspace, optional
+        reuse the temporaries of this workspace
+    compensated : bool
+        accumulate with compensated summation, see mincurve.minimum_curvature
 
     Returns
     -------
@@ -26,9 +40,13 @@ def tan_method(md, inc, azi, choice='avg'):
     """
 
     if choice == 'bal':
-        return balanced_tan(md, inc, azi)
+        return balanced_tan(md, inc, azi, tie_in=tie_in, out=out, workspace=workspace,
+                            compensated=compensated)
 
+    n = len(md)
     md, inc, azi = checkarrays(md, inc, azi)
+    md, inc, azi, origin, skip = tie(md, inc, azi, tie_in)
+    tvd, northing, easting = outputs(out, n, 3)
 
     # convert degrees to radians for numpy functions
     azi_r = np.deg2rad(azi)
@@ -53,14 +71,23 @@ def tan_method(md, inc, azi, choice='avg'):
         choices = ['high', 'low', 'avg', 'bal']
         raise ValueError(msg.format(choice, ' '.join(choices)))
 
-    northing = np.cumsum((md_lower - md_upper) * np.sin(inc) * np.cos(azi))
-    northing = np.insert(northing, 0, 0)
+    if len(md) == 0:
+        return tvd, northing, easting
 
-    easting = np.cumsum((md_lower - md_upper) * np.sin(inc) * np.sin(azi))
-    easting = np.insert(easting, 0, 0)
+    segments = len(md) - 1
+    md_diff = np.subtract(md_lower, md_upper, out = temporary(workspace, 'md_diff', segments))
+    step = temporary(workspace, 'step', segments)
 
-    tvd = np.cumsum((md_lower - md_upper) * np.cos(inc))
-    tvd = np.insert(tvd, 0, 0)
+    np.multiply(md_diff, np.sin(inc), out = step)
+    step *= np.cos(azi)
+    accumulate(step, northing, origin[1], skip, compensated)
+
+    np.multiply(md_diff, np.sin(inc), out = step)
+    step *= np.sin(azi)
+    accumulate(step, easting, origin[2], skip, compensated)
+
+    np.multiply(md_diff, np.cos(inc), out = step)
+    accumulate(step, tvd, origin[0], skip, compensated)
 
     return tvd, northing, easting
 
@@ -205,7 +232,8 @@ def average_tan(md, inc, azi):
     """
     return tan_method(md, inc, azi, choice='avg')
 
-def balanced_tan(md, inc, azi):
+def balanced_tan(md, inc, azi, tie_in=None, out=None, workspace=None,
+                 compensated=False):
     r"""Calculate TVD using balanced tangential method.
 
     This method takes the sines and cosines of the inclination and azimuth
@@ -223,6 +251,15 @@ def balanced_tan(md, inc, azi):
         well deviation in degrees
     azi : float
         well azimuth in degrees
+    tie_in : tie_in or tuple, optional
+        start the computation from this tie-in, see mincurve.minimum_curvature
+    out : tuple of array_like, optional
+        (tvd, northing, easting) arrays to write the results to, see
+        mincurve.minimum_curvature
+    workspace : workspace.workspace, optional
+        reuse the temporaries of this workspace
+    compensated : bool
+        accumulate with compensated summation, see mincurve.minimum_curvature
 
     Notes
     -----
@@ -253,7 +290,12 @@ def balanced_tan(md, inc, azi):
     northing : array_like of float
     easting : array_like of float
     """
+    n = len(md)
     md, inc, azi = checkarrays(md, inc, azi)
+    md, inc, azi, origin, skip = tie(md, inc, azi, tie_in)
+    tvd, northing, easting = outputs(out, n, 3)
+    if len(md) == 0:
+        return tvd, northing, easting
 
     # convert degrees to radians for numpy functions
     azi_r = np.deg2rad(azi)
@@ -264,16 +306,22 @@ def balanced_tan(md, inc, azi):
     inc_upper, inc_lower = inc_r[:-1], inc_r[1:]
     azi_upper, azi_lower = azi_r[:-1], azi_r[1:]
 
-    northing = np.cumsum((md_lower - md_upper) * (np.sin(inc_upper) * np.cos(azi_upper)
-                                                  + np.sin(inc_lower) * np.cos(azi_lower)) / 2)
-    northing = np.insert(northing, 0, 0)
+    segments = len(md) - 1
+    md_diff = np.subtract(md_lower, md_upper, out = temporary(workspace, 'md_diff', segments))
+    step = temporary(workspace, 'step', segments)
 
+    np.multiply(md_diff, np.sin(inc_upper) * np.cos(azi_upper)
+                       + np.sin(inc_lower) * np.cos(azi_lower), out = step)
+    step /= 2
+    accumulate(step, northing, origin[1], skip, compensated)
 
-    easting = np.cumsum((md_lower - md_upper) * (np.sin(inc_upper) * np.sin(azi_upper)
-                                                  + np.sin(inc_lower) * np.sin(azi_lower)) / 2)
-    easting = np.insert(easting, 0, 0)
+    np.multiply(md_diff, np.sin(inc_upper) * np.sin(azi_upper)
+                       + np.sin(inc_lower) * np.sin(azi_lower), out = step)
+    step /= 2
+    accumulate(step, easting, origin[2], skip, compensated)
 
-    tvd = np.cumsum((md_lower - md_upper) * (np.cos(inc_lower) + np.cos(inc_upper)) / 2)
-    tvd = np.insert(tvd, 0, 0)
+    np.multiply(md_diff, np.cos(inc_lower) + np.cos(inc_upper), out = step)
+    step /= 2
+    accumulate(step, tvd, origin[0], skip, compensated)
 
     return tvd, northing, easting
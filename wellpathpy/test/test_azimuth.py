@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..azimuth import convert, from_header
+from ..fleet import fleet
+
+def test_magnetic_to_grid():
+    azi = convert([0, 90, 359], declination = 2, convergence = -1)
+    np.testing.assert_allclose([3, 93, 2], azi)
+
+def test_roundtrip():
+    azi = np.array([0, 10.5, 180, 359.9])
+    grid = convert(azi, declination = -7, convergence = 1.2)
+    magnetic = convert(grid, declination = -7, convergence = 1.2,
+                       source = 'grid', target = 'magnetic')
+    np.testing.assert_allclose(azi, magnetic, atol = 1e-12)
+
+def test_wrap_stays_in_domain():
+    azi = convert([0.0], convergence = 1e-17, source = 'true')
+    assert 0 <= azi[0] < 360
+
+def test_unknown_reference_throws():
+    with pytest.raises(ValueError):
+        _ = convert([0], source = 'compass')
+
+def test_per_station_values():
+    azi = convert([10, 20, 30], declination = [1, 2, 3], source = 'magnetic', target = 'true')
+    np.testing.assert_allclose([11, 22, 33], azi)
+
+def test_from_header():
+    header = {'azimuth_reference': 'magnetic', 'declination': 5.0, 'grid_convergence': 1.0}
+    azi, updated = from_header([100], header)
+    np.testing.assert_allclose([104], azi)
+    assert updated['azimuth_reference'] == 'grid'
+    assert header['azimuth_reference'] == 'magnetic'
+
+def test_fleet_per_well():
+    a = deviation([0, 10, 20], [0, 5, 10], [350, 355, 359])
+    b = deviation([0, 50], [0, 1], [10, 20])
+    f = fleet.from_deviations([a, b])
+    g = f.convert_azimuth(declination = [3, -3], convergence = [0, 1])
+    np.testing.assert_allclose([353, 358, 2], g[0].azi)
+    np.testing.assert_allclose([6, 16], g[1].azi)
+    np.testing.assert_array_equal(f.md, g.md)
+
+def test_fleet_layout():
+    a = deviation([0, 10, 20], [0, 5, 10], [0, 0, 0])
+    b = deviation([5, 50], [0, 1], [10, 20])
+    f = fleet.from_deviations([a, b], names = ['a', 'b'])
+    assert len(f) == 2
+    np.testing.assert_array_equal([3, 2], f.lengths)
+    np.testing.assert_array_equal([0, 3, 5], f.offsets)
+    np.testing.assert_array_equal(b.md, f[1].md)
+    np.testing.assert_array_equal([1, 1, 1, 2, 2], f.repeat([1, 2]))
+
+def test_fleet_md_must_increase_within_wells():
+    with pytest.raises(ValueError):
+        _ = fleet([0, 10, 20, 20], [0] * 4, [0] * 4, [0, 2, 4])
+    with pytest.raises(ValueError):
+        _ = fleet([0, 10, 5, 20], [0] * 4, [0] * 4, [0, 3, 4])
+    _ = fleet([0, 10, 5, 20], [0] * 4, [0] * 4, [0, 2, 4])
@@ -0,0 +1,192 @@
+import os
+import threading
+
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..cache import cache, disk_cache, fingerprint
+
+md  = [0, 100, 200, 300]
+inc = [0, 10, 20, 30]
+azi = [0, 45, 90, 135]
+
+def test_hit_and_miss():
+    memo = cache()
+    dev = deviation(md, inc, azi)
+    first = dev.minimum_curvature(cache = memo)
+    second = deviation(md, inc, azi).minimum_curvature(cache = memo)
+    assert (memo.hits, memo.misses) == (1, 1)
+    np.testing.assert_array_equal(first.depth, second.depth)
+    np.testing.assert_array_equal(first.dls, second.dls)
+
+def test_parameters_are_part_of_key():
+    memo = cache()
+    dev = deviation(md, inc, azi)
+    m = dev.minimum_curvature(course_length = 30, cache = memo)
+    f = dev.minimum_curvature(course_length = 100, cache = memo)
+    _ = dev.tan_method('high', cache = memo)
+    _ = dev.tan_method('low', cache = memo)
+    _ = dev.radius_curvature(cache = memo)
+    assert memo.misses == 5
+    assert memo.hits == 0
+    assert not np.array_equal(m.dls, f.dls)
+
+def test_changed_survey_misses():
+    a = deviation(md, inc, azi)
+    b = deviation(md, inc, [0, 45, 90, 136])
+    assert fingerprint(a, 'minimum_curvature') != fingerprint(b, 'minimum_curvature')
+    assert fingerprint(a, 'minimum_curvature') == fingerprint(a.copy(), 'minimum_curvature')
+
+def test_returned_logs_are_copies():
+    memo = cache()
+    dev = deviation(md, inc, azi)
+    pos = dev.minimum_curvature(cache = memo)
+    pos.to_wellhead(1000, 1000, inplace = True)
+    again = dev.minimum_curvature(cache = memo)
+    assert again.northing[0] == 0
+
+def test_hit_does_not_validate_again(monkeypatch):
+    import importlib
+    position_log = importlib.import_module('wellpathpy.position_log')
+    memo = cache()
+    dev = deviation(md, inc, azi, units = 'm')
+    pos = dev.minimum_curvature(cache = memo)
+
+    def checkarrays(*args, **kwargs):
+        raise AssertionError('validated on a hit')
+    monkeypatch.setattr(position_log, 'checkarrays', checkarrays)
+
+    again = dev.minimum_curvature(cache = memo)
+    assert memo.hits == 1
+    assert type(again) is type(pos)
+    assert again.units == again.source.units == 'm'
+    assert again.course_length == pos.course_length
+    for x, y in [(pos.depth, again.depth), (pos.dls, again.dls),
+                 (pos.source.azi, again.source.azi)]:
+        np.testing.assert_array_equal(x, y)
+    assert not np.shares_memory(pos.depth, again.depth)
+    assert not np.shares_memory(pos.source.md, again.source.md)
+    # resampling builds a new, checked, survey from the arcs of the copy
+    monkeypatch.undo()
+    np.testing.assert_array_equal(
+        pos.resample(depths = [150]).depth,
+        again.resample(depths = [150]).depth,
+    )
+
+def test_lru_eviction_by_bytes():
+    dev = deviation(md, inc, azi)
+    size = 7 * 4 * 8
+    memo = cache(maxbytes = 2 * size)
+    _ = dev.minimum_curvature(course_length = 1, cache = memo)
+    _ = dev.minimum_curvature(course_length = 2, cache = memo)
+    _ = dev.minimum_curvature(course_length = 1, cache = memo)
+    _ = dev.minimum_curvature(course_length = 3, cache = memo)
+    assert len(memo) == 2
+    assert memo.nbytes == 2 * size
+    # 2 was least recently used
+    _ = dev.minimum_curvature(course_length = 1, cache = memo)
+    _ = dev.minimum_curvature(course_length = 2, cache = memo)
+    assert (memo.hits, memo.misses) == (2, 4)
+
+def test_threaded_access():
+    memo = cache()
+    devs = [deviation(md, inc, np.mod(np.array(azi) + i, 360)) for i in range(10)]
+
+    def work():
+        for _ in range(20):
+            for dev in devs:
+                _ = dev.minimum_curvature(cache = memo)
+
+    threads = [threading.Thread(target = work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert memo.hits + memo.misses == 4 * 20 * 10
+    assert len(memo) == 10
+
+def test_disk_cache_survives_restart(tmpdir):
+    dev = deviation(md, inc, azi)
+    expected = dev.minimum_curvature(course_length = 100)
+
+    first = disk_cache(str(tmpdir))
+    _ = dev.minimum_curvature(course_length = 100, cache = first)
+    assert first.misses == 1
+
+    second = disk_cache(str(tmpdir))
+    result = dev.minimum_curvature(course_length = 100, cache = second)
+    assert (second.hits, second.misses) == (1, 0)
+    assert type(result) is type(expected)
+    np.testing.assert_array_equal(expected.depth, result.depth)
+    np.testing.assert_array_equal(expected.dls, result.dls)
+    np.testing.assert_array_equal(expected.source.azi, result.source.azi)
+
+    _ = dev.tan_method('bal', cache = second)
+    log = dev.tan_method('bal', cache = disk_cache(str(tmpdir)))
+    assert type(log).__name__ == 'tan_method'
+
+def test_disk_cache_load_csv(tmpdir):
+    fname = str(tmpdir.join('well.csv'))
+    with open(fname, 'w') as f:
+        f.write('md,inc,azi\n0,0,0\n100,10,45\n200,20,90\n')
+
+    store = disk_cache(str(tmpdir.join('cache')))
+    first = store.load_csv(fname, course_length = 30)
+    again = store.load_csv(fname, course_length = 30)
+    assert (store.hits, store.misses) == (1, 1)
+    np.testing.assert_array_equal(first.northing, again.northing)
+
+    # changed content and changed parameters are misses
+    _ = store.load_csv(fname, course_length = 100)
+    with open(fname, 'a') as f:
+        f.write('300,30,135\n')
+    changed = store.load_csv(fname, course_length = 30)
+    assert store.misses == 3
+    assert len(changed.depth) == 4
+
+def test_disk_cache_evicts_least_recently_used(tmpdir):
+    store = disk_cache(str(tmpdir))
+    logs = [deviation(md, inc, azi).minimum_curvature(course_length = c)
+            for c in (10, 20, 30)]
+    for i, log in enumerate(logs):
+        store.put(bytes([i]), log)
+    size = max(s for _, s, _ in store.entries())
+    assert len(store.entries()) == 3
+
+    store.maxbytes = 2 * size
+    store.evict()
+    assert store.get(bytes([0])) is None
+    assert store.get(bytes([2])) is not None
+    assert not [x for x in os.listdir(str(tmpdir)) if x.endswith('.tmp')]
+
+def test_disk_cache_put_scans_only_when_full(tmpdir, monkeypatch):
+    store = disk_cache(str(tmpdir))
+    scans = []
+    entries = store.entries
+    monkeypatch.setattr(store, 'entries', lambda: scans.append(1) or entries())
+
+    log = deviation(md, inc, azi).minimum_curvature()
+    for i in range(50):
+        store.put(bytes([i]), log)
+    # only the first put scans, to initialise the size estimate
+    assert len(scans) == 1
+    size = os.path.getsize(store.path(bytes([0])))
+    assert store.nbytes == 50 * size
+
+    # overwriting a file does not grow the estimate
+    store.put(bytes([0]), log)
+    assert store.nbytes == 50 * size
+
+    store.maxbytes = 10 * size
+    store.put(bytes([50]), log)
+    assert len(scans) == 2
+    assert len(entries()) == 10
+    assert store.nbytes == 10 * size
+    assert store.get(bytes([50])) is not None
+
+def test_disk_cache_ignores_corrupt_files(tmpdir):
+    store = disk_cache(str(tmpdir))
+    with open(store.path(b'\x01'), 'wb') as f:
+        f.write(b'not a zip file')
+    assert store.get(b'\x01') is None
@@ -0,0 +1,153 @@
+import io
+import json
+import sys
+
+import pytest
+import numpy as np
+
+from .. import deviation
+from .. import cli
+
+md  = [0, 100, 200, 300, 400]
+inc = [0, 10, 20, 30, 40]
+azi = [0, 45, 90, 90, 90]
+
+header = {
+    'datum': 'kb',
+    'elevation_units': 'm',
+    'elevation': 100,
+    'surface_coordinates_units': 'm',
+    'surface_easting': 1000,
+    'surface_northing': 2000,
+}
+
+def parse_long(text):
+    lines = text.strip().splitlines()
+    assert lines[0] == 'well,md,easting,northing,depth,dls'
+    names = [line.split(',')[0] for line in lines[1:]]
+    values = np.array([line.split(',')[1:] for line in lines[1:]], dtype = float)
+    return names, values
+
+@pytest.fixture
+def surveys(tmpdir):
+    for name, scale in [('a', 1), ('b', 2)]:
+        dev = deviation(np.multiply(md, scale), inc, azi)
+        dev.to_csv(str(tmpdir.join(name + '.csv')))
+    return tmpdir
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_directory_to_stdout(surveys, capsys, jobs):
+    assert cli.main([str(surveys), '--jobs', str(jobs)]) == 0
+    names, values = parse_long(capsys.readouterr().out)
+    assert names == ['a'] * 5 + ['b'] * 5
+
+    pos = deviation(np.multiply(md, 2), inc, azi).minimum_curvature()
+    np.testing.assert_allclose(values[5:, 3], pos.depth, atol = 1e-3)
+    np.testing.assert_allclose(values[5:, 1], pos.easting, atol = 1e-3)
+
+def test_stdin_long_format_with_manifest(tmpdir, capsys, monkeypatch):
+    manifest = str(tmpdir.join('manifest.json'))
+    with open(manifest, 'w') as f:
+        json.dump({'w1': header}, f)
+
+    lines = ['well,md,inc,azi']
+    lines += ['w1,{},{},{}'.format(*row) for row in zip(md, inc, azi)]
+    lines += ['w2,{},{},{}'.format(*row) for row in zip(md, inc, azi)]
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('\n'.join(lines) + '\n'))
+
+    assert cli.main(['-', '--manifest', manifest, '--step', '50']) == 0
+    names, values = parse_long(capsys.readouterr().out)
+    assert names == ['w1'] * 9 + ['w2'] * 9
+    np.testing.assert_allclose(values[:9, 0], np.arange(0, 401, 50))
+
+    pos = deviation(md, inc, azi).minimum_curvature()
+    pos = pos.to_wellhead(surface_northing = 2000, surface_easting = 1000)
+    pos = pos.to_tvdss(datum_elevation = 100)
+    np.testing.assert_allclose(values[[0, 2, 4, 6, 8], 2], pos.northing, atol = 1e-3)
+    np.testing.assert_allclose(values[[0, 2, 4, 6, 8], 3], pos.depth, atol = 1e-3)
+    # w2 is not in the manifest, and is not moved
+    assert values[9, 2] == 0
+
+def test_output_directory_and_errors(surveys, tmpdir, capsys):
+    with open(str(surveys.join('bad.csv')), 'w') as f:
+        f.write('md,inc,azi\n0,0,0\n0,0,0\n')
+
+    out = tmpdir.join('out')
+    status = cli.main([str(surveys), '-o', str(out), '-m', 'tan_method', '--choice', 'bal'])
+    assert status == 1
+    assert 'bad' in capsys.readouterr().err
+    assert sorted(x.basename for x in out.listdir()) == ['a.csv', 'b.csv']
+
+    fname = str(out.join('a.csv'))
+    with open(fname) as f:
+        assert f.readline().strip() == 'md,easting,northing,depth,dls'
+    values = np.loadtxt(fname, delimiter = ',', skiprows = 1)
+    expected = deviation(md, inc, azi).tan_method('bal')
+    np.testing.assert_allclose(values[:, 0], md)
+    np.testing.assert_allclose(values[:, 3], expected.depth, atol = 1e-3)
+    # dls does not depend on the method
+    mincurve = deviation(md, inc, azi).minimum_curvature()
+    np.testing.assert_allclose(values[:, 4], mincurve.dls, atol = 1e-3)
+
+def test_step_that_does_not_divide_the_survey(tmpdir, capsys, monkeypatch):
+    # arange(1, 1.3, 0.1) overshoots the last station by rounding
+    lines = ['well,md,inc,azi', 'w,1,0,0', 'w,1.3,1,10']
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('\n'.join(lines) + '\n'))
+    assert cli.main(['-', '--step', '0.1']) == 0
+    names, values = parse_long(capsys.readouterr().out)
+    assert names == ['w'] * 4
+    np.testing.assert_allclose(values[:, 0], [1, 1.1, 1.2, 1.3])
+
+def test_well_names_stay_in_output_directory(tmpdir, capsys, monkeypatch):
+    names = ['../escape', 'sub/well', str(tmpdir.join('abs')), '..', 'ok']
+    lines = ['well,md,inc,azi']
+    for name in names:
+        lines += ['{},{},{},{}'.format(name, *row) for row in zip(md, inc, azi)]
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('\n'.join(lines) + '\n'))
+
+    out = tmpdir.join('out')
+    assert cli.main(['-', '-o', str(out)]) == 1
+    assert [x.basename for x in out.listdir()] == ['ok.csv']
+    assert sorted(x.basename for x in tmpdir.listdir()) == ['out']
+    err = capsys.readouterr().err
+    assert err.count('not a valid file name') == 4
+
+def test_step_requires_minimum_curvature(surveys):
+    with pytest.raises(SystemExit):
+        cli.main([str(surveys), '-m', 'radius_curvature', '--step', '1'])
+
+def test_units_are_converted_on_input(surveys, capsys):
+    assert cli.main([str(surveys.join('a.csv')), '--units', 'ft']) == 0
+    _, values = parse_long(capsys.readouterr().out)
+
+    pos = deviation(np.multiply(md, 0.3048), inc, azi).minimum_curvature()
+    np.testing.assert_allclose(values[:, 0], np.multiply(md, 0.3048), atol = 1e-3)
+    np.testing.assert_allclose(values[:, 3], pos.depth, atol = 1e-3)
+
+def test_course_length_and_step_are_in_input_units(surveys, capsys):
+    fname = str(surveys.join('a.csv'))
+    assert cli.main([fname, '--units', 'ft', '--step', '50']) == 0
+    _, default = parse_long(capsys.readouterr().out)
+    assert cli.main([fname, '--units', 'ft', '--step', '50',
+                     '--course-length', '100']) == 0
+    _, explicit = parse_long(capsys.readouterr().out)
+    np.testing.assert_array_equal(default, explicit)
+
+    native = deviation(md, inc, azi, units = 'ft').minimum_curvature()
+    native = native.resample(depths = np.arange(0, 401, 50))
+    np.testing.assert_allclose(default[:, 4], native.dls, atol = 1e-3)
+    np.testing.assert_allclose(default[:, 0], np.arange(0, 401, 50) * 0.3048, atol = 1e-3)
+    np.testing.assert_allclose(default[:, 3], native.depth * 0.3048, atol = 1e-3)
+    np.testing.assert_allclose(default[:, 1], native.easting * 0.3048, atol = 1e-3)
+
+def test_course_length_scales_dls(surveys, capsys):
+    fname = str(surveys.join('a.csv'))
+    assert cli.main([fname, '--course-length', '10']) == 0
+    _, values = parse_long(capsys.readouterr().out)
+    pos = deviation(md, inc, azi).minimum_curvature(course_length = 10)
+    np.testing.assert_allclose(values[:, 4], pos.dls, atol = 1e-3)
+    assert values[1, 4] > 0
+
+def test_unknown_units_is_usage_error(surveys):
+    with pytest.raises(SystemExit):
+        cli.main([str(surveys), '--units', 'furlong'])
@@ -1,4 +1,31 @@
+import subprocess
+import sys
+
 import pytest
 
 def test_fail():
     assert True
+
+def test_import_is_lazy():
+    code = '\n'.join([
+        'import sys',
+        'import wellpathpy',
+        'assert "numpy" not in sys.modules',
+        'assert "importlib.metadata" not in sys.modules',
+        'assert "wellpathpy.position_log" not in sys.modules',
+    ])
+    subprocess.check_call([sys.executable, '-c', code])
+
+def test_public_api():
+    import wellpathpy as wp
+    import wellpathpy.cache
+    import wellpathpy.position_log
+    for name in wp.__all__:
+        assert getattr(wp, name) is not None
+    # the position_log submodule does not shadow the class
+    assert isinstance(wp.position_log, type)
+    assert wp.minimum_curvature.__module__ == 'wellpathpy.position_log'
+    assert wp.fleet.fleet is not None
+    assert 'deviation' in dir(wp)
+    with pytest.raises(AttributeError):
+        _ = wp.no_such_attribute
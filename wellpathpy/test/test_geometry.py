@@ -204,3 +204,30 @@ def test_normalize():
     npt.assert_array_almost_equal(geometry.normalize(b), normb)
     ab = [a, b]
     npt.assert_array_almost_equal(geometry.normalize(ab), [norma, normb])
+
+def test_dogleg_matches_angle_between():
+    rng = np.random.default_rng(0)
+    inc = rng.uniform(0, np.pi, (2, 1000))
+    azi = rng.uniform(0, 2 * np.pi, (2, 1000))
+    u = np.column_stack(geometry.direction_vector_radians(inc[0], azi[0]))
+    v = np.column_stack(geometry.direction_vector_radians(inc[1], azi[1]))
+    npt.assert_allclose(geometry.dogleg(inc[0], inc[1], azi[0], azi[1]),
+                        angle_between(u, v), atol = 1e-12)
+
+def test_dogleg_small_angles_are_exact():
+    deltas = 10.0 ** np.arange(-14, -1)
+    base = np.deg2rad(37.0)
+    exact = (base + deltas) - base
+    npt.assert_allclose(geometry.dogleg(base, base + deltas, 1.0, 1.0), exact, rtol = 1e-15)
+
+    exact = (base + deltas) - base
+    horizontal = np.pi / 2
+    npt.assert_allclose(geometry.dogleg(horizontal, horizontal, base, base + deltas),
+                        exact, rtol = 1e-12)
+
+def test_dogleg_extremes():
+    assert geometry.dogleg(0.3, 0.3, 1, 1) == 0
+    assert geometry.dogleg(np.pi / 2, np.pi / 2, 0, np.pi) == approx(np.pi)
+    sin, cos = geometry.half_dogleg(0, np.pi / 2, 0, 0)
+    assert sin == approx(np.sqrt(0.5))
+    assert cos == approx(np.sqrt(0.5))
@@ -55,4 +55,19 @@ def test_non_floats_raise():
         json.dump(header, output)
         output.seek(0)
         with pytest.raises(ValueError):
-            _ = read_header_json(output)
\ No newline at end of file
+            _ = read_header_json(output)
+
+def test_azimuth_reference():
+    header = dict(good_header, azimuth_reference = 'magnetic', declination = '2.5')
+    output = io.StringIO()
+    json.dump(header, output)
+    output.seek(0)
+    header = read_header_json(output)
+    assert header['declination'] == 2.5
+
+    header = dict(good_header, azimuth_reference = 'compass')
+    output = io.StringIO()
+    json.dump(header, output)
+    output.seek(0)
+    with pytest.raises(ValueError):
+        _ = read_header_json(output)
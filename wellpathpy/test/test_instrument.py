@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from .. import deviation, read_csv
+from .. import instrument
+from ..instrument import profiler
+
+md  = np.linspace(0, 3000, 301)
+inc = np.linspace(0, 90, 301)
+azi = np.linspace(0, 180, 301)
+
+def test_disabled_records_nothing():
+    assert instrument.active is None
+    assert instrument.stage('anything') is instrument.null
+    prof = profiler()
+    _ = deviation(md, inc, azi).minimum_curvature()
+    assert prof.to_dict() == {}
+
+def test_stages_are_recorded():
+    with profiler() as prof:
+        pos = deviation(md, inc, azi).minimum_curvature()
+        _ = pos.resample(depths = [10, 20, 30])
+        _ = pos.resample(depths = [40])
+    assert instrument.active is None
+
+    stats = prof.to_dict()
+    assert stats['checkarrays']['calls'] >= 1
+    for name in ('minimum_curvature', 'minimum_curvature.increments',
+                 'minimum_curvature.cumsum'):
+        assert stats[name]['calls'] == 1
+    assert stats['resample']['calls'] == 2
+    assert stats['arcs']['calls'] == 2
+    # nested stages are included in the enclosing stage
+    assert stats['minimum_curvature']['seconds'] >= stats['minimum_curvature.cumsum']['seconds']
+    assert json.loads(prof.to_json()) == stats
+
+def test_memory_and_callback(tmpdir):
+    fname = str(tmpdir.join('dev.csv'))
+    deviation(md, inc, azi).to_csv(fname)
+
+    calls = []
+    with profiler(memory = True, callback = lambda *x: calls.append(x)) as prof:
+        _ = read_csv(fname)
+        _ = deviation(md, inc, azi).minimum_curvature()
+
+    stats = prof.to_dict()
+    assert stats['read_csv']['calls'] == 1
+    assert stats['read_csv.parse']['bytes'] > 0
+    # minimum curvature allocates at least a handful of float arrays
+    assert stats['minimum_curvature']['bytes'] >= 4 * md.nbytes
+    assert stats['minimum_curvature']['bytes'] >= stats['minimum_curvature.increments']['bytes']
+    names = [name for name, _, _ in calls]
+    assert 'deviation_to_csv' not in names
+    assert names.count('read_csv') == 1
+    assert set(names) == set(stats)
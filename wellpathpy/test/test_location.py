@@ -2,7 +2,9 @@ import pytest
 import numpy as np
 
 from ..mincurve import minimum_curvature
-from ..location import to_wellhead, to_zero, to_tvdss
+from ..location import to_wellhead, to_zero, to_tvdss, transform
+from ..position_log import deviation, position_log
+from ..fleet import fleet_log
 
 # import test well data
 well9 = np.loadtxt('./wellpathpy/test/fixtures/well9.csv', delimiter=",", skiprows=1)
@@ -105,4 +107,65 @@ def test_tvdss():
         )
     np.testing.assert_allclose(tvdss, well10_true_datum_elevation - well10_true_tvd_m)
     np.testing.assert_equal(mN, well10_northing)
-    np.testing.assert_equal(mE, well10_easting)
\ No newline at end of file
+    np.testing.assert_equal(mE, well10_easting)
+
+def test_transform_chain_matches_functions():
+    tvd, n, e, _ = minimum_curvature(well9_true_md_m, well9_true_inc, well9_true_azi)
+    sn, se = well9_true_surface_northing, well9_true_surface_easting
+    elevation = well9_true_datum_elevation
+
+    expected = to_tvdss(*to_wellhead(np.copy(tvd), np.copy(n), np.copy(e), sn, se), elevation)
+    t = transform().to_wellhead(sn, se).to_tvdss(elevation)
+    for x, y in zip(expected, t(tvd, n, e)):
+        np.testing.assert_array_equal(x, y)
+
+    back = t.then(transform().to_tvdss(elevation)).to_zero(sn, se)
+    for x, y in zip((tvd, n, e), back(tvd, n, e)):
+        np.testing.assert_allclose(x, y, atol = 1e-9)
+
+    ft = transform().to_units(1 / 0.3048)(tvd, n, e)
+    np.testing.assert_allclose(ft[0] * 0.3048, tvd)
+
+def test_transform_position_log():
+    dev = deviation(well9_true_md_m, well9_true_inc, well9_true_azi)
+    pos = dev.minimum_curvature()
+    t = transform().to_wellhead(100, 200).to_tvdss(50)
+
+    moved = t.apply(pos)
+    assert moved is not pos
+    np.testing.assert_array_equal(moved.depth, 50 - pos.depth)
+    np.testing.assert_array_equal(moved.northing, pos.northing + 100)
+
+    depth = pos.depth
+    original = np.copy(depth)
+    same = t.apply(pos, inplace = True)
+    assert same is pos
+    np.testing.assert_array_equal(pos.depth, moved.depth)
+    # new arrays are bound, and the old ones, which may be shared, are kept
+    np.testing.assert_array_equal(depth, original)
+
+def test_transform_int_positions():
+    dev = deviation([0, 1, 2], [0, 0, 0], [0, 0, 0])
+    pos = position_log(dev, np.arange(3), np.zeros(3, dtype = int), np.zeros(3, dtype = int))
+    t = transform().to_wellhead(0.5, 1.5).to_tvdss(10.25)
+    for inplace in [False, True]:
+        moved = t.apply(pos.copy(), inplace = inplace)
+        np.testing.assert_array_equal(moved.depth, [10.25, 9.25, 8.25])
+        np.testing.assert_array_equal(moved.northing, 0.5)
+        np.testing.assert_array_equal(moved.easting, 1.5)
+
+def test_transform_fleet_per_well():
+    log = fleet_log(
+        md = np.arange(5.0),
+        depth = np.arange(5.0),
+        northing = np.zeros(5),
+        easting = np.array([0, 0, 0, np.nan, np.nan]),
+        dls = np.zeros(5),
+        offsets = [0, 3, 5],
+    )
+    t = transform().to_wellhead([10, 20], [1, 2]).to_tvdss(100)
+    moved = t.apply(log)
+    np.testing.assert_array_equal(moved.northing, [10, 10, 10, 20, 20])
+    np.testing.assert_array_equal(moved.easting, [1, 1, 1, np.nan, np.nan])
+    np.testing.assert_array_equal(moved.depth, 100 - np.arange(5.0))
+    np.testing.assert_array_equal(log.northing, 0)
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from .. import lod
+from .. import parallel
+from ..simplify import douglas_peucker, simplification_error
+from ..synthetic import field
+
+@pytest.fixture(scope = 'module')
+def log():
+    return parallel.compute(field(20, spacing = 10, seed = 4), workers = 1)
+
+def test_tolerances():
+    np.testing.assert_array_equal([0, 0.5, 1, 2], lod.tolerances(4, 0.5))
+    with pytest.raises(ValueError):
+        _ = lod.tolerances(0)
+    with pytest.raises(ValueError):
+        _ = lod.tolerances(3, factor = 1)
+
+def test_fleet_douglas_peucker_matches_per_well(log):
+    keep = douglas_peucker(log.northing, log.easting, log.depth, 2.0,
+                           offsets = log.offsets)
+    for i in range(len(log)):
+        s = slice(log.offsets[i], log.offsets[i + 1])
+        expected = douglas_peucker(log.northing[s], log.easting[s], log.depth[s], 2.0)
+        np.testing.assert_array_equal(expected, keep[s])
+
+def test_levels_are_contiguous_and_bounded(log):
+    p = lod.build(log, levels = 6, tolerance = 0.5)
+    assert len(p) == len(log)
+    assert p.levels == 6
+    assert p.offsets[0, 0] == 0
+    assert p.offsets[-1, -1] == len(p.md)
+    np.testing.assert_array_equal(p.offsets[:-1, -1], p.offsets[1:, 0])
+
+    # level 0 is the full resolution
+    np.testing.assert_array_equal(log.md, p.md[:len(log.md)])
+    assert (p.errors[0] == 0).all()
+    assert (p.errors <= p.tolerances[:, np.newaxis]).all()
+
+    sizes = np.diff(p.offsets[:, [0, -1]], axis = 1).ravel()
+    assert (np.diff(sizes) <= 0).all()
+    assert sizes[-1] < sizes[0] / 2
+
+    # the recorded error matches the error of the stored points
+    for i in range(len(p)):
+        s = slice(log.offsets[i], log.offsets[i + 1])
+        md, northing, easting, depth = p.well(i, level = 3)
+        assert md[0] == log.md[s][0] and md[-1] == log.md[s][-1]
+        keep = np.isin(log.md[s], md)
+        error = simplification_error(log.northing[s], log.easting[s],
+                                     log.depth[s], keep)
+        assert error[0] == pytest.approx(p.errors[3, i])
+
+def test_query():
+    p = lod.pyramid([], [], [], [], np.zeros((4, 3)), [0, 1, 2, 4],
+                    [[0, 0], [0.5, 1], [0.5, 2], [3, 4]])
+    assert p.level(0.5) == 0
+    assert p.level(1) == 1
+    assert p.level(100) == 3
+    # 10 m pixels, half a pixel
+    assert p.query(10, pixels = 0.2) == 2
+    np.testing.assert_array_equal([2, 1], p.select(1))
+    np.testing.assert_array_equal([0, 0], p.select(0.1))
+    np.testing.assert_array_equal([3], p.select(5, wells = [1]))
+
+def test_save_load_mmap(log, tmpdir):
+    p = lod.build(log, levels = 4, tolerance = 1.0)
+    p.save(str(tmpdir))
+    q = lod.pyramid.load(str(tmpdir))
+    assert isinstance(q.depth, np.memmap)
+    assert q.names == [str(name) for name in p.names]
+    np.testing.assert_array_equal(p.offsets, q.offsets)
+    np.testing.assert_array_equal(p.errors, q.errors)
+    for a, b in zip(p.arrays(2), q.arrays(2)):
+        np.testing.assert_array_equal(a, b)
+    md, _, _, _, offsets = q.arrays(2)
+    assert offsets[0] == 0 and offsets[-1] == len(md)
+
+def test_build_from_position_logs():
+    logs = [
+        deviation([0, 100, 200, 300], [0, 0, 0, 0], [0, 0, 0, 0]).minimum_curvature(),
+        deviation([0, 100, 200], [0, 30, 60], [0, 90, 90]).minimum_curvature(),
+    ]
+    p = lod.build(logs, levels = 3, tolerance = 1.0)
+    md, _, _, depth = p.well(0, level = 2)
+    np.testing.assert_array_equal([0, 300], md)
+    np.testing.assert_array_equal([0, 300], depth)
+    np.testing.assert_array_equal(logs[1].depth, p.well(1, level = 0)[3])
@@ -2,6 +2,9 @@ import pytest
 import numpy as np
 
 from ..mincurve import minimum_curvature
+from ..rad_curv import radius_curvature
+from ..tan import tan_method, balanced_tan
+from ..workspace import workspace
 
 # inputs are array-like
 def test_md_throws():
@@ -30,3 +33,133 @@ def test_increasing_md_throws():
 def test_bad_normalising_throws():
     with pytest.raises(TypeError):
         _ = minimum_curvature(md=[1,2,3], inc=[1,2,3], azi=[1,2,3], course_length='0')
+
+def test_chunked_is_identical(tmp_path):
+    from ..mincurve import minimum_curvature_chunked
+    rng = np.random.default_rng(3)
+    n = 1000
+    md  = np.cumsum(rng.uniform(0.1, 2, n))
+    inc = np.clip(np.cumsum(rng.normal(0, 0.5, n)) + 45, 0, 120)
+    azi = np.mod(np.cumsum(rng.normal(0, 1, n)), 360)
+    expected = minimum_curvature(md, inc, azi)
+
+    for name, data in {'md': md, 'inc': inc, 'azi': azi}.items():
+        np.save(str(tmp_path / (name + '.npy')), data)
+    inputs = [np.load(str(tmp_path / (name + '.npy')), mmap_mode = 'r') for name in ['md', 'inc', 'azi']]
+    out = [
+        np.lib.format.open_memmap(str(tmp_path / (name + '.npy')), mode = 'w+', shape = (n,))
+        for name in ['tvd', 'northing', 'easting', 'dls']
+    ]
+
+    for blocksize in [2, 7, 999, 1000, 5000]:
+        result = minimum_curvature_chunked(*inputs, blocksize = blocksize, out = out)
+        for x, y in zip(expected, result):
+            np.testing.assert_array_equal(x, y)
+
+def test_chunked_checks_across_blocks():
+    from ..mincurve import minimum_curvature_chunked
+    with pytest.raises(ValueError):
+        _ = minimum_curvature_chunked([1, 2, 3, 3, 4], [1] * 5, [1] * 5, blocksize = 3)
+
+@pytest.mark.parametrize('engine, count', [
+    (minimum_curvature, 4),
+    (radius_curvature, 3),
+    (tan_method, 3),
+    (balanced_tan, 3),
+])
+def test_out_and_workspace(engine, count):
+    ws = workspace()
+    for n in [5, 50, 20]:
+        md  = np.linspace(0, 10 * n, n)
+        inc = np.linspace(0, 60, n)
+        azi = np.linspace(10, 80, n)
+        expected = engine(md, inc, azi)
+
+        out = tuple(np.full(n, np.nan) for _ in range(count))
+        result = engine(md, inc, azi, out = out, workspace = ws)
+        for x, y, z in zip(result, out, expected):
+            assert x is y
+            np.testing.assert_array_equal(x, z)
+
+    # the workspace only grows
+    assert ws.get('md_diff', 1).base.shape == (49,)
+
+def test_bad_out_throws():
+    md, inc, azi = [0, 10, 20], [0, 5, 10], [0, 0, 0]
+    with pytest.raises(ValueError):
+        _ = minimum_curvature(md, inc, azi, out = [np.zeros(3)] * 3)
+    with pytest.raises(ValueError):
+        _ = minimum_curvature(md, inc, azi, out = [np.zeros(4)] * 4)
+    with pytest.raises(ValueError):
+        _ = radius_curvature(md, inc, azi, out = [np.zeros(3, dtype = np.int64)] * 3)
+
+def test_blocked_cumsum_is_accurate():
+    from ..workspace import blocked_cumsum
+    rng = np.random.default_rng(5)
+    steps = rng.uniform(0, 20, 10**5)
+    expected = np.cumsum(steps.astype(np.longdouble))
+
+    # odd lengths, shorter and longer than a block, and in-place
+    for n in [0, 1, 255, 256, 257, 70000, 10**5]:
+        np.testing.assert_allclose(blocked_cumsum(steps[:n]), expected[:n], rtol = 1e-14)
+    x = np.copy(steps)
+    assert blocked_cumsum(x, out = x) is x
+    np.testing.assert_allclose(x, expected, rtol = 1e-14)
+
+    error = lambda x: np.max(np.abs(x - expected))
+    assert error(blocked_cumsum(steps)) <= error(np.cumsum(steps))
+
+@pytest.mark.parametrize('engine, count', [
+    (minimum_curvature, 4),
+    (radius_curvature, 3),
+    (tan_method, 3),
+    (balanced_tan, 3),
+])
+def test_compensated(engine, count):
+    rng = np.random.default_rng(7)
+    n = 1000
+    md  = np.cumsum(rng.uniform(0.1, 2, n))
+    inc = np.clip(np.cumsum(rng.normal(0, 0.5, n)) + 45, 1, 120)
+    azi = np.mod(np.cumsum(rng.normal(0, 1, n)), 360)
+    expected = engine(md, inc, azi)
+
+    result = engine(md, inc, azi, compensated = True)
+    for x, y in zip(expected, result):
+        np.testing.assert_allclose(x, y, rtol = 1e-12, atol = 1e-9)
+
+    # float32 storage is rounded once, from the float64 result
+    out = tuple(np.empty(n, dtype = np.float32) for _ in range(count))
+    result = engine(md, inc, azi, out = out, compensated = True)
+    for x, y in zip(expected, result):
+        assert y.dtype == np.float32
+        np.testing.assert_array_equal(x.astype(np.float32), y)
+
+def test_chunked_compensated_tolerance():
+    from ..mincurve import minimum_curvature_chunked
+    rng = np.random.default_rng(4)
+    n = 10000
+    md  = np.cumsum(rng.uniform(0.1, 2, n))
+    inc = np.clip(np.cumsum(rng.normal(0, 0.5, n)) + 45, 0, 120)
+    azi = np.mod(np.cumsum(rng.normal(0, 1, n)), 360)
+    expected = minimum_curvature(md, inc, azi, compensated = True)
+    result = minimum_curvature_chunked(md, inc, azi, blocksize = 300, compensated = True)
+
+    eps = np.finfo(float).eps
+    for x, y in zip(expected[:3], result[:3]):
+        assert np.max(np.abs(x - y)) <= (n / 300) * eps * np.max(np.abs(x))
+    np.testing.assert_array_equal(expected[3], result[3])
+
+def test_chunked_compensated_float32():
+    from ..mincurve import minimum_curvature_chunked
+    rng = np.random.default_rng(3)
+    n = 1000
+    md  = np.cumsum(rng.uniform(0.1, 2, n))
+    inc = np.clip(np.cumsum(rng.normal(0, 0.5, n)) + 45, 0, 120)
+    azi = np.mod(np.cumsum(rng.normal(0, 1, n)), 360)
+    expected = minimum_curvature(md, inc, azi, compensated = True)
+
+    out = tuple(np.empty(n, dtype = np.float32) for _ in range(4))
+    result = minimum_curvature_chunked(md, inc, azi, blocksize = 300, out = out,
+                                       compensated = True)
+    for x, y in zip(expected, result):
+        np.testing.assert_allclose(x, y, rtol = 1e-6, atol = 1e-4)
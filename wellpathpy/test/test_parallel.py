@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..fleet import fleet
+from ..parallel import compute
+
+def make_fleet():
+    rng = np.random.default_rng(7)
+    devs = []
+    for n in [5, 12, 1, 30, 8, 2]:
+        md = np.cumsum(rng.uniform(10, 50, n))
+        inc = np.sort(rng.uniform(0, 90, n))
+        azi = rng.uniform(0, 360, n)
+        devs.append(deviation(md, inc, azi))
+    return fleet.from_deviations(devs, names = list('abcdef'))
+
+def test_matches_serial_computation():
+    f = make_fleet()
+    log = compute(f, workers = 1)
+    for i, dev in enumerate(f):
+        pos = dev.minimum_curvature()
+        md, depth, northing, easting, dls = log[i]
+        np.testing.assert_array_equal(dev.md, md)
+        np.testing.assert_array_equal(pos.depth, depth)
+        np.testing.assert_array_equal(pos.northing, northing)
+        np.testing.assert_array_equal(pos.easting, easting)
+        np.testing.assert_array_equal(pos.dls, dls)
+
+def test_deterministic_across_workers():
+    f = make_fleet()
+    one = compute(f, step = 3, workers = 1)
+    two = compute(f, step = 3, workers = 2, chunksize = 1)
+    np.testing.assert_array_equal(one.offsets, two.offsets)
+    np.testing.assert_array_equal(one.md, two.md)
+    np.testing.assert_array_equal(one.depth, two.depth)
+    np.testing.assert_array_equal(one.northing, two.northing)
+    np.testing.assert_array_equal(one.easting, two.easting)
+    assert one.errors == two.errors
+
+def test_failures_are_reported_per_well():
+    f = make_fleet()
+    log = compute(f, step = 3, workers = 2)
+    # a single station cannot be resampled
+    assert list(log.errors) == ['c']
+    assert np.isnan(log[2][1]).all()
+    assert not np.isnan(log[3][1]).any()
+
+    md, depth, _, _, _ = log[3]
+    pos = f[3].minimum_curvature().resample(depths = md)
+    np.testing.assert_allclose(pos.depth, depth)
+    np.testing.assert_allclose(pos.dls, log[3][4])
+    assert md[1] - md[0] == pytest.approx(3)
+
+script = """
+import multiprocessing
+import sys
+from wellpathpy.parallel import compute
+from wellpathpy.synthetic import field
+
+if __name__ == '__main__':
+    multiprocessing.set_start_method(sys.argv[1], force = True)
+    log = compute(field(8, seed = 1), workers = 2, chunksize = 2)
+    assert not log.errors
+"""
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_workers_leave_stderr_clean(tmpdir, method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip('{} is not available'.format(method))
+
+    # the resource tracker is a separate process, that reports to the
+    # stderr of the python process, so run a fresh interpreter
+    fname = str(tmpdir.join('run.py'))
+    with open(fname, 'w') as f:
+        f.write(script)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH = root)
+    proc = subprocess.run([sys.executable, fname, method], env = env,
+                          capture_output = True, text = True, timeout = 120)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stderr == ''
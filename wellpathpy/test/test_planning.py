@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+
+from ..planning import build_hold, build_hold_drop, horizontal, deviations
+
+def end_position(dev):
+    pos = dev.minimum_curvature()
+    return pos.northing[-1], pos.easting[-1], pos.depth[-1]
+
+def test_build_hold_hits_targets():
+    northing = np.array([0, 500, -800, 300])
+    easting  = np.array([0, 500, 200, -1500])
+    tvd = 2000
+
+    md, inc, azi = build_hold(300, 3, northing, easting, tvd)
+    assert md.shape == (4, 6)
+    for dev, n, e in zip(deviations(md, inc, azi), northing, easting):
+        np.testing.assert_allclose((n, e, tvd), end_position(dev), atol = 1e-6)
+
+def test_vertical_target_does_not_build():
+    md, inc, azi = build_hold(300, 3, 0, 0, 1000)
+    np.testing.assert_allclose(0, inc)
+    assert md[-1] == pytest.approx(1000)
+
+def test_build_hold_drop_hits_targets():
+    northing = np.array([400, 1000])
+    easting  = np.array([-300, 100])
+    tvd = np.array([2500, 3000])
+
+    md, inc, azi = build_hold_drop(200, 2.5, 2, northing, easting, tvd, final_inc = 10)
+    np.testing.assert_allclose(10, inc[:, -1])
+    for dev, n, e, z in zip(deviations(md, inc, azi), northing, easting, tvd):
+        np.testing.assert_allclose((n, e, z), end_position(dev), atol = 1e-6)
+
+def test_horizontal_lands_at_heel():
+    md, inc, azi = horizontal(1500, 4, 6, 600, 600, 2000, lateral_length = 1000)
+    dev, = deviations(md, inc, azi)
+    pos = dev.minimum_curvature()
+
+    heel = pos.resample(depths = [md[-2]])
+    np.testing.assert_allclose([600, 600, 2000], [heel.northing[0], heel.easting[0], heel.depth[0]], atol = 1e-6)
+    assert dev.inc[-1] == pytest.approx(90)
+    assert pos.depth[-1] == pytest.approx(2000)
+    assert dev.md[-1] - md[-2] == pytest.approx(1000)
+
+def test_unreachable_target_is_nan():
+    # the target is too close to the kickoff point to build towards
+    md, inc, azi = build_hold(1000, 1, [0, 2000], [0, 0], [1100, 1100])
+    assert np.isnan(md[1]).all()
+    assert not np.isnan(md[0]).any()
+    devs = deviations(md, inc, azi)
+    assert devs[1] is None
+
+def test_bad_rate_throws():
+    with pytest.raises(ValueError):
+        _ = build_hold(300, 0, 100, 100, 1000)
@@ -66,3 +66,145 @@ def test_straight_nonvertical_segment():
     delta_md = md[1:] - md[:-1]
     delta_vd = pos.depth[1:] - pos.depth[:-1]
     assert (delta_md > delta_vd).all()
+
+def test_resample_with_workers_is_identical():
+    md  = np.linspace(0, 3000, 101)
+    inc = np.linspace(0, 90, 101)
+    azi = np.linspace(10, 80, 101)
+    pos = deviation(md, inc, azi).minimum_curvature()
+
+    depths = np.arange(0, 3000, 0.5)
+    serial = pos.resample(depths = depths)
+    threaded = pos.resample(depths = depths, workers = 4)
+    np.testing.assert_array_equal(serial.depth, threaded.depth)
+    np.testing.assert_array_equal(serial.northing, threaded.northing)
+    np.testing.assert_array_equal(serial.easting, threaded.easting)
+
+def test_resample_interpolates_survey():
+    rng = np.random.default_rng(1)
+    md  = np.cumsum(rng.uniform(5, 30, 200)) - 5
+    inc = np.clip(np.cumsum(rng.normal(0, 2, 200)) + 30, 1, 120)
+    azi = np.mod(np.cumsum(rng.normal(0, 3, 200)), 360)
+    pos = deviation(md, inc, azi, units = 'ft').minimum_curvature()
+
+    # onto the survey stations, the survey and dls are reproduced
+    same = pos.resample(depths = md)
+    np.testing.assert_allclose(same.source.md, md)
+    np.testing.assert_allclose(same.source.inc, inc, atol = 1e-10)
+    np.testing.assert_allclose(same.source.azi, azi, atol = 1e-10)
+    np.testing.assert_allclose(same.dls, pos.dls, atol = 1e-10)
+    assert same.course_length == 100
+
+    # dense resampling stays on the arcs, so the dls over sub-intervals is
+    # that of the segment they are on
+    depths = np.linspace(md[0], md[-1], 5001)
+    dense = pos.resample(depths = depths)
+    assert len(dense.dls) == len(depths) == len(dense.source.inc)
+    # the intervals without a survey station in (depths[i - 1], depths[i]]
+    lower = np.searchsorted(md, depths, side = 'left')
+    inside = np.flatnonzero(lower[1:] == np.searchsorted(md, depths[:-1], side = 'right')) + 1
+    np.testing.assert_allclose(dense.dls[inside], pos.dls[lower[inside]])
+
+    # and the positions follow from the interpolated survey
+    again = dense.source.minimum_curvature()
+    np.testing.assert_allclose(again.depth, dense.depth, atol = 1e-2)
+
+def test_resample_straight_and_unordered():
+    md  = [0, 100, 200]
+    inc = [10, 10, 10]
+    azi = [45, 45, 45]
+    pos = deviation(md, inc, azi).minimum_curvature()
+    resampled = pos.resample(depths = [150, 50, -1, 50, 250])
+    np.testing.assert_array_equal([50, 150], resampled.source.md)
+    np.testing.assert_allclose([10, 10], resampled.source.inc)
+    np.testing.assert_allclose([45, 45], resampled.source.azi)
+    np.testing.assert_array_equal([0, 0], resampled.dls)
+
+def test_md_to_tvd():
+    md  = [0, 100, 200, 300]
+    inc = [0, 0, 30, 60]
+    azi = [0, 0, 45, 45]
+    pos = deviation(md, inc, azi).minimum_curvature()
+
+    queries = [300, 50, -1, 150, 100, 301]
+    tvd = pos.md_to_tvd(queries, workers = 2)
+    assert tvd[0] == pos.depth[-1]
+    assert tvd[1] == pytest.approx(50)
+    assert np.isnan(tvd[2]) and np.isnan(tvd[-1])
+    assert tvd[3] == pos.resample(depths = [150]).depth[0]
+    assert tvd[4] == pytest.approx(100)
+
+def test_arcs_follow_assigned_positions():
+    md  = np.linspace(0, 3000, 31)
+    inc = np.linspace(0, 90, 31)
+    azi = np.linspace(10, 80, 31)
+    pos = deviation(md, inc, azi).minimum_curvature()
+    depths = np.arange(0, 3000, 7.0)
+    before = pos.resample(depths = depths)
+
+    # assign shifted arrays directly, without calling invalidate
+    pos.northing = pos.northing + 1000
+    pos.easting = pos.easting - 500
+    after = pos.resample(depths = depths)
+    np.testing.assert_allclose(before.northing + 1000, after.northing)
+    np.testing.assert_allclose(before.easting - 500, after.easting)
+
+    # a stale cache is not moved along by a later translation
+    pos = deviation(md, inc, azi).minimum_curvature()
+    _ = pos.arcs()
+    pos.depth = pos.depth * 2
+    moved = pos.to_wellhead(surface_northing = 10, surface_easting = 20, inplace = True)
+    expected = deviation(md, inc, azi).minimum_curvature()
+    expected.depth = expected.depth * 2
+    expected = expected.to_wellhead(surface_northing = 10, surface_easting = 20)
+    np.testing.assert_allclose(
+        expected.resample(depths = depths).depth,
+        moved.resample(depths = depths).depth,
+    )
+
+def test_md_to_tvd_scalar():
+    md  = [0, 100, 200, 300]
+    inc = [0, 0, 30, 60]
+    azi = [0, 0, 45, 45]
+    pos = deviation(md, inc, azi).minimum_curvature()
+
+    tvd = pos.md_to_tvd(150.0)
+    assert np.ndim(tvd) == 0
+    assert tvd == pos.md_to_tvd([150.0])[0]
+    assert pos.md_to_tvd(300) == pos.depth[-1]
+    assert np.isnan(pos.md_to_tvd(-1))
+    assert pos.locate(300) == 2
+
+    grid = pos.md_to_tvd([[50, 150], [250, 400]])
+    assert grid.shape == (2, 2)
+    assert grid[1, 0] == pos.md_to_tvd(250) and np.isnan(grid[1, 1])
+
+def test_resample_single_station_throws():
+    pos = deviation([0], [0], [0]).minimum_curvature()
+    with pytest.raises(ValueError):
+        _ = pos.resample(depths = [0])
+
+def test_arcs_are_cached_and_follow_transforms():
+    md  = np.linspace(0, 3000, 31)
+    inc = np.linspace(0, 90, 31)
+    azi = np.linspace(10, 80, 31)
+    pos = deviation(md, inc, azi).minimum_curvature()
+    assert pos.arcs() is pos.arcs()
+
+    depths = np.arange(0, 3000, 7.0)
+    moved = pos.to_wellhead(surface_northing = 1000, surface_easting = 2000)
+    fresh = deviation(md, inc, azi).minimum_curvature().to_wellhead(
+        surface_northing = 1000,
+        surface_easting = 2000,
+    )
+    # compute the arcs before the move on one, and after the move on the other
+    fresh._arcs = None
+    a, b = moved.resample(depths = depths), fresh.resample(depths = depths)
+    np.testing.assert_allclose(a.northing, b.northing)
+    np.testing.assert_allclose(a.easting, b.easting)
+    np.testing.assert_allclose(a.depth, b.depth)
+
+    # to_tvdss is not a translation, and discards the arcs
+    tvdss = pos.to_tvdss(datum_elevation = 100)
+    assert tvdss._arcs is None
+    np.testing.assert_allclose(tvdss.md_to_tvd(md), tvdss.depth)
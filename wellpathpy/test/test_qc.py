@@ -0,0 +1,138 @@
+import io
+import shutil
+
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..fleet import fleet
+from ..tiein import tie_in
+from .. import qc
+
+projected = './wellpathpy/test/fixtures/Well_Surveys_Projected_to_TD.csv'
+
+def test_parse_column():
+    assert qc.parse_column('TVD[m]') == ('tvd', 'm')
+    assert qc.parse_column('Dogleg [deg/30m]') == ('dls', 'deg/30m')
+    assert qc.parse_column('Vertical Section[m]') == (None, 'm')
+    assert qc.parse_column('') == (None, None)
+    assert qc.parse_dls_unit('deg/100ft') == (100, 'ft')
+
+def test_read_report_skips_title_rows_and_extra_columns():
+    report = qc.read_report(projected)
+    assert report['units'] == 'm'
+    assert report['course_length'] == 30
+    assert len(report['md']) == 80
+    assert report['md'][0] == 0 and report['md'][-1] == 2267
+    assert np.isnan(report['dls'][0])
+    assert report['dls'][1] == 0.35
+    assert 'vertical section' not in report
+
+def test_read_report_without_header_throws(tmpdir):
+    fname = str(tmpdir.join('bad.csv'))
+    with open(fname, 'w') as f:
+        f.write('a,b,c\n1,2,3\n')
+    with pytest.raises(ValueError):
+        _ = qc.read_report(fname)
+
+def test_matches_engine():
+    report = qc.read_report(projected)
+    md, inc, azi = report['md'][1:], report['inc'][1:], report['azi'][1:]
+    reference = {
+        'tvd': report['tvd'][1:],
+        'northing': report['northing'][1:],
+        'easting': report['easting'][1:],
+        'dls': report['dls'][1:],
+        'course_length': np.array([30.0]),
+    }
+    fl = fleet(md, inc, azi, [0, len(md)])
+    rep = qc.compare(fl, reference)
+
+    start = tie_in(md[0], inc[0], azi[0], reference['tvd'][0],
+                   reference['northing'][0], reference['easting'][0])
+    pos = deviation(md[1:], inc[1:], azi[1:]).minimum_curvature(tie_in = start)
+    for quantity, computed in [('tvd', pos.depth), ('northing', pos.northing),
+                               ('easting', pos.easting), ('dls', pos.dls)]:
+        diff = np.abs(computed - reference[quantity][1:])
+        assert rep[quantity]['max'][0] == pytest.approx(diff.max())
+        assert rep[quantity]['rms'][0] == pytest.approx(np.sqrt(np.mean(diff**2)))
+
+def test_archive_reports_per_well(tmpdir):
+    for name in ['a', 'b', 'c']:
+        shutil.copy(projected, str(tmpdir.join(name + '.csv')))
+
+    # move b off the vendor trajectory from md 1000 on
+    with open(projected) as f:
+        lines = f.read().splitlines()
+    out = []
+    for line in lines:
+        cells = line.split(',')
+        try:
+            if float(cells[1]) >= 1000:
+                cells[4] = str(float(cells[4]) + 1)
+        except (IndexError, ValueError):
+            pass
+        out.append(','.join(cells))
+    with open(str(tmpdir.join('b.csv')), 'w') as f:
+        f.write('\n'.join(out) + '\n')
+
+    fl, reference = qc.read_archive([str(tmpdir)])
+    assert fl.names == ['a', 'b', 'c']
+    assert fl.units == 'm'
+
+    rep = qc.compare(fl, reference)
+    first = np.min(fl[1].md[fl[1].md >= 1000])
+    assert rep['tvd']['first'][1] == first
+    assert rep['tvd']['max'][1] == pytest.approx(1, abs = 0.05)
+    np.testing.assert_allclose(rep['tvd']['max'][[0, 2]], rep['tvd']['max'][[2, 0]])
+    assert np.isnan(rep['tvd']['first'][0])
+    assert qc.failed(rep) == ['a', 'b', 'c']
+    assert qc.failed(qc.compare(fl, reference, tolerance = {
+        'tvd': 0.1, 'northing': 0.1, 'easting': 0.1, 'dls': 1,
+    })) == ['b']
+
+    # chunking does not change the results
+    chunked = qc.compare(fl, reference, chunksize = 50)
+    for quantity in qc.quantities:
+        for key in ('max', 'rms', 'first'):
+            np.testing.assert_allclose(rep[quantity][key], chunked[quantity][key])
+
+    buf = io.StringIO()
+    qc.write_report(buf, rep)
+    lines = buf.getvalue().splitlines()
+    assert lines[0].startswith('well,tvd_max,tvd_rms,tvd_first')
+    assert len(lines) == 4
+
+def test_chunks():
+    offsets = np.array([0, 10, 10, 30, 35, 100])
+    assert list(qc.chunks(offsets, 30)) == [(0, 3), (3, 4), (4, 5)]
+    assert list(qc.chunks(offsets, 1000)) == [(0, 5)]
+
+def test_archive_skips_bad_reports(tmpdir, capsys):
+    shutil.copy(projected, str(tmpdir.join('a.csv')))
+    with open(str(tmpdir.join('b.csv')), 'w') as f:
+        f.write('a,b,c\n1,2,3\n')
+    with open(str(tmpdir.join('c.csv')), 'w') as f:
+        f.write('MD[m],Inc[deg],Azi[deg]\n0,0,0\n100,5,360\n')
+    with open(str(tmpdir.join('d.csv')), 'w') as f:
+        f.write('MD[m],Inc[deg],Azi[deg]\n0,0,0\n0,5,10\n')
+
+    fl, reference = qc.read_archive([str(tmpdir)])
+    assert fl.names == ['a']
+    assert sorted(reference['errors']) == ['b', 'c', 'd']
+    assert 'azi' in reference['errors']['c']
+
+    rep = qc.compare(fl, reference, tolerance = 1)
+    assert rep['errors'] == reference['errors']
+    assert qc.failed(rep) == []
+
+    # the good reports are still checked, but the run fails
+    assert qc.main([str(tmpdir), '--tolerance', '1']) == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[1].startswith('a,')
+    assert 'b: ValueError' in captured.err
+
+def test_main_exit_status(capsys):
+    assert qc.main([projected, '--tolerance', '1']) == 0
+    assert qc.main([projected]) == 1
+    assert 'exceed' in capsys.readouterr().err
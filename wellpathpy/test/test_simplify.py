@@ -0,0 +1,116 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..position_log import position_log
+from ..simplify import adaptive_depths, douglas_peucker, pieces, segment_distance
+from ..synthetic import field
+
+def test_straight_segments_are_not_split():
+    depths = adaptive_depths([0, 500, 1000], [30, 30, 30], [45, 45, 45], 0.01)
+    np.testing.assert_array_equal([0, 500, 1000], depths)
+
+def test_pieces_bound_the_sagitta():
+    length = np.array([100.0, 100, 100])
+    angle = np.deg2rad([1, 10, 90])
+    n = pieces(length, angle, 0.05)
+    radius = length / angle
+    sagitta = radius * (1 - np.cos(angle / n / 2))
+    assert (sagitta <= 0.05).all()
+    # one piece less would be over the tolerance
+    fewer = np.maximum(n - 1, 1)
+    over = radius * (1 - np.cos(angle / fewer / 2))
+    assert (over[n > 1] > 0.05).all()
+
+def test_nonpositive_tolerance_throws():
+    with pytest.raises(ValueError):
+        _ = adaptive_depths([0, 100], [0, 10], [0, 0], 0)
+    with pytest.raises(ValueError):
+        _ = douglas_peucker([0, 1], [0, 1], [0, 1], -1)
+
+def test_resample_adaptive_bounds_chord_error():
+    dev = deviation(
+        md = [0, 500, 800, 1100, 2000],
+        inc = [0, 0, 45, 90, 90],
+        azi = [0, 0, 120, 135, 135],
+    )
+    pos = dev.minimum_curvature()
+    tolerance = 0.1
+    adaptive = pos.resample_adaptive(tolerance)
+    assert adaptive.units == pos.units
+    assert np.isin(dev.md, adaptive.source.md).all()
+    # no points on the straight sections
+    assert ((adaptive.source.md > 0) & (adaptive.source.md < 500)).sum() == 0
+
+    md = np.linspace(0, 2000, 20001)
+    dense = pos.resample(depths = md)
+    knots = adaptive.source.md
+    segment = np.clip(np.searchsorted(knots, md, side = 'right') - 1, 0, len(knots) - 2)
+    chords = np.stack([adaptive.northing, adaptive.easting, adaptive.depth])
+    distance = segment_distance(
+        np.stack([dense.northing, dense.easting, dense.depth]),
+        chords[:, segment],
+        chords[:, segment + 1],
+    )
+    assert distance.max() <= tolerance * (1 + 1e-6)
+
+def test_douglas_peucker_straight_line():
+    t = np.linspace(0, 1, 100)
+    keep = douglas_peucker(3 * t, 2 * t, 10 * t, 1e-9)
+    np.testing.assert_array_equal(np.flatnonzero(keep), [0, 99])
+
+def test_douglas_peucker_bounds_error():
+    rng = np.random.default_rng(0)
+    points = np.cumsum(rng.normal(size = (3, 500)), axis = 1)
+    tolerance = 2.0
+    keep = douglas_peucker(*points, tolerance)
+    assert keep[0] and keep[-1]
+
+    kept = np.flatnonzero(keep)
+    segment = np.searchsorted(kept, np.arange(500), side = 'right') - 1
+    segment = np.clip(segment, 0, len(kept) - 2)
+    distance = segment_distance(
+        points,
+        points[:, kept[segment]],
+        points[:, kept[segment + 1]],
+    )
+    assert distance.max() <= tolerance
+    # and a smaller tolerance keeps more
+    assert douglas_peucker(*points, 0.5).sum() > keep.sum()
+
+def test_douglas_peucker_matches_recursive():
+    rng = np.random.default_rng(1)
+    points = np.cumsum(rng.normal(size = (3, 200)), axis = 1)
+
+    def recursive(first, last, keep):
+        if last - first < 2:
+            return
+        index = np.arange(first + 1, last)
+        distance = segment_distance(
+            points[:, index],
+            points[:, [first]].repeat(len(index), axis = 1),
+            points[:, [last]].repeat(len(index), axis = 1),
+        )
+        i = np.argmax(distance)
+        if distance[i] > 1.5:
+            keep[index[i]] = True
+            recursive(first, index[i], keep)
+            recursive(index[i], last, keep)
+
+    expected = np.zeros(200, dtype = bool)
+    expected[[0, -1]] = True
+    recursive(0, 199, expected)
+    np.testing.assert_array_equal(expected, douglas_peucker(*points, 1.5))
+
+def test_simplify_long_horizontal():
+    dev = field(1, weights = [0, 0, 0, 1], spacing = 1, seed = 3,
+                lateral_length = (3000, 3000))[0]
+    pos = dev.minimum_curvature()
+    simple = pos.simplify(0.5)
+    assert isinstance(simple, position_log)
+    assert simple.units == pos.units
+    assert len(simple.depth) * 100 < len(pos.depth)
+    np.testing.assert_array_equal(
+        simple.source.md[[0, -1]],
+        dev.md[[0, -1]],
+    )
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..spatial import spatial_index
+
+def vertical(md, northing = 0, easting = 0):
+    pos = deviation(md = md, inc = np.zeros(len(md)), azi = np.zeros(len(md))).minimum_curvature()
+    return pos.to_wellhead(northing, easting)
+
+@pytest.fixture
+def index():
+    logs = {
+        'a': vertical([0, 100, 200, 300]),
+        'b': vertical([0, 150, 300], northing = 500),
+        'c': vertical([0, 100, 200], easting = 40),
+    }
+    return spatial_index.from_logs(logs, bucket_size = 50)
+
+def test_bad_bucket_size_throws():
+    with pytest.raises(ValueError):
+        _ = spatial_index(bucket_size = 0)
+
+def test_radius(index):
+    wells, md_from, md_to = index.radius((0, 0, 150), 50)
+    assert wells == ['a', 'c']
+    np.testing.assert_allclose([100, 120], md_from)
+    np.testing.assert_allclose([200, 180], md_to)
+
+def test_radius_miss(index):
+    wells, md_from, md_to = index.radius((250, 250, 150), 10)
+    assert wells == []
+    assert len(md_from) == len(md_to) == 0
+
+def test_box(index):
+    wells, md_from, md_to = index.box((-10, -10, 50), (600, 10, 250))
+    assert wells == ['a', 'b']
+    np.testing.assert_allclose([50, 50], md_from)
+    np.testing.assert_allclose([250, 250], md_to)
+
+def test_huge_box_finds_everything(index):
+    wells, _, _ = index.box((-1e6, -1e6, -1e6), (1e6, 1e6, 1e6))
+    assert wells == ['a', 'b', 'c']
+
+def test_incremental_insert(index):
+    wells, _, _ = index.radius((300, 0, 100), 10)
+    assert wells == []
+
+    index.insert('d', vertical([0, 200], northing = 300))
+    wells, md_from, md_to = index.radius((300, 0, 100), 10)
+    assert wells == ['d']
+    np.testing.assert_allclose([90], md_from)
+    np.testing.assert_allclose([110], md_to)
+    assert len(index) == 4
+
+def test_queued_and_queried_inserts_agree():
+    logs = [
+        (i, vertical([0, 100, 200, 300], northing = 30 * i, easting = -20 * i))
+        for i in range(20)
+    ]
+    batch = spatial_index.from_logs(logs, bucket_size = 50)
+    incremental = spatial_index(bucket_size = 50)
+    for well, pos in logs:
+        incremental.insert(well, pos)
+        _ = incremental.radius((0, 0, 0), 1)
+
+    batch.flush()
+    np.testing.assert_array_equal(batch.A, incremental.A)
+    np.testing.assert_array_equal(batch.owner, incremental.owner)
+    for query in [((0, 0, 150), 70), ((300, -200, 250), 40)]:
+        expected = batch.radius(*query)
+        result = incremental.radius(*query)
+        assert expected[0] == result[0]
+        np.testing.assert_allclose(expected[1], result[1])
+        np.testing.assert_allclose(expected[2], result[2])
+
+def test_densified_arc_is_indexed():
+    md  = [0, 500, 1000]
+    inc = [0, 60, 90]
+    azi = [0, 0, 0]
+    pos = deviation(md, inc, azi).minimum_curvature()
+    index = spatial_index(bucket_size = 25)
+    index.insert('w', pos, step = 5)
+
+    dense = pos.resample(depths = [750])
+    point = (dense.northing[0], dense.easting[0], dense.depth[0])
+    wells, md_from, md_to = index.radius(point, 1)
+    assert wells == ['w']
+    assert md_from[0] == pytest.approx(749, abs = 0.1)
+    assert md_to[0] == pytest.approx(751, abs = 0.1)
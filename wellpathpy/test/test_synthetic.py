@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+
+from .. import planning
+from .. import synthetic
+
+def test_field_is_reproducible():
+    a = synthetic.field(50, seed = 3)
+    b = synthetic.field(50, seed = 3)
+    assert len(a) == 50
+    np.testing.assert_array_equal(a.md, b.md)
+    np.testing.assert_array_equal(a.azi, b.azi)
+
+def test_station_spacing():
+    f = synthetic.field(20, spacing = 10, seed = 0)
+    for dev in f:
+        steps = np.diff(dev.md)
+        np.testing.assert_allclose(steps[:-1], 10)
+        assert 0 < steps[-1] <= 10
+
+@pytest.mark.parametrize('profile, final_inc', [
+    ('vertical', 0),
+    ('s', 0),
+    ('horizontal', 90),
+])
+def test_profiles_without_noise(profile, final_inc):
+    weights = [p == profile for p in synthetic.profiles]
+    f = synthetic.field(20, weights = weights, inc_noise = 0, azi_noise = 0, seed = 1)
+    last = f.offsets[1:] - 1
+    np.testing.assert_allclose(f.inc[last], final_inc, atol = 1e-9)
+    np.testing.assert_array_equal(f.inc[f.offsets[:-1]], 0)
+
+def test_densified_wells_follow_plan():
+    rng = np.random.default_rng(0)
+    kinds = np.array([1, 2, 3] * 5)
+    md, inc, azi = synthetic.key_stations(kinds, rng)
+    dense = synthetic.densify(md, inc, azi, spacing = 5)
+    fine = synthetic.fleet(*dense)
+
+    # the stations do not include the kickoff and end of build, so the
+    # minimum curvature arcs cut those corners slightly
+    for dev, planned in zip(fine, planning.deviations(md, inc, azi)):
+        a = dev.minimum_curvature()
+        b = planned.minimum_curvature()
+        np.testing.assert_allclose(a.depth[-1], b.depth[-1], atol = 0.05)
+        np.testing.assert_allclose(a.northing[-1], b.northing[-1], atol = 0.05)
+        np.testing.assert_allclose(a.easting[-1], b.easting[-1], atol = 0.05)
+
+def test_bad_parameters_throw():
+    with pytest.raises(ValueError):
+        _ = synthetic.field(10, spacing = 0)
+    with pytest.raises(ValueError):
+        _ = synthetic.field(10, weights = [1, 1])
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..tiein import tie_in, branch
+from ..mincurve import minimum_curvature
+from ..tan import tan_method
+from ..rad_curv import radius_curvature
+
+md  = np.array([0, 300, 600, 900, 1200, 1500])
+inc = np.array([0, 10, 35, 60, 85, 90])
+azi = np.array([0, 20, 40, 45, 50, 50])
+
+def test_bad_tie_in_throws():
+    with pytest.raises(ValueError):
+        _ = tie_in(100, 180, 0)
+    with pytest.raises(ValueError):
+        _ = minimum_curvature(md, inc, azi, tie_in = (400, 0, 0, 0, 0, 0))
+
+def test_default_tie_in_is_zero():
+    expected = minimum_curvature(md, inc, azi)
+    result = minimum_curvature(md, inc, azi, tie_in = (0, 0, 0, 0, 0, 0))
+    for x, y in zip(expected, result):
+        np.testing.assert_array_equal(x, y)
+
+@pytest.mark.parametrize('engine', [
+    minimum_curvature,
+    radius_curvature,
+    lambda md, inc, azi, tie_in = None: tan_method(md, inc, azi, 'avg', tie_in = tie_in),
+    lambda md, inc, azi, tie_in = None: tan_method(md, inc, azi, 'bal', tie_in = tie_in),
+])
+def test_tie_in_at_station_continues_parent(engine):
+    full = engine(md, inc, azi)
+    k = 2
+    tvd, n, e = full[0][k], full[1][k], full[2][k]
+    tie = tie_in(md[k], inc[k], azi[k], tvd, n, e)
+
+    # with and without the tie-in station in the survey
+    below = engine(md[k + 1:], inc[k + 1:], azi[k + 1:], tie_in = tie)
+    for x, y in zip(full, below):
+        np.testing.assert_allclose(x[k + 1:], y)
+
+    # the dogleg into the first station is unknown when it is the tie-in
+    below = engine(md[k:], inc[k:], azi[k:], tie_in = tie)
+    for x, y in zip(full[:3], below[:3]):
+        np.testing.assert_allclose(x[k:], y)
+
+def test_tie_in_from_log_mid_arc():
+    # a lateral that follows the mother bore from the middle of an arc ends up
+    # in exactly the same place
+    pos = deviation(md, inc, azi).minimum_curvature()
+    tie = tie_in.from_log(pos, 750)
+    tvd, n, e, _ = minimum_curvature(md[3:], inc[3:], azi[3:], tie_in = tie)
+    np.testing.assert_allclose(pos.depth[3:], tvd)
+    np.testing.assert_allclose(pos.northing[3:], n)
+    np.testing.assert_allclose(pos.easting[3:], e)
+    assert 35 < tie.inc < 60
+    assert 40 < tie.azi < 45
+
+def test_tie_in_from_log_outside_throws():
+    pos = deviation(md, inc, azi).minimum_curvature()
+    with pytest.raises(ValueError):
+        _ = tie_in.from_log(pos, 2000)
+
+def test_branch_tree():
+    root = branch(deviation(md, inc, azi))
+    lateral = root.lateral(deviation([800, 1100], [70, 80], [90, 120]), kickoff = 750)
+    sidetrack = lateral.lateral(deviation([1000, 1200], [80, 90], [130, 140]), kickoff = 950)
+
+    assert [b for b in root.walk()] == [root, lateral, sidetrack]
+    # the lateral only computed its own stations
+    assert len(lateral.log.depth) == 2
+
+    m, tvd, n, e = sidetrack.path()
+    np.testing.assert_array_equal([0, 300, 600, 750, 800, 950, 1000, 1200], m)
+    np.testing.assert_array_equal(root.log.depth[:3], tvd[:3])
+    assert tvd[3] == lateral.tie_in.tvd
+    np.testing.assert_array_equal(sidetrack.log.easting, e[-2:])
+
+    m, _, _, _ = root.path()
+    np.testing.assert_array_equal(md, m)
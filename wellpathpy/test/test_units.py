@@ -0,0 +1,127 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..units import convert, course_length, factor, normalize
+from ..fleet import fleet
+from ..location import transform
+from .. import parallel
+
+def test_normalize_aliases():
+    assert normalize('Feet') == 'ft'
+    assert normalize(' metres ') == 'm'
+    assert normalize('US survey foot') == 'usft'
+
+def test_unknown_unit_throws():
+    with pytest.raises(ValueError):
+        _ = normalize('furlong')
+
+def test_factor():
+    assert factor('ft') == 0.3048
+    assert factor('m', 'ft') == pytest.approx(1 / 0.3048)
+    assert factor('ft', 'ft') == 1
+
+def test_course_length_follows_units():
+    assert course_length(None) == 30
+    assert course_length('m') == 30
+    assert course_length('feet') == 100
+
+def test_convert_per_well():
+    values = np.array([100.0, 200, 10, 20, 30, 1000])
+    offsets = [0, 2, 5, 6]
+    out = convert(values, ['ft', 'm', 'ft'], offsets = offsets)
+    expected = values * np.repeat([0.3048, 1, 0.3048], [2, 3, 1])
+    np.testing.assert_array_equal(expected, out)
+
+def test_convert_per_well_without_offsets_throws():
+    with pytest.raises(ValueError):
+        _ = convert([1, 2], ['ft', 'm'])
+
+def test_deviation_to_units():
+    dev = deviation([0, 100, 200], [0, 10, 20], [0, 45, 90], units = 'feet')
+    assert dev.units == 'ft'
+    assert dev.copy().units == 'ft'
+
+    metric = dev.to_units()
+    assert metric.units == 'm'
+    np.testing.assert_allclose([0, 30.48, 60.96], metric.md)
+    np.testing.assert_array_equal(dev.inc, metric.inc)
+
+def test_unknown_deviation_units_throws():
+    dev = deviation([0, 100], [0, 10], [0, 45])
+    with pytest.raises(ValueError):
+        _ = dev.to_units('ft')
+
+def test_course_length_default_follows_units():
+    md, inc, azi = [0, 100, 200], [0, 10, 20], [0, 45, 90]
+    ft = deviation(md, inc, azi, units = 'ft').minimum_curvature()
+    explicit = deviation(md, inc, azi).minimum_curvature(course_length = 100)
+    np.testing.assert_array_equal(explicit.dls, ft.dls)
+    assert ft.units == 'ft'
+
+def test_position_log_carries_units():
+    dev = deviation([0, 100, 200], [0, 10, 20], [0, 45, 90], units = 'm')
+    pos = dev.minimum_curvature()
+    assert pos.units == 'm'
+    assert pos.to_wellhead(10, 20).units == 'm'
+    assert pos.resample(depths = [50, 150]).units == 'm'
+
+def test_transform_from_header_converts():
+    header = {
+        'elevation': 100,
+        'elevation_units': 'ft',
+        'surface_northing': 1000,
+        'surface_easting': 2000,
+        'surface_coordinates_units': 'm',
+    }
+    t = transform.from_header(header, units = 'm')
+    tvd, northing, easting = t([0.0, 10], [0.0, 1], [0.0, 2])
+    np.testing.assert_allclose([30.48, 20.48], tvd)
+    np.testing.assert_allclose([1000, 1001], northing)
+    np.testing.assert_allclose([2000, 2002], easting)
+
+    # without units the header is taken as is
+    tvd, _, _ = transform.from_header(header)([0.0], [0.0], [0.0])
+    np.testing.assert_allclose([100], tvd)
+
+def test_to_header_uses_log_units():
+    header = {
+        'elevation': 10,
+        'elevation_units': 'm',
+        'surface_northing': 0,
+        'surface_easting': 0,
+        'surface_coordinates_units': 'm',
+    }
+    dev = deviation([0, 100], [0, 0], [0, 0], units = 'ft')
+    pos = dev.minimum_curvature().to_header(header)
+    np.testing.assert_allclose([10 / 0.3048, 10 / 0.3048 - 100], pos.depth)
+
+def test_fleet_to_units():
+    devs = [
+        deviation([0, 100, 200], [0, 10, 20], [0, 45, 90], units = 'ft'),
+        deviation([0, 30], [0, 5], [0, 10], units = 'm'),
+    ]
+    f = fleet.from_deviations(devs)
+    assert f.units == ['ft', 'm']
+    assert f[0].units == 'ft'
+
+    metric = f.to_units()
+    assert metric.units == 'm'
+    np.testing.assert_allclose(devs[0].to_units().md, metric[0].md)
+    np.testing.assert_array_equal(devs[1].md, metric[1].md)
+
+def test_fleet_units_must_match_wells():
+    with pytest.raises(ValueError):
+        _ = fleet([0, 1], [0, 0], [0, 0], [0, 2], units = ['m', 'ft'])
+
+def test_mixed_fleet_compute_throws():
+    devs = [
+        deviation([0, 100], [0, 10], [0, 45], units = 'ft'),
+        deviation([0, 30], [0, 5], [0, 10], units = 'm'),
+    ]
+    f = fleet.from_deviations(devs)
+    with pytest.raises(ValueError):
+        _ = parallel.compute(f, workers = 1)
+
+    log = parallel.compute(f.to_units(), workers = 1)
+    assert not log.errors
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+
+from .. import deviation
+from ..voxel import grid, traverse, traverse_many, ragged_arange
+
+def test_ragged_arange():
+    np.testing.assert_array_equal([0, 1, 0, 1, 2], ragged_arange([2, 0, 3]))
+
+def test_bad_grid_throws():
+    with pytest.raises(ValueError):
+        _ = grid(origin = (0, 0), spacing = (1, 1, 1), shape = (1, 1, 1))
+    with pytest.raises(ValueError):
+        _ = grid(origin = (0, 0, 0), spacing = (1, 0, 1), shape = (1, 1, 1))
+
+def test_vertical_well():
+    dev = deviation(md = [0, 100], inc = [0, 0], azi = [0, 0])
+    pos = dev.minimum_curvature()
+    g = grid(origin = (-5, -5, 0), spacing = (10, 10, 30), shape = (1, 1, 10))
+
+    cell, md_in, md_out = traverse(pos, g)
+    np.testing.assert_array_equal([0, 1, 2, 3], cell)
+    np.testing.assert_allclose([0, 30, 60, 90], md_in)
+    np.testing.assert_allclose([30, 60, 90, 100], md_out)
+
+def test_well_outside_grid():
+    dev = deviation(md = [0, 100], inc = [0, 0], azi = [0, 0])
+    pos = dev.minimum_curvature()
+    g = grid(origin = (100, 100, 0), spacing = (10, 10, 10), shape = (5, 5, 5))
+
+    cell, md_in, md_out = traverse(pos, g)
+    assert len(cell) == len(md_in) == len(md_out) == 0
+
+def test_horizontal_well_rotated_grid():
+    # a horizontal well going east at depth 5, and a grid rotated 90 degrees,
+    # so that j runs west and i north
+    dev = deviation(md = [0, 5, 25], inc = [0, 0, 0], azi = [0, 0, 0])
+    pos = dev.minimum_curvature()
+    pos.northing = np.array([0.0, 0.0, 0.0])
+    pos.easting  = np.array([0.0, 0.0, 20.0])
+    pos.depth    = np.array([5.0, 5.0, 5.0])
+
+    g = grid(origin = (30, -5, 0), spacing = (10, 10, 10), shape = (1, 3, 1), rotation = 90)
+    cell, md_in, md_out = traverse(pos, g)
+    np.testing.assert_array_equal([2, 1], cell)
+    np.testing.assert_allclose([5, 15], md_in)
+    np.testing.assert_allclose([15, 25], md_out)
+
+def test_pieces_are_contiguous_and_inside_survey():
+    md  = [0, 300, 600, 900, 1200]
+    inc = [0, 20, 45, 70, 89]
+    azi = [0, 30, 45, 60, 90]
+    pos = deviation(md, inc, azi).minimum_curvature()
+    g = grid(origin = (-1000, -1000, 0), spacing = (25, 25, 10), shape = (80, 80, 200))
+
+    cell, md_in, md_out = traverse(pos, g, step = 5)
+    assert (md_out > md_in).all()
+    np.testing.assert_allclose(md_in[1:], md_out[:-1])
+    assert md_in[0] == 0
+    assert md_out[-1] == pytest.approx(1200)
+    # consecutive cells are neighbours
+    ijk = np.column_stack(np.unravel_index(cell, g.shape))
+    assert (np.abs(np.diff(ijk, axis = 0)).sum(axis = 1) >= 1).all()
+
+def test_traverse_many():
+    a = deviation(md = [0, 100], inc = [0, 0], azi = [0, 0]).minimum_curvature()
+    b = deviation(md = [0, 50], inc = [0, 0], azi = [0, 0]).minimum_curvature()
+    g = grid(origin = (-5, -5, 0), spacing = (10, 10, 30), shape = (1, 1, 10))
+
+    well, cell, md_in, md_out = traverse_many([a, b], g)
+    np.testing.assert_array_equal([0, 0, 0, 0, 1, 1], well)
+    np.testing.assert_array_equal([0, 1, 2, 3, 0, 1], cell)
+    np.testing.assert_allclose([30, 60, 90, 100, 30, 50], md_out)
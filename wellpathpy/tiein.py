@@ -0,0 +1,235 @@
+import numpy as np
+
+from . import geometry
+
+class tie_in:
+    """Tie-in state
+
+    The tie-in is the state of the well bore at the point a survey starts
+    from, e.g. the kickoff point of a sidetrack or lateral. The engines start
+    at an implicit tie-in of (0, 0, 0) at the first survey station unless
+    another tie-in is given.
+
+    Parameters
+    ----------
+    md : float
+        measured depth
+    inc : float
+        inclination in degrees
+    azi : float
+        azimuth in degrees
+    tvd : float
+    northing : float
+    easting : float
+
+    See also
+    --------
+    tie_in.from_log
+    """
+    def __init__(self, md, inc, azi, tvd = 0, northing = 0, easting = 0):
+        self.md = float(md)
+        self.inc = float(inc)
+        self.azi = float(azi)
+        self.tvd = float(tvd)
+        self.northing = float(northing)
+        self.easting = float(easting)
+
+        if not 0 <= self.inc < 180:
+            raise ValueError('tie-in inc must be in range 0 <= inc < 180')
+        if not 0 <= self.azi < 360:
+            raise ValueError('tie-in azi must be in range 0 <= azi < 360')
+
+    def __repr__(self):
+        return 'tie_in(md = {}, inc = {}, azi = {}, tvd = {}, northing = {}, easting = {})'.format(
+            self.md, self.inc, self.azi, self.tvd, self.northing, self.easting
+        )
+
+    @classmethod
+    def from_log(cls, pos, md):
+        """Tie-in at measured depth md of an already computed position log
+
+        For minimum curvature logs the position and direction are interpolated
+        along the arc, for other logs linearly between the survey stations.
+
+        Parameters
+        ----------
+        pos : position_log
+        md : float
+
+        Returns
+        -------
+        tie : tie_in
+        """
+        mds = pos.source.md
+        if not mds[0] <= md <= mds[-1]:
+            msg = 'md {} outside the measured range [{}, {}] of the log'
+            raise ValueError(msg.format(md, mds[0], mds[-1]))
+
+        i = min(np.searchsorted(mds, md, side = 'right') - 1, len(mds) - 2)
+        t = (md - mds[i]) / (mds[i + 1] - mds[i])
+        Ts = np.column_stack(geometry.direction_vector(
+            pos.source.inc[i:i + 2],
+            pos.source.azi[i:i + 2],
+        ))
+
+        if hasattr(pos, 'dls'):
+            p = pos.resample(depths = [md])
+            tvd, n, e = p.depth[0], p.northing[0], p.easting[0]
+            T = geometry.slerp(Ts[0], Ts[1], t)
+        else:
+            tvd = pos.depth[i] + t * (pos.depth[i + 1] - pos.depth[i])
+            n = pos.northing[i] + t * (pos.northing[i + 1] - pos.northing[i])
+            e = pos.easting[i] + t * (pos.easting[i + 1] - pos.easting[i])
+            T = geometry.normalize(Ts[0] + t * (Ts[1] - Ts[0]))
+
+        inc, azi = geometry.spherical(*T)
+        return cls(md, inc, azi, tvd, n, e)
+
+def tie(md, inc, azi, start):
+    """Start a survey from a tie-in
+
+    Prepend the tie-in station to the survey, so that the engines compute the
+    segment from the tie-in to the first survey station. If the survey
+    already starts at the tie-in measured depth, the survey's own inc and azi
+    are used for the first station.
+
+    Parameters
+    ----------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+        survey, as returned by checkarrays
+    start : tie_in or tuple or None
+        the tie-in, or a tuple (md, inc, azi, tvd, northing, easting)
+
+    Returns
+    -------
+    md : array_like of float
+    inc : array_like of float
+    azi : array_like of float
+    origin : tuple of float
+        (tvd, northing, easting) to add to the computed positions
+    skip : int
+        number of leading stations to drop from the computed positions
+    """
+    if start is None:
+        return md, inc, azi, (0, 0, 0), 0
+
+    if not isinstance(start, tie_in):
+        start = tie_in(*start)
+
+    origin = (start.tvd, start.northing, start.easting)
+    if len(md) == 0 or md[0] < start.md:
+        raise ValueError('md must start at or below the tie-in md')
+
+    if md[0] == start.md:
+        return md, inc, azi, origin, 0
+
+    md  = np.insert(md,  0, start.md)
+    inc = np.insert(inc, 0, start.inc)
+    azi = np.insert(azi, 0, start.azi)
+    return md, inc, azi, origin, 1
+
+class branch:
+    """A well bore in a multi-lateral well
+
+    A multi-lateral well is a tree of branches. The root is the mother bore,
+    and every other branch is tied in to its parent at the kickoff point. A
+    branch only computes its unique footage, the stations below the kickoff
+    point, and shares the computed arrays of its ancestors.
+
+    Parameters
+    ----------
+    dev : deviation
+        the survey of this branch only
+    parent : branch, optional
+    kickoff : float, optional
+        measured depth in the parent where this branch kicks off
+    course_length : float
+        see mincurve.minimum_curvature
+
+    Examples
+    --------
+    A mother bore with two laterals:
+
+    >>> root = branch(deviation(md, inc, azi))
+    >>> lat1 = root.lateral(deviation(md1, inc1, azi1), kickoff = 1500)
+    >>> lat2 = root.lateral(deviation(md2, inc2, azi2), kickoff = 1800)
+    >>> md, tvd, northing, easting = lat2.path()
+    """
+    def __init__(self, dev, parent = None, kickoff = None, course_length = 30):
+        self.parent = parent
+        self.children = []
+        self.course_length = course_length
+
+        if parent is None:
+            self.tie_in = None
+        else:
+            self.tie_in = tie_in.from_log(parent.log, kickoff)
+
+        self.log = dev.minimum_curvature(
+            course_length = course_length,
+            tie_in = self.tie_in,
+        )
+
+    def __repr__(self):
+        return 'branch(tie_in = {}, children = {})'.format(self.tie_in, len(self.children))
+
+    def lateral(self, dev, kickoff):
+        """Add a lateral or sidetrack to this branch
+
+        Parameters
+        ----------
+        dev : deviation
+            survey of the lateral, starting at or below kickoff
+        kickoff : float
+            measured depth in this branch where the lateral kicks off
+
+        Returns
+        -------
+        lateral : branch
+        """
+        child = branch(dev, parent = self, kickoff = kickoff,
+                       course_length = self.course_length)
+        self.children.append(child)
+        return child
+
+    def walk(self):
+        """Iterate over this branch and all its descendants, depth first"""
+        yield self
+        for child in self.children:
+            for b in child.walk():
+                yield b
+
+    def path(self):
+        """The full path from the wellhead to the end of this branch
+
+        Returns
+        -------
+        md : array_like of float
+        tvd : array_like of float
+        northing : array_like of float
+        easting : array_like of float
+        """
+        parts = []
+        node, kickoff = self, None
+        while node is not None:
+            log = node.log
+            md = log.source.md
+            if kickoff is None:
+                stop = len(md)
+            else:
+                stop = np.searchsorted(md, kickoff, side = 'left')
+
+            # slices are views, so the ancestors' arrays are shared until the
+            # final concatenation
+            parts.append((md[:stop], log.depth[:stop], log.northing[:stop], log.easting[:stop]))
+
+            t = node.tie_in
+            if t is not None and md[0] > t.md:
+                parts.append(([t.md], [t.tvd], [t.northing], [t.easting]))
+
+            kickoff = None if t is None else t.md
+            node = node.parent
+
+        return tuple(np.concatenate(column) for column in zip(*reversed(parts)))
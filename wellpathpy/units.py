@@ -0,0 +1,105 @@
+"""Length units
+
+Surveys are converted once, when they are read, into a canonical unit
+system (metres), and carry their units from then on. The engines and
+location transforms never convert, they only look up the conventions of
+the units, e.g. the dogleg course length.
+"""
+import numpy as np
+
+canonical = 'm'
+
+# metres per unit
+factors = {
+    'm': 1.0,
+    'ft': 0.3048,
+    'usft': 1200 / 3937,
+}
+
+aliases = {
+    'm': 'm',
+    'meter': 'm',
+    'meters': 'm',
+    'metre': 'm',
+    'metres': 'm',
+    'ft': 'ft',
+    'feet': 'ft',
+    'foot': 'ft',
+    'usft': 'usft',
+    'us-ft': 'usft',
+    'us_ft': 'usft',
+    'us survey foot': 'usft',
+    'us survey feet': 'usft',
+}
+
+# the conventional dogleg course length of each unit, see
+# mincurve.minimum_curvature
+course_lengths = {
+    'm': 30,
+    'ft': 100,
+    'usft': 100,
+}
+
+def normalize(unit):
+    """The canonical name of a unit, e.g. 'feet' -> 'ft'
+
+    Raises
+    ------
+    ValueError
+        If the unit is unknown
+    """
+    try:
+        return aliases[str(unit).strip().lower()]
+    except KeyError:
+        msg = 'unknown length unit {}, must be one of {}'
+        raise ValueError(msg.format(unit, ', '.join(sorted(aliases))))
+
+def factor(source, target = canonical):
+    """The factor that converts lengths in source to target units"""
+    return factors[normalize(source)] / factors[normalize(target)]
+
+def course_length(unit):
+    """The conventional dogleg course length in unit
+
+    None (unknown units) gives 30, the historical default.
+    """
+    if unit is None:
+        return 30
+    return course_lengths[normalize(unit)]
+
+def convert(values, source, target = canonical, offsets = None):
+    """Convert lengths between units
+
+    Parameters
+    ----------
+    values : array_like of float
+    source : str or array_like of str
+        units of values. For a fleet in the ragged layout, one unit per well,
+        with offsets
+    target : str
+    offsets : array_like of int, optional
+        well boundaries, see fleet.fleet
+
+    Returns
+    -------
+    values : array_like of float
+        a new array in target units
+
+    Examples
+    --------
+    Convert a fleet of mixed ft and m surveys to metres, in one pass:
+
+    >>> md = convert(f.md, ['ft', 'm', 'm', 'ft'], offsets = f.offsets)
+    """
+    values = np.asarray(values, dtype = float)
+    if np.ndim(source) == 0:
+        return values * factor(source, target)
+
+    source = np.asarray(source)
+    if offsets is None or len(source) != len(offsets) - 1:
+        raise ValueError('units must be scalar, or one per well with offsets')
+
+    # look up every distinct unit once, not once per well
+    names, index = np.unique(source, return_inverse = True)
+    scale = np.array([factor(name, target) for name in names])[index]
+    return values * np.repeat(scale, np.diff(offsets))
@@ -0,0 +1,289 @@
+import numpy as np
+
+from .checkarrays import checkarrays_tvd
+
+class grid:
+    """Regular, optionally rotated, 3D grid
+
+    The grid is only described by its geometry - origin, cell size, number of
+    cells and rotation - and the cells are never materialized. Cells are
+    addressed by (i, j, k), where i runs along the (rotated) east axis, j along
+    the (rotated) north axis and k downwards in depth. The flat cell index is
+    the C-ordered ``np.ravel_multi_index((i, j, k), shape)``.
+
+    Parameters
+    ----------
+    origin : array_like of float
+        (easting, northing, depth) of the outer corner of cell (0, 0, 0)
+    spacing : array_like of float
+        cell size (di, dj, dk)
+    shape : array_like of int
+        number of cells (ni, nj, nk)
+    rotation : float
+        rotation of the i axis in degrees, counter-clockwise from east, around
+        the origin
+
+    Notes
+    -----
+    The grid must be in the same units and coordinate reference as the
+    position logs it is used with, this is the user's responsibility.
+    """
+    def __init__(self, origin, spacing, shape, rotation = 0):
+        self.origin = np.asarray(origin, dtype = float)
+        self.spacing = np.asarray(spacing, dtype = float)
+        self.shape = tuple(int(x) for x in shape)
+        self.rotation = float(rotation)
+
+        if self.origin.shape != (3,):
+            raise ValueError('origin must be (easting, northing, depth)')
+        if self.spacing.shape != (3,) or not (self.spacing > 0).all():
+            raise ValueError('spacing must be 3 positive floats')
+        if len(self.shape) != 3 or min(self.shape) < 1:
+            raise ValueError('shape must be 3 positive integers')
+
+    def __repr__(self):
+        return 'grid(origin = {}, spacing = {}, shape = {}, rotation = {})'.format(
+            list(self.origin), list(self.spacing), self.shape, self.rotation
+        )
+
+    def local(self, northing, easting, depth):
+        """Convert positions to continuous grid coordinates
+
+        Parameters
+        ----------
+        northing : array_like of float
+        easting : array_like of float
+        depth : array_like of float
+
+        Returns
+        -------
+        ijk : array_like of float
+            (n, 3) array of grid coordinates in units of cells, so that
+            ``floor(ijk)`` is the (i, j, k) of the containing cell
+        """
+        depth, northing, easting = checkarrays_tvd(depth, northing, easting)
+        de = easting  - self.origin[0]
+        dn = northing - self.origin[1]
+        dz = depth    - self.origin[2]
+
+        r = np.deg2rad(self.rotation)
+        cos, sin = np.cos(r), np.sin(r)
+        i = ( de * cos + dn * sin) / self.spacing[0]
+        j = (-de * sin + dn * cos) / self.spacing[1]
+        k = dz / self.spacing[2]
+        return np.column_stack([i, j, k])
+
+def ragged_arange(counts):
+    """Concatenated aranges
+
+    Compute ``np.concatenate([np.arange(n) for n in counts])`` without the
+    python loop.
+
+    Parameters
+    ----------
+    counts : array_like of int
+
+    Returns
+    -------
+    aranges : array_like of int
+
+    Examples
+    --------
+    >>> ragged_arange([2, 0, 3])
+    array([0, 1, 0, 1, 2])
+    """
+    counts = np.asarray(counts, dtype = np.int64)
+    total = counts.sum()
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total, dtype = np.int64) - starts
+
+def stations(pos, step = None):
+    """Measured depths and positions to traverse
+
+    Parameters
+    ----------
+    pos : position_log
+    step : float, optional
+        If given, and pos is a minimum_curvature log, the arcs are densified
+        with resample() so that no chord is longer than step
+
+    Returns
+    -------
+    md : array_like of float
+    northing : array_like of float
+    easting : array_like of float
+    depth : array_like of float
+    """
+    md = pos.source.md
+    if step is None or not hasattr(pos, 'dls'):
+        return md, pos.northing, pos.easting, pos.depth
+
+    if step <= 0:
+        raise ValueError('step must be positive')
+
+    md = np.union1d(md, np.arange(md[0], md[-1], step))
+    dense = pos.resample(depths = md)
+    return md, dense.northing, dense.easting, dense.depth
+
+def traverse_points(md, ijk, shape):
+    """Walk a polyline through the grid
+
+    This is the inner workhorse of traverse(), and only implements the
+    geometry. Every chord between consecutive points is split where it
+    crosses a grid plane, in one vectorised pass over all chords and all
+    three axes.
+
+    Parameters
+    ----------
+    md : array_like of float
+        measured depth of every point
+    ijk : array_like of float
+        (n, 3) points in continuous grid coordinates, see grid.local
+    shape : tuple of int
+        grid shape (ni, nj, nk)
+
+    Returns
+    -------
+    cell : array_like of int
+        flat index of the penetrated cells, in order along the well
+    md_in : array_like of float
+        measured depth where the well enters the cell
+    md_out : array_like of float
+        measured depth where the well exits the cell
+    """
+    md = np.asarray(md, dtype = float)
+    ijk = np.asarray(ijk, dtype = float)
+    a, b = ijk[:-1], ijk[1:]
+    md_a, md_b = md[:-1], md[1:]
+    segments = len(a)
+
+    # Every chord contributes its end points (t = 0, t = 1) and the
+    # parametric position of every grid plane it crosses
+    seg = [np.arange(segments), np.arange(segments)]
+    ts  = [np.zeros(segments), np.ones(segments)]
+    for axis in range(3):
+        fa = np.floor(a[:, axis])
+        fb = np.floor(b[:, axis])
+        count = np.abs(fb - fa).astype(np.int64)
+        index = np.repeat(np.arange(segments), count)
+        k = ragged_arange(count)
+
+        increasing = (fb > fa)[index]
+        plane = np.where(increasing, fa[index] + 1 + k, fa[index] - k)
+        start = a[index, axis]
+        delta = b[index, axis] - start
+        seg.append(index)
+        ts.append((plane - start) / delta)
+
+    seg = np.concatenate(seg)
+    ts  = np.clip(np.concatenate(ts), 0, 1)
+    order = np.lexsort((ts, seg))
+    seg = seg[order]
+    ts  = ts[order]
+
+    # consecutive crossings in the same chord delimit a piece of the chord that
+    # lives entirely in one cell, identified by its mid point
+    same = (seg[1:] == seg[:-1]) & (ts[1:] > ts[:-1])
+    s  = seg[:-1][same]
+    t0 = ts[:-1][same]
+    t1 = ts[1:][same]
+
+    mid = a[s] + ((t0 + t1) / 2)[:, np.newaxis] * (b[s] - a[s])
+    cell = np.floor(mid).astype(np.int64)
+    inside = ((cell >= 0) & (cell < np.asarray(shape))).all(axis = 1)
+
+    dmd = md_b[s] - md_a[s]
+    md_in  = (md_a[s] + t0 * dmd)[inside]
+    md_out = (md_a[s] + t1 * dmd)[inside]
+    cell = np.ravel_multi_index(tuple(cell[inside].T), shape)
+
+    # merge runs of pieces in the same cell, which happens at the survey
+    # stations and wherever the chord touches a plane without crossing it
+    if len(cell) == 0:
+        return cell, md_in, md_out
+
+    new = np.ones(len(cell), dtype = bool)
+    new[1:] = (cell[1:] != cell[:-1]) | (md_in[1:] != md_out[:-1])
+    first = np.flatnonzero(new)
+    last = np.append(first[1:] - 1, len(cell) - 1)
+    return cell[first], md_in[first], md_out[last]
+
+def traverse(pos, grid, step = None):
+    """Cells penetrated by a well path
+
+    Parameters
+    ----------
+    pos : position_log
+        position log, in the same coordinate system as the grid
+    grid : grid
+    step : float, optional
+        maximum chord length when densifying minimum curvature arcs. If None,
+        the well path is the polyline through the survey stations
+
+    Returns
+    -------
+    cell : array_like of int
+        flat index of the penetrated cells, in order along the well
+    md_in : array_like of float
+        measured depth where the well enters the cell
+    md_out : array_like of float
+        measured depth where the well exits the cell
+
+    Notes
+    -----
+    Only the cells that are hit are computed, the size of the grid does not
+    matter. Cells are reported once per entry, so a well that leaves and
+    re-enters a cell reports it twice.
+
+    Examples
+    --------
+    Cells hit by a well, in a 100x100x20 grid of 50x50x10 m cells:
+
+    >>> g = grid(origin = (0, 0, 0), spacing = (50, 50, 10), shape = (100, 100, 20))
+    >>> cell, md_in, md_out = traverse(pos, g, step = 5)
+    >>> i, j, k = np.unravel_index(cell, g.shape)
+    """
+    md, n, e, depth = stations(pos, step = step)
+    ijk = grid.local(n, e, depth)
+    return traverse_points(md, ijk, grid.shape)
+
+def traverse_many(logs, grid, step = None):
+    """Cells penetrated by many well paths
+
+    Parameters
+    ----------
+    logs : iterable of position_log
+    grid : grid
+    step : float, optional
+        see traverse
+
+    Returns
+    -------
+    well : array_like of int
+        index into logs of the well penetrating the cell
+    cell : array_like of int
+    md_in : array_like of float
+    md_out : array_like of float
+
+    See also
+    --------
+    traverse
+    """
+    wells, cells, ins, outs = [], [], [], []
+    for i, pos in enumerate(logs):
+        cell, md_in, md_out = traverse(pos, grid, step = step)
+        wells.append(np.full(len(cell), i, dtype = np.int64))
+        cells.append(cell)
+        ins.append(md_in)
+        outs.append(md_out)
+
+    if not cells:
+        empty = np.zeros(0)
+        return empty.astype(np.int64), empty.astype(np.int64), empty, empty
+
+    return (
+        np.concatenate(wells),
+        np.concatenate(cells),
+        np.concatenate(ins),
+        np.concatenate(outs),
+    )
@@ -0,0 +1,160 @@
+import numpy as np
+
+# stations per block of blocked_cumsum
+blocksize = 256
+
+class workspace:
+    """Workspace
+
+    Reusable temporary arrays for the survey engines. Computing many wells
+    with the same workspace reuses the same memory for the per-segment
+    temporaries, instead of allocating and freeing them for every well. The
+    arrays grow to fit the longest well seen so far.
+
+    A workspace must not be shared between threads.
+
+    Examples
+    --------
+    >>> ws = workspace()
+    >>> for md, inc, azi in surveys:
+    ...     tvd, n, e, dls = minimum_curvature(md, inc, azi, workspace = ws)
+    """
+    def __init__(self):
+        self.arrays = {}
+
+    def __repr__(self):
+        return 'workspace(nbytes = {})'.format(self.nbytes)
+
+    @property
+    def nbytes(self):
+        return sum(x.nbytes for x in self.arrays.values())
+
+    def get(self, name, n):
+        """A temporary array of n floats
+
+        The content is undefined, and the array is overwritten by the next
+        call with the same name.
+        """
+        array = self.arrays.get(name)
+        if array is None or len(array) < n:
+            # grow geometrically, so slowly growing wells do not reallocate
+            # for every call
+            size = n if array is None else max(n, 2 * len(array))
+            array = np.empty(size)
+            self.arrays[name] = array
+        return array[:n]
+
+def ensure(ws):
+    """ws, or a new workspace if ws is None"""
+    return workspace() if ws is None else ws
+
+def temporary(ws, name, n):
+    """A temporary array from the workspace ws, or a new one if ws is None"""
+    if ws is None:
+        return np.empty(n)
+    return ws.get(name, n)
+
+# the dtypes of caller-supplied outputs. The engines always compute in float64,
+# float32 outputs only store the results in lower precision
+floats = (np.dtype(np.float64), np.dtype(np.float32))
+
+def outputs(out, n, count):
+    """Validate caller-supplied output arrays, or allocate them
+
+    Parameters
+    ----------
+    out : tuple of array_like or None
+    n : int
+        number of stations
+    count : int
+        number of output arrays
+
+    Returns
+    -------
+    out : tuple of array_like
+    """
+    if out is None:
+        return tuple(np.empty(n) for _ in range(count))
+
+    out = tuple(out)
+    if len(out) != count:
+        raise ValueError('out must be a tuple of {} arrays'.format(count))
+    for x in out:
+        if not isinstance(x, np.ndarray) or x.shape != (n,) or x.dtype not in floats:
+            raise ValueError('out arrays must be float64 or float32 arrays of the same '
+                             'shape as md')
+        if not x.flags.writeable:
+            raise ValueError('out arrays must be writeable')
+    return out
+
+def blocked_cumsum(steps, out = None, blocksize = blocksize):
+    """Cumulative sum with rounding error that does not grow with the length
+
+    The rounding error of np.cumsum grows linearly with the number of steps.
+    Here the steps are summed in blocks: a running sum within every block,
+    all blocks at once, plus the running sum of the block totals, which is
+    computed the same way. The error then grows with blocksize * log(n)
+    instead of n, which keeps surveys of millions of stations accurate.
+
+    Parameters
+    ----------
+    steps : array_like of float
+    out : array_like of float, optional
+        output array of the same length as steps, may be steps itself
+    blocksize : int
+
+    Returns
+    -------
+    sums : array_like of float
+    """
+    steps = np.asarray(steps, dtype = float)
+    n = len(steps)
+    if out is None:
+        out = np.empty(n)
+    if n <= blocksize:
+        return np.cumsum(steps, out = out)
+
+    blocks = -(-n // blocksize)
+    local = np.zeros(blocks * blocksize)
+    local[:n] = steps
+    local = local.reshape(blocks, blocksize)
+    np.cumsum(local, axis = 1, out = local)
+    totals = blocked_cumsum(local[:-1, -1], blocksize = blocksize)
+    local[1:] += totals[:, np.newaxis]
+    out[:] = local.ravel()[:n]
+    return out
+
+def accumulate(steps, dst, start, skip, compensated = False):
+    """Running sum of steps into dst, from start
+
+    This is ``start + np.insert(np.cumsum(steps), 0, 0)[skip:]``, written
+    directly into dst without the intermediate arrays. With compensated, the
+    running sum is blocked_cumsum. The sum is computed in float64 also when
+    dst is a lower precision array.
+
+    Parameters
+    ----------
+    steps : array_like of float
+        per-segment increments
+    dst : array_like of float
+        output of len(steps) + 1 - skip stations
+    start : float
+        value at the first station
+    skip : int
+        0 to include the first station, 1 to leave it out (it is the tie-in)
+    compensated : bool
+    """
+    if compensated or dst.dtype != np.float64:
+        # sum in float64, and only round to the precision of dst at the end
+        sums = blocked_cumsum(steps) if compensated else np.cumsum(steps)
+        sums += start
+        dst[1 - skip:] = sums
+        if skip == 0:
+            dst[0] = start
+        return dst
+
+    if skip == 0:
+        dst[0] = 0
+    np.cumsum(steps, out = dst[1 - skip:])
+    dst += start
+    return dst
@@ -1,7 +1,9 @@
 import numpy as np
 
 from .checkarrays import checkarrays, checkarrays_tvd
+from .instrument import timed
 
+@timed('deviation_to_csv')
 def deviation_to_csv(fname, md, inc, azi, fmt='%.3f', delimiter=',', header='md,inc,azi', **kwargs):
     """Write a log to a comma-separated values (csv) file.
 
@@ -45,6 +47,7 @@ def deviation_to_csv(fname, md, inc, azi, fmt='%.3f', delimiter=',', header='md,
 
     return None
 
+@timed('position_to_csv')
 def position_to_csv(fname, depth, northing, easting, fmt='%.3f', delimiter=',', header='easting,northing,depth', **kwargs):
     """Write a log to a comma-separated values (csv) file.
 